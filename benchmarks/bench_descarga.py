@@ -0,0 +1,132 @@
+"""Benchmark of the download copy loop against a local HTTP server
+
+Uso:
+    python benchmarks/bench_descarga.py [--mb 200] [--paralelas 4] [--repeat 3]
+
+Levanta un servidor HTTP local (en otro proceso, para que su CPU no cuente)
+que sirve ``--mb`` MB con Content-Length y keep-alive, y descarga el archivo
+``--paralelas`` veces a la vez con:
+
+- antes: response.iter_content + comprobación de progreso en cada bloque
+  (el bucle que tenía descargar_audio)
+- después: copiar_respuesta (readinto a un buffer preasignado y progreso
+  desde un temporizador)
+
+Para cada uno muestra MB/s y segundos de CPU del cliente por GB descargado.
+"""
+import argparse
+import contextlib
+import http.server
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import descargarAudio  # noqa: E402
+from src.http_session import get_session  # noqa: E402
+
+
+BLOQUE = os.urandom(1024 * 1024)
+
+
+def servir(tamano, puerto):
+    """Servidor HTTP/1.1 que responde tamano bytes a cualquier GET"""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(tamano))
+            self.end_headers()
+            restante = tamano
+            while restante > 0:
+                self.wfile.write(BLOQUE[:min(restante, len(BLOQUE))])
+                restante -= len(BLOQUE)
+
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    puerto.value = servidor.server_port
+    servidor.serve_forever()
+
+
+def antes(response, f, total_size):
+    """Bucle original de descargar_audio"""
+    downloaded = 0
+    chunk_size = 65536
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if chunk:
+            f.write(chunk)
+            downloaded += len(chunk)
+
+            if total_size > 0:
+                progress = (downloaded / total_size) * 100
+                if downloaded % (2 * 1024 * 1024) < chunk_size:
+                    print(f"Progreso: {progress:.1f}% ({downloaded // 1024 // 1024} MB / {total_size // 1024 // 1024} MB)")
+    return downloaded
+
+
+def despues(response, f, total_size):
+    with descargarAudio._Progreso(total_size) as progreso:
+        descargarAudio.copiar_respuesta(response, f, progreso)
+    return progreso.descargado
+
+
+def descargar(url, copiar, directorio, i):
+    response = get_session(url).get(url, stream=True, timeout=60, headers={'Accept-Encoding': 'identity'})
+    total_size = int(response.headers.get('content-length', 0))
+    with open(os.path.join(directorio, f"{i}.mp3"), "wb") as f:
+        descargado = copiar(response, f, total_size)
+    response.close()
+    assert descargado == total_size, (descargado, total_size)
+    return descargado
+
+
+def medir(url, copiar, paralelas, directorio):
+    """(MB/s, segundos de CPU por GB) de una ronda de descargas simultáneas"""
+    cpu = time.process_time()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=paralelas) as executor:
+            total = sum(executor.map(lambda i: descargar(url, copiar, directorio, i), range(paralelas)))
+    transcurrido = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu
+    return total / 1024 / 1024 / transcurrido, cpu / (total / 1024 ** 3)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mb', type=int, default=200, help='Tamaño del archivo servido (MB)')
+    parser.add_argument('--paralelas', type=int, default=4, help='Descargas simultáneas')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por medición')
+    args = parser.parse_args(argv)
+
+    puerto = multiprocessing.Value('i', 0)
+    servidor = multiprocessing.Process(target=servir, args=(args.mb * 1024 * 1024, puerto), daemon=True)
+    servidor.start()
+    while not puerto.value:
+        time.sleep(0.05)
+    url = f"http://127.0.0.1:{puerto.value}/episodio.mp3"
+
+    print(f"{args.paralelas} descarga(s) simultáneas de {args.mb} MB\n")
+    print(f"{'bucle':<10}{'MB/s':>10}{'CPU s/GB':>12}")
+    try:
+        with tempfile.TemporaryDirectory() as directorio:
+            for nombre, copiar in (('antes', antes), ('después', despues)):
+                resultados = [medir(url, copiar, args.paralelas, directorio) for _ in range(args.repeat)]
+                velocidad = max(r[0] for r in resultados)
+                cpu = min(r[1] for r in resultados)
+                print(f"{nombre:<10}{velocidad:>10.0f}{cpu:>12.2f}")
+    finally:
+        servidor.terminate()
+
+
+if __name__ == '__main__':
+    main()
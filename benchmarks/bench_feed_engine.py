@@ -0,0 +1,124 @@
+"""Benchmark of the shared feed engine against the parsers it replaced
+
+Uso:
+    python benchmarks/bench_feed_engine.py [--items 3000] [--limit 10] [--repeat 5]
+
+Genera un feed de podcast sintético y mide, para el feed completo y para
+los primeros ``--limit`` episodios (lo que usan los scrapers):
+
+- feed_engine con lxml (camino rápido) y con la librería estándar
+- BeautifulSoup 'xml' (antes en rss_scraper / encontacto_scraper)
+- xml.etree.ElementTree.fromstring (antes en ligonier / sabiduria / coalicion)
+- feedparser (antes en crianza_scraper), si está instalado
+"""
+import argparse
+import os
+import sys
+import time
+from itertools import islice
+from xml.etree import ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scrapers import feed_engine  # noqa: E402
+
+
+def generar_feed(items: int) -> bytes:
+    """Feed RSS con namespaces itunes, descripciones largas y enclosures"""
+    partes = [
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">'
+        '<channel><title>Podcast de prueba</title>'
+    ]
+    for i in range(items, 0, -1):
+        partes.append(
+            f'<item><title>Episodio {i}: título con acentos</title>'
+            f'<guid isPermaLink="false">ep-{i}</guid>'
+            f'<pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate>'
+            f'<link>https://example.org/episodios/{i}</link>'
+            f'<description><![CDATA[<p>{"Descripción del episodio. " * 40}</p>]]></description>'
+            f'<itunes:duration>00:28:{i % 60:02d}</itunes:duration>'
+            f'<enclosure url="https://cdn.example.org/audio/{i}.mp3" length="{i * 1000}" type="audio/mpeg"/>'
+            f'</item>'
+        )
+    partes.append('</channel></rss>')
+    return ''.join(partes).encode('utf-8')
+
+
+def motor(use_lxml):
+    def parse(data, limit):
+        entries = feed_engine.iter_entries_from_chunks(feed_engine.iter_chunks(data), use_lxml=use_lxml)
+        return [(e.title, e.enclosure_url) for e in islice(entries, limit)]
+    return parse
+
+
+def bs4_xml(data, limit):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(data, 'xml')
+    resultado = []
+    for item in soup.find_all('item')[:limit]:
+        enclosure = item.find('enclosure')
+        resultado.append((item.find('title').get_text(strip=True), enclosure.get('url') if enclosure else None))
+    return resultado
+
+
+def etree(data, limit):
+    root = ET.fromstring(data)
+    resultado = []
+    for item in root.findall('.//item')[:limit]:
+        enclosure = item.find('enclosure')
+        resultado.append((item.findtext('title'), enclosure.get('url') if enclosure is not None else None))
+    return resultado
+
+
+def feedparser_parse(data, limit):
+    import feedparser
+    feed = feedparser.parse(data)
+    return [(e.title, e.enclosures[0].href if e.enclosures else None) for e in feed.entries[:limit]]
+
+
+def medir(funcion, data, limit, repeat):
+    """Mejor tiempo (ms) de repeat ejecuciones"""
+    mejor = None
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        funcion(data, limit)
+        transcurrido = (time.perf_counter() - inicio) * 1000
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=3000, help='Episodios del feed sintético')
+    parser.add_argument('--limit', type=int, default=10, help='Episodios que usa un scraper')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por medición')
+    args = parser.parse_args(argv)
+
+    data = generar_feed(args.items)
+    print(f"Feed sintético: {args.items} episodios, {len(data) / 1024 / 1024:.1f} MB\n")
+
+    parsers = [('feed_engine (stdlib)', motor(False)), ('bs4 xml', bs4_xml), ('ElementTree', etree)]
+    if feed_engine.lxml_etree is not None:
+        parsers.insert(0, ('feed_engine (lxml)', motor(True)))
+    try:
+        import feedparser  # noqa: F401
+        parsers.append(('feedparser', feedparser_parse))
+    except ImportError:
+        print("(feedparser no instalado: se omite)\n")
+
+    # Todos deben extraer lo mismo
+    esperado = etree(data, args.limit)
+    for nombre, funcion in parsers:
+        if funcion(data, args.limit) != esperado:
+            print(f"⚠ {nombre} no coincide con ElementTree")
+
+    print(f"{'parser':<24}{'primeros ' + str(args.limit):>16}{'feed completo':>16}")
+    for nombre, funcion in parsers:
+        primeros = medir(funcion, data, args.limit, args.repeat)
+        completo = medir(funcion, data, args.items, args.repeat)
+        print(f"{nombre:<24}{primeros:>13.1f} ms{completo:>13.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+"""End-to-end benchmark of main.py against a local stand-in HTTP server
+
+Uso:
+    python benchmarks/bench_pipeline.py [--feeds 6] [--twr 2] [--episodios 3] [--mb 5]
+                                        [--latencia 50] [--errores 0] [--workers 8]
+                                        [--modos serie,paralelo] [--cache ambos]
+
+Funciona sin conexión: un servidor HTTP local (en otro proceso) sirve feeds
+RSS sintéticos, páginas al estilo TWR360 (listado, episodio y página de
+audio) y MP3 de ``--mb`` MB, con ``--latencia`` ms por petición y una
+fracción ``--errores`` de respuestas 503. Se genera un radio_programs.json
+que apunta a él y se ejecuta main() de punta a punta en un subproceso por
+modo (serie / paralelo / async, con y sin caché HTTP), midiendo programas
+por minuto, MB/s, peticiones y memoria pico (RSS).
+
+Con caché, una primera ejecución llena la caché HTTP y la medida se hace en
+una segunda ejecución sin descargas previas (se borran audios y manifest).
+Los errores activan los reintentos reales de las descargas (con espera).
+"""
+import argparse
+import contextlib
+import http.server
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+BLOQUE = bytes(range(256)) * 256
+
+# Los feeds se piden a 127.0.0.1 y las páginas TWR360 a localhost: así cada host
+# puede asociarse a su scraper en ScraperFactory.SCRAPER_MAPPING
+HOST_FEEDS = "127.0.0.1"
+HOST_TWR = "localhost"
+
+
+def _feed(puerto, programa, episodios, tamano):
+    items = []
+    for i in range(episodios, 0, -1):
+        items.append(
+            f"<item><title>Programa {programa} - episodio {i}</title>"
+            f"<guid>feed-{programa}-{i}</guid>"
+            f"<pubDate>Mon, {i:02d} Jan 2024 10:00:00 GMT</pubDate>"
+            f"<description>{'Descripción del episodio. ' * 20}</description>"
+            f'<enclosure url="http://{HOST_FEEDS}:{puerto}/audio/feed-{programa}-{i}.mp3" '
+            f'length="{tamano}" type="audio/mpeg"/></item>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Programa {programa}</title>{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def _pagina(cuerpo):
+    relleno = "<div class='menu'>" + "<a href='/otra'>Enlace</a>" * 200 + "</div>"
+    return f"<html><head><title>TWR360</title></head><body>{relleno}{cuerpo}</body></html>".encode("utf-8")
+
+
+def servir(puerto, opciones):
+    """Servidor de feeds, páginas TWR360 y audios (se ejecuta en otro proceso)"""
+    azar = random.Random(opciones["semilla"])
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, cuerpo, tipo, etag=None):
+            if etag and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(cuerpo)))
+            if etag:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(cuerpo)
+
+        def _audio(self):
+            tamano = opciones["tamano"]
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(tamano))
+            self.send_header("ETag", '"audio"')
+            self.end_headers()
+            if self.command == "HEAD":
+                return
+            restante = tamano
+            while restante > 0:
+                self.wfile.write(BLOQUE[:min(restante, len(BLOQUE))])
+                restante -= len(BLOQUE)
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            if opciones["latencia"]:
+                time.sleep(opciones["latencia"])
+            if azar.random() < opciones["errores"]:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            ruta = self.path
+            base_twr = f"http://{HOST_TWR}:{puerto.value}"
+            if ruta.startswith("/audio/"):
+                self._audio()
+            elif ruta.startswith("/feed/"):
+                programa = int(ruta.rsplit("/", 1)[1].split(".")[0])
+                cuerpo = _feed(puerto.value, programa, opciones["episodios"], opciones["tamano"])
+                self._responder(cuerpo, "application/rss+xml", etag=f'"feed-{programa}"')
+            elif ruta.startswith("/programs/list/"):
+                programa = int(ruta.rstrip("/").rsplit("/", 1)[1])
+                enlaces = "".join(
+                    f"<h1><a href='{base_twr}/programs/view/id,{programa * 1000 + i}/'>"
+                    f"TWR {programa} - episodio {i}</a></h1>"
+                    for i in range(opciones["episodios"], 0, -1)
+                )
+                self._responder(_pagina(enlaces), "text/html; charset=utf-8", etag=f'"lista-{programa}"')
+            elif "action,audio" in ruta:
+                episodio = ruta.split("id,")[1].split("/")[0]
+                audio = f"http://{HOST_FEEDS}:{puerto.value}/audio/twr-{episodio}.mp3"
+                self._responder(_pagina(f"<audio src='{audio}'></audio>"), "text/html; charset=utf-8",
+                                etag=f'"audio-{episodio}"')
+            elif ruta.startswith("/programs/view/id,"):
+                episodio = ruta.split("id,")[1].split("/")[0]
+                enlace = f"{base_twr}/programs/view/id,{episodio}/action,audio/lang,2"
+                self._responder(_pagina(f"<a href='{enlace}'>Escuchar</a>"), "text/html; charset=utf-8",
+                                etag=f'"episodio-{episodio}"')
+            else:
+                self._responder(b"no encontrado", "text/plain")
+
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    puerto.value = servidor.server_port
+    servidor.serve_forever()
+
+
+def generar_config(ruta, puerto, trabajo, args):
+    """radio_programs.json con los programas del servidor local y directorios de trabajo"""
+    programas = [
+        {"name": f"Feed {p}", "url": f"http://{HOST_FEEDS}:{puerto}/feed/{p}.xml",
+         "enabled": True, "max_episodes": args.episodios}
+        for p in range(1, args.feeds + 1)
+    ] + [
+        {"name": f"TWR {p}", "url": f"http://{HOST_TWR}:{puerto}/programs/list/{p}",
+         "enabled": True, "max_episodes": args.episodios}
+        for p in range(1, args.twr + 1)
+    ]
+    config = {
+        "radio_programs": programas,
+        "settings": {
+            "download_directory": str(trabajo / "programas"),
+            "max_episodes_per_program": args.episodios,
+            "cleanup_old_files": False,
+            "max_workers": args.workers,
+            "cache_directory": str(trabajo / "cache"),
+            "http_cache": True,
+            "manifest_file": str(trabajo / "descargas.sqlite3"),
+            "metrics_directory": str(trabajo / "metricas"),
+        },
+    }
+    ruta.write_text(json.dumps(config, ensure_ascii=False, indent=2), encoding="utf-8")
+    return len(programas)
+
+
+def ejecutar_hijo(puerto, salida, argv):
+    """Subproceso: ejecuta main() y guarda tiempo, métricas y memoria pico en salida"""
+    from main import main
+    from src.metricas import get_metricas
+    from src.scraper_factory import ScraperFactory
+    from src.scrapers import RSSFeedScraper, TWR360Scraper
+
+    ScraperFactory.SCRAPER_MAPPING[f"{HOST_FEEDS}:{puerto}"] = RSSFeedScraper
+    ScraperFactory.SCRAPER_MAPPING[f"{HOST_TWR}:{puerto}"] = TWR360Scraper
+
+    inicio = time.perf_counter()
+    with open(os.devnull, "w", encoding="utf-8") as nulo, contextlib.redirect_stdout(nulo):
+        main(argv)
+    segundos = time.perf_counter() - inicio
+
+    metricas = get_metricas().a_dict()
+    peticiones = {}
+    for contador in metricas["contadores"]:
+        if contador["nombre"] == "autoradio_http_requests_total":
+            etiquetas = contador["etiquetas"]
+            clave = f"{etiquetas['metodo']} {etiquetas['estado']}"
+            peticiones[clave] = peticiones.get(clave, 0) + contador["valor"]
+    descargado = sum(
+        contador["valor"] for contador in metricas["contadores"]
+        if contador["nombre"] == "autoradio_download_bytes_total"
+    )
+
+    try:
+        import resource
+        rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        rss_pico = rss_pico if sys.platform == "darwin" else rss_pico * 1024
+    except ImportError:
+        rss_pico = None
+
+    Path(salida).write_text(json.dumps({
+        "segundos": segundos, "peticiones": peticiones, "bytes": descargado, "rss_pico": rss_pico,
+    }), encoding="utf-8")
+
+
+def correr(puerto, config, trabajo, argv):
+    """Lanza main() en un subproceso limpio y devuelve sus resultados"""
+    salida = trabajo / "resultado.json"
+    entorno = {k: v for k, v in os.environ.items() if k not in ("MAX_WORKERS", "PROGRAMAS_URL")}
+    # load_dotenv no pisa variables existentes: un .env local no cambia los directorios
+    entorno["DIRECTORIO"] = str(trabajo / "programas")
+    entorno["CACHE_DIR"] = str(trabajo / "cache")
+    subprocess.run(
+        [sys.executable, __file__, "--hijo", str(puerto), str(salida), "--", "--config", str(config), *argv],
+        check=True, cwd=RAIZ, env=entorno,
+    )
+    return json.loads(salida.read_text(encoding="utf-8"))
+
+
+def medir(puerto, args, modo, con_cache, base):
+    trabajo = Path(tempfile.mkdtemp(prefix=f"{modo}-", dir=base))
+    config = trabajo / "radio_programs.json"
+    programas = generar_config(config, puerto, trabajo, args)
+
+    argv = {"serie": ["--workers", "1"], "paralelo": ["--workers", str(args.workers)],
+            "async": ["--async", "--workers", str(args.workers)]}[modo]
+    if con_cache:
+        # Llenar la caché HTTP y medir una ejecución posterior con todo por descargar
+        correr(puerto, config, trabajo, argv)
+        shutil.rmtree(trabajo / "programas", ignore_errors=True)
+        (trabajo / "descargas.sqlite3").unlink(missing_ok=True)
+    else:
+        argv = argv + ["--no-cache"]
+
+    resultado = correr(puerto, config, trabajo, argv)
+    resultado["programas"] = programas
+    return resultado
+
+
+def main(argv=None):
+    if argv is None and len(sys.argv) > 1 and sys.argv[1] == "--hijo":
+        # sys.argv: --hijo PUERTO SALIDA -- args de main.py
+        return ejecutar_hijo(int(sys.argv[2]), sys.argv[3], sys.argv[5:])
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feeds", type=int, default=6, help="Programas RSS")
+    parser.add_argument("--twr", type=int, default=2, help="Programas al estilo TWR360")
+    parser.add_argument("--episodios", type=int, default=3, help="Episodios descargados por programa")
+    parser.add_argument("--mb", type=float, default=5, help="Tamaño de cada MP3 (MB)")
+    parser.add_argument("--latencia", type=float, default=50, help="Latencia por petición (ms)")
+    parser.add_argument("--errores", type=float, default=0, help="Fracción de respuestas 503 (0-1)")
+    parser.add_argument("--workers", type=int, default=8, help="Workers de los modos paralelo y async")
+    parser.add_argument("--modos", default="serie,paralelo", help="Modos: serie, paralelo, async")
+    parser.add_argument("--cache", choices=("ambos", "si", "no"), default="ambos", help="Caché HTTP")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla de los errores simulados")
+    args = parser.parse_args(argv)
+
+    opciones = {
+        "tamano": int(args.mb * 1024 * 1024),
+        "latencia": args.latencia / 1000,
+        "errores": args.errores,
+        "episodios": args.episodios,
+        "semilla": args.semilla,
+    }
+    puerto = multiprocessing.Value("i", 0)
+    servidor = multiprocessing.Process(target=servir, args=(puerto, opciones), daemon=True)
+    servidor.start()
+    while not puerto.value:
+        time.sleep(0.05)
+
+    modos = [m.strip() for m in args.modos.split(",") if m.strip()]
+    caches = {"ambos": (False, True), "si": (True,), "no": (False,)}[args.cache]
+    print(f"{args.feeds} feeds + {args.twr} TWR360, {args.episodios} episodios de {args.mb} MB, "
+          f"latencia {args.latencia} ms, errores {args.errores:.0%}\n")
+    print(f"{'modo':<10}{'caché':<7}{'s':>8}{'prog/min':>10}{'MB/s':>8}{'RSS MB':>8}  peticiones")
+
+    base = Path(tempfile.mkdtemp(prefix="bench-pipeline-"))
+    try:
+        for modo in modos:
+            for con_cache in caches:
+                r = medir(puerto.value, args, modo, con_cache, base)
+                rss = f"{r['rss_pico'] / 1024 / 1024:.0f}" if r["rss_pico"] else "-"
+                peticiones = ", ".join(f"{k}: {v:.0f}" for k, v in sorted(r["peticiones"].items()))
+                print(f"{modo:<10}{'sí' if con_cache else 'no':<7}{r['segundos']:>8.2f}"
+                      f"{r['programas'] / r['segundos'] * 60:>10.0f}"
+                      f"{r['bytes'] / 1024 / 1024 / r['segundos']:>8.1f}{rss:>8}  {peticiones}")
+    finally:
+        servidor.terminate()
+        shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
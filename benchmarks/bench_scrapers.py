@@ -0,0 +1,270 @@
+"""Parsing microbenchmarks per scraper over a recorded fixture corpus
+
+Uso:
+    python benchmarks/bench_scrapers.py [--scraper twr360] [--repeat 5]
+    python benchmarks/bench_scrapers.py --guardar base.json
+    python benchmarks/bench_scrapers.py --comparar base.json
+    python benchmarks/bench_scrapers.py --grabar twr360
+
+Cada directorio de ``benchmarks/fixtures/<sitio>/`` tiene un ``fixture.json``
+(scraper, URL y nombre del programa, qué archivo responde a cada URL y,
+opcionalmente, de cuántos episodios resolver el audio con ``max_audios`` y
+el ``estado`` que el scraper recuerda de ejecuciones anteriores, donde
+``"actualizado": null`` significa hoy) y los cuerpos HTML/RSS. La sesión del scraper se reemplaza por una que sirve
+esos archivos, así que solo se mide lo que hace el scraper con ellos:
+get_episodes() y después get_audio_url() de cada episodio, con la caché
+HTTP desactivada para que cada ronda parsee de verdad.
+
+Para cada sitio muestra el mejor tiempo de ``--repeat`` rondas y cuántas
+peticiones hizo. ``--guardar`` escribe los tiempos en un JSON y
+``--comparar`` los compara con uno guardado antes (p. ej. en otra rama).
+
+``--grabar <sitio>`` vuelve a grabar las respuestas del sitio desde la red
+con el scraper real, reemplazando los archivos del fixture.
+
+No entran los scrapers que solo sondean URLs con HEAD (Visión para Vivir,
+Gracia) ni los de yt-dlp (YouTube, Carlos Ruiz): no parsean nada.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import scrapers  # noqa: E402
+from src.http_cache import set_cache_dir, set_http_cache_enabled  # noqa: E402
+
+
+FIXTURES = Path(__file__).parent / "fixtures"
+FIXTURE_FILE = "fixture.json"
+
+
+def _sin_query(url: str) -> str:
+    partes = urlsplit(url)
+    return urlunsplit((partes.scheme, partes.netloc, partes.path, "", ""))
+
+
+def _respuesta(metodo, url, cuerpo=b"", estado=200, tipo=None, url_final=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = estado
+    response.reason = HTTPStatus(estado).phrase
+    response.url = url_final or url
+    response.headers = CaseInsensitiveDict({"Content-Length": str(len(cuerpo))})
+    if tipo:
+        response.headers["Content-Type"] = tipo
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.raw = io.BytesIO(cuerpo)
+    response.request = requests.Request(metodo, url).prepare()
+    return response
+
+
+class FixtureSession:
+    """Stand-in for PooledSession answering from a site's fixture files
+
+    GETs are matched by URL, then by URL without query string (for pages
+    whose query changes every day); HEAD answers 200 to the URLs listed in
+    "head". Anything else is a 404.
+    """
+
+    def __init__(self, directorio: Path, fixture: dict):
+        self.headers = CaseInsensitiveDict()
+        self.peticiones = 0
+        self._tipo = fixture.get("content_type", "text/html; charset=UTF-8")
+        self._head = set(fixture.get("head", []))
+        self._respuestas = {}
+        for entrada in fixture.get("respuestas", []):
+            archivo = entrada.get("archivo")
+            cuerpo = (directorio / archivo).read_bytes() if archivo else b""
+            self._respuestas[entrada["url"]] = (cuerpo, entrada)
+
+    def request(self, method: str, url: str, params=None, **kwargs) -> requests.Response:
+        self.peticiones += 1
+        if params:
+            url = requests.Request(method, url, params=params).prepare().url
+        if method.upper() == "HEAD":
+            return _respuesta(method, url, estado=200 if url in self._head else 404)
+
+        encontrada = self._respuestas.get(url) or self._respuestas.get(_sin_query(url))
+        if encontrada is None:
+            return _respuesta(method, url, estado=404, tipo="text/html")
+        cuerpo, entrada = encontrada
+        return _respuesta(
+            method, url, cuerpo,
+            estado=entrada.get("estado", 200),
+            tipo=entrada.get("tipo", self._tipo),
+            url_final=entrada.get("url_final"),
+        )
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.request("HEAD", url, **kwargs)
+
+
+class RecordingSession:
+    """Wraps the scraper's real session and keeps every response it gets"""
+
+    def __init__(self, session):
+        self._session = session
+        self.headers = session.headers
+        self.grabadas = []
+        self.head = []
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        response = self._session.request(method, url, **kwargs)
+        if method.upper() == "HEAD":
+            if response.status_code == 200:
+                self.head.append(response.request.url)
+        else:
+            self.grabadas.append((response.request.url, response))
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", True)
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+
+def cargar_fixtures(filtro=None):
+    """(sitio, directorio, fixture) of every fixture, optionally filtered by site name"""
+    for directorio in sorted(FIXTURES.iterdir()):
+        ruta = directorio / FIXTURE_FILE
+        if not ruta.exists() or (filtro and filtro not in directorio.name):
+            continue
+        with open(ruta, "r", encoding="utf-8") as f:
+            yield directorio.name, directorio, json.load(f)
+
+
+def crear_scraper(fixture: dict, session):
+    scraper = getattr(scrapers, fixture["scraper"])(fixture["url"], fixture.get("programa"))
+    scraper.session = session
+    return scraper
+
+
+def ronda(directorio: Path, fixture: dict):
+    """(segundos de get_episodes, segundos de get_audio_url, episodios, audios, peticiones)"""
+    session = FixtureSession(directorio, fixture)
+    scraper = crear_scraper(fixture, session)
+    # Fresh state for every round: what a scraper remembers changes what it fetches
+    with tempfile.TemporaryDirectory() as cache, contextlib.redirect_stdout(io.StringIO()):
+        set_cache_dir(cache)
+        estado = dict(fixture.get("estado") or {})
+        if estado:
+            if "actualizado" in estado and estado["actualizado"] is None:
+                estado["actualizado"] = date.today().isoformat()
+            scraper.save_state(**estado)
+        inicio = time.perf_counter()
+        episodios = scraper.get_episodes()
+        medio = time.perf_counter()
+        audios = [scraper.get_audio_url(episodio) for episodio in episodios[:fixture.get("max_audios")]]
+        fin = time.perf_counter()
+    return medio - inicio, fin - medio, len(episodios), sum(1 for a in audios if a), session.peticiones
+
+
+def medir(directorio: Path, fixture: dict, repeat: int) -> dict:
+    rondas = [ronda(directorio, fixture) for _ in range(repeat)]
+    episodios, audios, peticiones = rondas[0][2:]
+    return {
+        "episodios_ms": min(r[0] for r in rondas) * 1000,
+        "audio_ms": min(r[1] for r in rondas) * 1000,
+        "total_ms": min(r[0] + r[1] for r in rondas) * 1000,
+        "episodios": episodios,
+        "audios": audios,
+        "peticiones": peticiones,
+    }
+
+
+def grabar(sitio: str):
+    """Re-record a site's responses from the network with its real scraper"""
+    directorio = FIXTURES / sitio
+    with open(directorio / FIXTURE_FILE, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+
+    scraper = getattr(scrapers, fixture["scraper"])(fixture["url"], fixture.get("programa"))
+    session = RecordingSession(scraper.session)
+    scraper.session = session
+    set_http_cache_enabled(False)
+    with tempfile.TemporaryDirectory() as cache:
+        set_cache_dir(cache)
+        episodios = scraper.get_episodes()
+        for episodio in episodios[:fixture.get("max_audios")]:
+            scraper.get_audio_url(episodio)
+
+    for viejo in directorio.iterdir():
+        if viejo.name != FIXTURE_FILE:
+            viejo.unlink()
+    respuestas = []
+    for i, (url, response) in enumerate(session.grabadas):
+        entrada = {"url": url, "estado": response.status_code}
+        if response.status_code == 200:
+            tipo = response.headers.get("Content-Type", "")
+            extension = ".xml" if "xml" in tipo or "rss" in tipo else ".html"
+            entrada["archivo"] = f"respuesta_{i}{extension}"
+            entrada["tipo"] = tipo
+            (directorio / entrada["archivo"]).write_bytes(response.content)
+        if response.url != url:
+            entrada["url_final"] = response.url
+        respuestas.append(entrada)
+    fixture["respuestas"] = respuestas
+    fixture["head"] = session.head
+    fixture.pop("content_type", None)
+    with open(directorio / FIXTURE_FILE, "w", encoding="utf-8") as f:
+        json.dump(fixture, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"✅ {sitio}: {len(respuestas)} respuestas y {len(session.head)} HEAD grabados, {len(episodios)} episodios")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scraper', help='Solo los sitios cuyo nombre contiene este texto')
+    parser.add_argument('--repeat', type=int, default=5, help='Rondas por sitio (se toma la mejor)')
+    parser.add_argument('--guardar', metavar='JSON', help='Guardar los resultados como referencia')
+    parser.add_argument('--comparar', metavar='JSON', help='Comparar con resultados guardados')
+    parser.add_argument('--grabar', metavar='SITIO', help='Volver a grabar el fixture de un sitio desde la red')
+    args = parser.parse_args(argv)
+
+    if args.grabar:
+        grabar(args.grabar)
+        return
+
+    set_http_cache_enabled(False)
+    referencia = {}
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            referencia = json.load(f)
+
+    resultados = {}
+    print(f"{'sitio':<16}{'scraper':<32}{'episodios':>12}{'audio':>12}{'total':>12}{'ep.':>5}{'pet.':>6}"
+          + (f"{'Δ':>9}" if referencia else ""))
+    for sitio, directorio, fixture in cargar_fixtures(args.scraper):
+        r = resultados[sitio] = medir(directorio, fixture, args.repeat)
+        linea = (f"{sitio:<16}{fixture['scraper']:<32}{r['episodios_ms']:>10.1f}ms"
+                 f"{r['audio_ms']:>10.1f}ms{r['total_ms']:>10.1f}ms{r['episodios']:>5}{r['peticiones']:>6}")
+        if sitio in referencia:
+            linea += f"{(r['total_ms'] / referencia[sitio]['total_ms'] - 1) * 100:>+8.1f}%"
+        print(linea)
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+        print(f"\nResultados guardados en {args.guardar}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,26 @@
+import argparse
+import asyncio
+import multiprocessing
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
-from src.borrarArchivosViejos import borrar_archivos_viejos
 from src.programa_manager import ProgramaManager
+from src.programa_manager_async import AsyncProgramaManager
 from src.config_manager import ConfigManager
 from src.limpiarNombreArchivo import limpiar_nombre_archivo
+from src.manifest import DownloadManifest
+from src.metricas import get_metricas
+from src.perfilado import Perfilador
+from src.postproceso import cerrar_postproceso, configurar_postproceso, es_audio, get_postprocesador
+from src.retencion import PoliticaRetencion, aplicar_retencion
+from src.planificador import POLITICAS, planificar
+from src.http_cache import get_cache_dir, set_cache_dir, set_http_cache_enabled
+from src.http_session import configure_pools, close_sessions
+from src.http_session_async import AIOHTTP_DISPONIBLE
+from src.ytdlp_sesion import cerrar_ytdlp
 
 
 def get_resource_path(relative_path):
@@ -18,8 +33,35 @@ def get_resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
-def verificar_descargas(directorio, programas_config, programa_manager, config_manager):
-    """Verifica descargas y reintenta episodios faltantes en carpetas vacías"""
+def _audios_en_disco(carpeta):
+    """Nombres (sin extensión) de los audios de una carpeta, en una sola lectura"""
+    try:
+        with os.scandir(carpeta) as entradas:
+            return {Path(e.name).stem for e in entradas if e.is_file() and es_audio(Path(e.name))}
+    except OSError:
+        return set()
+
+
+def _episodios_faltantes(episodios, en_disco, manifest):
+    """Episodios de esta ejecución que no están en disco ni registrados en el manifest
+
+    Los registrados que ya no están en disco los borró la limpieza: no faltan.
+    """
+    return [
+        programa for programa in episodios
+        if limpiar_nombre_archivo(programa["titulo"]) not in en_disco
+        and not (manifest and manifest.ya_descargado(programa))
+    ]
+
+
+def verificar_descargas(directorio, programas_config, descubiertos, programa_manager, config_manager, max_workers):
+    """Verifica descargas y reintenta, todos a la vez, los episodios que faltan
+
+    Usa los episodios descubiertos en esta ejecución (descubiertos, en el
+    orden de programas_config; None si el descubrimiento falló) y lo que hay
+    en disco. Solo se vuelve a descubrir un programa sin archivos cuyo
+    descubrimiento falló: [] es que no hay nada nuevo desde la marca.
+    """
     print(f"\n{'='*60}")
     print("Verificando descargas...")
     print(f"{'='*60}")
@@ -29,74 +71,368 @@ def verificar_descargas(directorio, programas_config, programa_manager, config_m
         print(f"El directorio {directorio} no existe.")
         return
 
+    descubiertos = descubiertos or [None] * len(programas_config)
     programas_con_archivos = 0
-    programas_vacios = 0
-    programas_faltantes = 0
-
-    config_por_carpeta = {}
-    for prog in programas_config:
-        nombre_limpio = limpiar_nombre_archivo(prog["name"])
-        config_por_carpeta[nombre_limpio] = prog
+    sin_descubrir = []
+    faltantes = []
+    por_programa = {}
+
+    for prog_config, episodios in zip(programas_config, descubiertos):
+        name = prog_config["name"]
+        en_disco = _audios_en_disco(base_dir / limpiar_nombre_archivo(name))
+        if en_disco:
+            programas_con_archivos += 1
+            print(f"{name}: {len(en_disco)} archivo(s)")
 
-    for carpeta in base_dir.iterdir():
-        if not carpeta.is_dir():
+        if episodios is None:
+            if not en_disco:
+                sin_descubrir.append(prog_config)
             continue
 
-        archivos_mp3 = list(carpeta.glob("*.mp3"))
-        if archivos_mp3:
-            programas_con_archivos += 1
-            nombre_original = config_por_carpeta.get(carpeta.name, {}).get("name", carpeta.name)
-            print(f"{nombre_original}: {len(archivos_mp3)} archivo(s)")
-        else:
-            programas_vacios += 1
-            prog_config = config_por_carpeta.get(carpeta.name)
-            if prog_config:
-                print(f"Carpeta vacía: {prog_config['name']} — reintentando descarga...")
-                _reintentar_descarga(prog_config, programa_manager, config_manager)
-            else:
-                print(f"Carpeta vacía desconocida: {carpeta.name}")
-
-    for nombre_limpio, prog_config in config_por_carpeta.items():
-        carpeta = base_dir / nombre_limpio
-        if not carpeta.exists():
-            programas_faltantes += 1
-            print(f"carpeta no encontrada: {prog_config['name']} — descargando...")
-            _reintentar_descarga(prog_config, programa_manager, config_manager)
+        pendientes = _episodios_faltantes(episodios, en_disco, programa_manager.manifest)
+        if pendientes:
+            print(f"{name}: faltan {len(pendientes)} episodio(s) — reintentando descarga...")
+            faltantes.extend(pendientes)
+            por_programa[name] = episodios
+
+    if sin_descubrir:
+        print(f"Descubrimiento fallido en {len(sin_descubrir)} programa(s) sin archivos, se vuelve a intentar...")
+        redescubiertos = ejecutar_en_paralelo(
+            lambda prog_config: _reintentar_descubrimiento(prog_config, programa_manager, config_manager),
+            sin_descubrir,
+            max_workers,
+        )
+        for prog_config, episodios in zip(sin_descubrir, redescubiertos):
+            if episodios:
+                faltantes.extend(episodios)
+                por_programa[prog_config["name"]] = episodios
+
+    if faltantes:
+        def al_completar(name):
+            get_postprocesador().cuando_termine(
+                name, lambda: programa_manager.actualizar_marca(por_programa.get(name, []))
+            )
+
+        programa_manager.descargar_en_orden(faltantes, al_completar)
 
     total_esperados = len(programas_config)
     print(f"\nResumen: {programas_con_archivos}/{total_esperados} programas con descargas, "
-          f"{programas_vacios} carpetas vacías reintentadas, {programas_faltantes} carpetas faltantes reintentadas")
+          f"{len(faltantes)} episodio(s) reintentados de {len(por_programa)} programa(s)")
 
 
-def _reintentar_descarga(prog_config, programa_manager, config_manager):
-    """Reintenta descargar episodios para un programa que quedó vacío o no existe"""
+def _reintentar_descubrimiento(prog_config, programa_manager, config_manager):
+    """Vuelve a descubrir los episodios de un programa sin archivos cuyo descubrimiento falló"""
     url = prog_config["url"]
     name = prog_config["name"]
     max_episodes = prog_config.get('max_episodes', config_manager.get_max_episodes_per_program())
 
     if not programa_manager.is_supported(url):
         print(f"URL no soportada: {url}")
-        return
+        return []
 
     programas = programa_manager.obtener_enlaces_programas(url, program_name=name)
     if not programas:
         print(f"No se encontraron episodios nuevos para '{name}'")
-        return
+        return []
+
+    return _con_salida_youtube(programas[:max_episodes], prog_config, config_manager)
+
 
-    programas = programas[:max_episodes]
+def _con_salida_youtube(programas, program_config, config_manager):
+    """Anota en cada episodio el youtube_output de su programa"""
+    salida = config_manager.get_youtube_output(program_config)
     for programa in programas:
-        programa_manager.obtener_y_descargar_audio(programa)
+        programa["salida_youtube"] = salida
+    return programas
+
+
+def _encabezado_programa(program_config, config_manager):
+    """Imprime la cabecera del programa y devuelve (url, name, max_episodes, cleanup_days)"""
+    url = program_config["url"]
+    name = program_config["name"]
+
+    max_episodes = program_config.get('max_episodes', config_manager.get_max_episodes_per_program())
+    cleanup_days = program_config.get('cleanup_days', config_manager.get_cleanup_days())
+
+    print(f"\n{'='*60}")
+    print(f"Procesando programa: {name}")
+    print(f"URL: {url}")
+    print(f"Max episodios: {max_episodes}")
+    print(f"Limpieza: {PoliticaRetencion.desde_config(config_manager, program_config).describir()}")
+    print(f"{'='*60}")
+
+    return url, name, max_episodes, cleanup_days
+
+
+def limpiar_programa(name, politica, config_manager, directorio, manifest=None):
+    """Aplica la política de retención a la carpeta de un programa"""
+    if not config_manager.should_cleanup_old_files():
+        return
+
+    nombre_carpeta = limpiar_nombre_archivo(name)
+    program_dir = Path(directorio) / nombre_carpeta
+
+    if program_dir.exists():
+        print(f"\nLimpiando archivos de '{name}' ({politica.describir()})...")
+        resultado = aplicar_retencion(program_dir, politica, manifest)
+        if resultado.eliminados:
+            print(f"Archivos eliminados: {resultado.eliminados} ({_mb(resultado.bytes_liberados)} liberados)")
+        else:
+            print(f"No hay archivos para eliminar")
+    else:
+        print(f"Carpeta no existe aún: {program_dir}")
+
+
+def descubrir_programa(program_config, programa_manager, config_manager):
+    """Obtiene los episodios (hasta max_episodes) de un programa configurado (None si falló)"""
+    url, name, max_episodes, cleanup_days = _encabezado_programa(program_config, config_manager)
+
+    if not programa_manager.is_supported(url):
+        print(f"URL no soportada para {name}: {url}")
+        return []
+
+    programas = programa_manager.obtener_enlaces_programas(url, program_name=name)
+    if programas is None:
+        return None
+
+    return _con_salida_youtube(programas[:max_episodes], program_config, config_manager)
+
 
+async def descubrir_programa_async(program_config, async_manager, config_manager):
+    """Versión async de descubrir_programa para el modo --async"""
+    url, name, max_episodes, cleanup_days = _encabezado_programa(program_config, config_manager)
+
+    if not async_manager.programa_manager.is_supported(url):
+        print(f"URL no soportada para {name}: {url}")
+        return []
+
+    programas = await async_manager.obtener_enlaces_programas(url, program_name=name)
+    if programas is None:
+        return None
+
+    return _con_salida_youtube(programas[:max_episodes], program_config, config_manager)
+
+
+def _mb(tamano):
+    return f"{tamano / 1024 / 1024:.1f} MB" if tamano else "tamaño desconocido"
+
+
+def _resumen_plan(plan, politica):
+    """Imprime el orden de descarga decidido por la política"""
+    print(f"\n{'='*60}")
+    print(f"Plan de descarga ({politica}): {len(plan)} episodio(s)")
+    print(f"{'='*60}")
+    for i, programa in enumerate(plan, 1):
+        print(f"{i:>3}. [{programa['nombre_programa']}] {programa['titulo']} ({_mb(programa.get('tamano'))})")
+
+
+class _Finalizador:
+    """Marca y limpieza de cada programa en cuanto termina su último episodio"""
+
+    def __init__(self, programas_config, descubiertos, programa_manager, config_manager, directorio):
+        self.programa_manager = programa_manager
+        self.config_manager = config_manager
+        self.directorio = directorio
+        self.episodios = {}
+        self.politicas = {}
+        for program_config, programas in zip(programas_config, descubiertos):
+            name = program_config["name"]
+            self.episodios[name] = programas or []
+            self.politicas[name] = PoliticaRetencion.desde_config(config_manager, program_config)
+
+    def sin_pendientes(self, plan):
+        """Programas que no tienen nada que descargar en el plan"""
+        pendientes = {programa["nombre_programa"] for programa in plan}
+        return [name for name in self.episodios if name not in pendientes]
+
+    def __call__(self, name):
+        # Los audios de YouTube pueden seguir convirtiéndose: la marca y la
+        # limpieza esperan a que el programa quede completo en disco
+        get_postprocesador().cuando_termine(name, lambda: self._finalizar(name))
+
+    def _finalizar(self, name):
+        self.programa_manager.actualizar_marca(self.episodios.get(name, []))
+        if name in self.politicas:
+            with self.programa_manager.perfilar(name, "limpieza"):
+                limpiar_programa(
+                    name, self.politicas[name], self.config_manager, self.directorio, self.programa_manager.manifest
+                )
+
+
+def procesar_programas(programas_config, programa_manager, config_manager, directorio, max_workers, politica):
+    """Descubre los episodios de todos los programas y los descarga según la política
+
+    1. descubrimiento de episodios de cada programa (en paralelo)
+    2. pre-flight: URL de audio y tamaño de cada episodio pendiente
+    3. planificación global (p.ej. los más cortos primero)
+    4. descarga; cada programa se finaliza (marca + limpieza) al terminar su último episodio
+    """
+    metricas = get_metricas()
+    with metricas.cronometro("autoradio_phase_seconds", fase="descubrimiento"):
+        descubiertos = ejecutar_en_paralelo(
+            lambda program_config: descubrir_programa(program_config, programa_manager, config_manager),
+            programas_config,
+            max_workers,
+        )
+    episodios = [programa for programas in descubiertos if programas for programa in programas]
+
+    with metricas.cronometro("autoradio_phase_seconds", fase="preparacion"):
+        pendientes = programa_manager.preparar_episodios(episodios)
+    plan = planificar(pendientes, politica)
+    _resumen_plan(plan, politica)
+
+    finalizar = _Finalizador(programas_config, descubiertos, programa_manager, config_manager, directorio)
+    for name in finalizar.sin_pendientes(plan):
+        finalizar(name)
+
+    with metricas.cronometro("autoradio_phase_seconds", fase="descarga"):
+        programa_manager.descargar_en_orden(plan, finalizar)
+
+    return descubiertos
+
+
+async def procesar_programas_async(programas_config, async_manager, config_manager, directorio, politica):
+    """Versión async de procesar_programas: todo en un único event loop"""
+    programa_manager = async_manager.programa_manager
+    metricas = get_metricas()
+    with metricas.cronometro("autoradio_phase_seconds", fase="descubrimiento"):
+        descubiertos = await asyncio.gather(*(
+            descubrir_programa_async(program_config, async_manager, config_manager)
+            for program_config in programas_config
+        ))
+    episodios = [programa for programas in descubiertos if programas for programa in programas]
+
+    with metricas.cronometro("autoradio_phase_seconds", fase="preparacion"):
+        pendientes = await async_manager.preparar_episodios(episodios)
+    plan = planificar(pendientes, politica)
+    _resumen_plan(plan, politica)
+
+    finalizar = _Finalizador(programas_config, descubiertos, programa_manager, config_manager, directorio)
+    for name in finalizar.sin_pendientes(plan):
+        await asyncio.to_thread(finalizar, name)
+
+    with metricas.cronometro("autoradio_phase_seconds", fase="descarga"):
+        await async_manager.descargar_en_orden(plan, finalizar)
+
+    return descubiertos
+
+
+def procesar_url(url, programa_manager, config_manager):
+    """Descarga los episodios de una URL tomada de PROGRAMAS_URL"""
+    url = url.strip()
+    if url and programa_manager.is_supported(url):
+        print(f"\nProcesando: {url}")
+        programas = programa_manager.obtener_enlaces_programas(url) or []
+
+        max_episodes = config_manager.get_max_episodes_per_program()
+        programas = _con_salida_youtube(programas[:max_episodes], None, config_manager)
+
+        programa_manager.descargar_episodios(programas)
+        programa_manager.actualizar_marca(programas)
+    else:
+        print(f"URL no soportada o vacía: {url}")
+
+
+def ejecutar_en_paralelo(funcion, elementos, max_workers):
+    """Aplica funcion a cada elemento usando hasta max_workers hilos
+
+    Devuelve los resultados en el orden de elementos (None si falló).
+    """
+    if max_workers <= 1 or len(elementos) <= 1:
+        return [funcion(elemento) for elemento in elementos]
+
+    resultados = [None] * len(elementos)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="programa") as executor:
+        futures = {executor.submit(funcion, elemento): i for i, elemento in enumerate(elementos)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                resultados[i] = future.result()
+            except Exception as e:
+                print(f"Error inesperado procesando {elementos[i]}: {e}")
+    return resultados
+
+
+def exportar_metricas(config_manager, inicio):
+    """Guarda las métricas de la ejecución como JSON y como textfile de Prometheus"""
+    metricas = get_metricas()
+    metricas.fijar("autoradio_run_seconds", time.perf_counter() - inicio)
+    metricas.fijar("autoradio_last_run_timestamp_seconds", time.time())
+
+    directorio = config_manager.get_metrics_directory() or get_cache_dir() / "metricas"
+    try:
+        ruta_json, ruta_prometheus = metricas.exportar(directorio)
+        print(f"Métricas: {ruta_json} / {ruta_prometheus}")
+    except OSError as e:
+        print(f"Error guardando métricas en {directorio}: {e}")
+
+
+def get_max_workers(args, config_manager):
+    """Resuelve el número de workers: CLI > MAX_WORKERS > configuración"""
+    if args.workers is not None:
+        return max(1, args.workers)
+
+    env_workers = os.getenv("MAX_WORKERS")
+    if env_workers:
+        try:
+            return max(1, int(env_workers))
+        except ValueError:
+            print(f"MAX_WORKERS inválido: {env_workers}")
+
+    return max(1, int(config_manager.get_max_workers()))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Descargar episodios de programas de radio")
+    parser.add_argument('--config', default=None,
+                        help='Archivo de configuración (por defecto: config/radio_programs.json)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Programas y episodios procesados en paralelo (1 = secuencial)')
+    parser.add_argument('--async', dest='usar_async', action='store_true',
+                        help='Usar el motor asyncio (--workers fija la concurrencia)')
+    parser.add_argument('--no-cache', dest='usar_cache', action='store_false',
+                        help='Descargar feeds y páginas completos sin GET condicional')
+    parser.add_argument('--profile', nargs='?', const='perfil', default=None, metavar='DIR',
+                        help='Perfilar cada programa (secuencial) y escribir los reportes en DIR (por defecto: perfil)')
+    parser.add_argument('--policy', choices=sorted(POLITICAS), default=None,
+                        help='Orden de descarga: shortest, largest, fair (por programa) o feed')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    inicio = time.perf_counter()
+    args = parse_args(argv)
 
-def main():
     load_dotenv()
 
-    config_manager = ConfigManager()
+    config_manager = ConfigManager(args.config)
 
     directorio = os.getenv("DIRECTORIO") or config_manager.get_download_directory()
-    programa_manager = ProgramaManager(directorio_base=directorio)
+    set_cache_dir(config_manager.get_cache_directory())
+    set_http_cache_enabled(args.usar_cache and config_manager.should_use_http_cache())
+    configure_pools(config_manager.get_http_pool_maxsize(), config_manager.get_http_pool_sizes())
+    configurar_postproceso(config_manager.get_postprocess_workers())
+    max_workers = get_max_workers(args, config_manager)
+    politica = args.policy or config_manager.get_download_policy()
+    if args.usar_async and not AIOHTTP_DISPONIBLE:
+        print("--async necesita aiohttp (pip install aiohttp): se usa el motor con hilos")
+        args.usar_async = False
+    perfilador = None
+    if args.profile:
+        # Los perfiladores no pueden solaparse: se procesa un programa/episodio a la vez
+        perfilador = Perfilador(args.profile)
+        max_workers = 1
+        if args.usar_async:
+            print("--profile usa el motor secuencial (se ignora --async)")
+            args.usar_async = False
+
+    manifest = DownloadManifest(config_manager.get_manifest_file() or get_cache_dir() / "descargas.sqlite3")
+    programa_manager = ProgramaManager(
+        directorio_base=directorio, max_workers=max_workers, manifest=manifest, perfilador=perfilador
+    )
 
     enabled_programs = config_manager.get_enabled_programs()
+    descubiertos = None
 
     if not enabled_programs:
         print("No hay programas habilitados en la configuración.")
@@ -105,77 +441,63 @@ def main():
         programas_urls_env = os.getenv("PROGRAMAS_URL")
         if programas_urls_env:
             programas_urls = programas_urls_env.split(';')
-            for url in programas_urls:
-                url = url.strip()
-                if url and programa_manager.is_supported(url):
-                    print(f"\nProcesando: {url}")
-                    programas = programa_manager.obtener_enlaces_programas(url)
-
-                    max_episodes = config_manager.get_max_episodes_per_program()
-                    programas = programas[:max_episodes]
-
-                    for programa in programas:
-                        programa_manager.obtener_y_descargar_audio(programa)
-                else:
-                    print(f"URL no soportada o vacía: {url}")
+            ejecutar_en_paralelo(
+                lambda url: procesar_url(url, programa_manager, config_manager),
+                programas_urls,
+                max_workers,
+            )
 
         if config_manager.should_cleanup_old_files():
-            cleanup_days = config_manager.get_cleanup_days()
+            politica_retencion = PoliticaRetencion.desde_config(config_manager)
             print(f"\n{'='*60}")
-            print(f"Limpiando archivos antiguos (≥{cleanup_days} días)")
+            print(f"Limpiando archivos antiguos ({politica_retencion.describir()})")
             print(f"{'='*60}")
-            removed = borrar_archivos_viejos(directorio, cleanup_days)
-            if removed and removed > 0:
-                print(f"Archivos eliminados: {removed}")
+            resultado = aplicar_retencion(directorio, politica_retencion, manifest)
+            if resultado.eliminados:
+                print(f"Archivos eliminados: {resultado.eliminados} ({_mb(resultado.bytes_liberados)} liberados)")
     else:
-        print(f"Procesando {len(enabled_programs)} programa(s) habilitado(s)\n")
-
-        for program_config in enabled_programs:
-            url = program_config["url"]
-            name = program_config["name"]
-
-            max_episodes = program_config.get('max_episodes', config_manager.get_max_episodes_per_program())
-            cleanup_days = program_config.get('cleanup_days', config_manager.get_cleanup_days())
-
-            print(f"\n{'='*60}")
-            print(f"Procesando programa: {name}")
-            print(f"URL: {url}")
-            print(f"Max episodios: {max_episodes}")
-            print(f"Limpieza después de: {cleanup_days} días")
-            print(f"{'='*60}")
-
-            if programa_manager.is_supported(url):
-                programas = programa_manager.obtener_enlaces_programas(url, program_name=name)
-
-                programas = programas[:max_episodes]
-
-                for programa in programas:
-                    programa_manager.obtener_y_descargar_audio(programa)
-
-                if config_manager.should_cleanup_old_files():
-                    nombre_carpeta = limpiar_nombre_archivo(name)
-                    program_dir = Path(directorio) / nombre_carpeta
-
-                    if program_dir.exists():
-                        print(f"\nLimpiando archivos de '{name}' (≥{cleanup_days} días)...")
-                        removed = borrar_archivos_viejos(str(program_dir), cleanup_days)
-                        if removed and removed > 0:
-                            print(f"Archivos eliminados: {removed}")
-                        elif removed == 0:
-                            print(f"No hay archivos para eliminar")
-                    else:
-                        print(f"Carpeta no existe aún: {program_dir}")
-            else:
-                print(f"URL no soportada para {name}: {url}")
-
-    verificar_descargas(directorio, enabled_programs, programa_manager, config_manager)
+        print(f"Procesando {len(enabled_programs)} programa(s) habilitado(s)")
+        if args.usar_async:
+            print(f"Modo asyncio: concurrencia {max_workers}")
+        elif max_workers > 1:
+            print(f"Modo paralelo: {max_workers} workers")
+        print(f"Política de descarga: {politica}")
+        print()
+
+        if args.usar_async:
+            async_manager = AsyncProgramaManager(programa_manager, max_concurrencia=max_workers)
+            descubiertos = async_manager.run(
+                procesar_programas_async(enabled_programs, async_manager, config_manager, directorio, politica)
+            )
+        else:
+            descubiertos = procesar_programas(
+                enabled_programs, programa_manager, config_manager, directorio, max_workers, politica
+            )
+
+    # Las conversiones pendientes terminan antes de verificar lo que hay en disco
+    cerrar_postproceso()
+    with get_metricas().cronometro("autoradio_phase_seconds", fase="verificacion"):
+        verificar_descargas(
+            directorio, enabled_programs, descubiertos, programa_manager, config_manager, max_workers
+        )
+
+    programa_manager.cerrar()
+    cerrar_postproceso()
+    close_sessions()
+    cerrar_ytdlp()
+    manifest.cerrar()
 
     print("\n" + "="*60)
     print("¡Proceso completado!")
     print(f"Directorio: {directorio}")
     print(f"Dominios soportados: {len(programa_manager.get_supported_domains())}")
+    exportar_metricas(config_manager, inicio)
+    if perfilador:
+        print(f"Perfiles por programa: {perfilador.escribir()}")
     print("="*60)
 
 
 if __name__ == '__main__':
+    # El pool de postproceso usa procesos: necesario en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
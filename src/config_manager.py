@@ -37,7 +37,20 @@ class ConfigManager:
                 "download_directory": "programas",
                 "max_episodes_per_program": 5,
                 "cleanup_old_files": True,
-                "cleanup_days": 30
+                "cleanup_days": 30,
+                "max_workers": 1,
+                "cache_directory": "cache",
+                "http_cache": True,
+                "http_pool_maxsize": 10,
+                "http_pool_sizes": {},
+                "manifest_file": None,
+                "download_policy": "shortest",
+                "metrics_directory": None,
+                "youtube_output": "m4a",
+                "postprocess_workers": None,
+                "max_files": None,
+                "max_size_mb": None,
+                "keep_newest": 0
             }
         }
     
@@ -154,4 +167,59 @@ class ConfigManager:
     
     def get_cleanup_days(self) -> int:
         """Get number of days after which files should be cleaned up (default global value)"""
-        return self.get_setting("cleanup_days", 30)
\ No newline at end of file
+        return self.get_setting("cleanup_days", 30)
+    
+    def get_max_workers(self) -> int:
+        """Get number of programs/episodes processed in parallel (1 = serial)"""
+        return self.get_setting("max_workers", 1)
+    
+    def get_cache_directory(self) -> str:
+        """Get directory for persistent caches (HTTP cache, scraper state)"""
+        return self.get_setting("cache_directory", "cache")
+    
+    def should_use_http_cache(self) -> bool:
+        """Check if feeds/pages should be fetched with conditional GETs"""
+        return self.get_setting("http_cache", True)
+    
+    def get_http_pool_maxsize(self) -> int:
+        """Get default connection pool size per host"""
+        return self.get_setting("http_pool_maxsize", 10)
+    
+    def get_http_pool_sizes(self) -> Dict[str, int]:
+        """Get per-host connection pool size overrides"""
+        return self.get_setting("http_pool_sizes", {})
+    
+    def get_manifest_file(self) -> str:
+        """Get path of the download manifest (None = <cache_directory>/descargas.sqlite3)"""
+        return self.get_setting("manifest_file")
+    
+    def get_download_policy(self) -> str:
+        """Get download scheduling policy (shortest, largest, fair, feed)"""
+        return self.get_setting("download_policy", "shortest")
+    
+    def get_metrics_directory(self) -> str:
+        """Get directory for the run metrics export (None = <cache_directory>/metricas)"""
+        return self.get_setting("metrics_directory")
+    
+    def get_youtube_output(self, program: Dict[str, Any] = None) -> str:
+        """Get what to do with YouTube audio (m4a, remux, mp3); a program's youtube_output wins"""
+        if program and program.get("youtube_output"):
+            return program["youtube_output"]
+        return self.get_setting("youtube_output", "m4a")
+    
+    def get_postprocess_workers(self) -> int:
+        """Get size of the ffmpeg process pool (None = number of cores)"""
+        return self.get_setting("postprocess_workers")
+    
+    def get_retention(self, program: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Get retention rules (cleanup_days, max_files, max_size_mb, keep_newest); a program's own keys win"""
+        reglas = {
+            "cleanup_days": self.get_cleanup_days(),
+            "max_files": self.get_setting("max_files"),
+            "max_size_mb": self.get_setting("max_size_mb"),
+            "keep_newest": self.get_setting("keep_newest", 0),
+        }
+        for clave in reglas:
+            if program and program.get(clave) is not None:
+                reglas[clave] = program[clave]
+        return reglas
\ No newline at end of file
@@ -1,15 +1,69 @@
+import asyncio
+import http.client
+import json
+import socket
+import threading
 import time
 import os
 import sys
 from pathlib import Path
+from urllib.parse import urlparse
 import requests
 from src.limpiarNombreArchivo import limpiar_nombre_archivo
+from src.http_session import get_session
+from src.http_session_async import abrir, solicitar
+from src.metricas import MBPS_BUCKETS, get_metricas
+from src.postproceso import (
+    SALIDAS_YOUTUBE, SUFIJO_DESCARGA, buscar_audio, get_postprocesador, necesita_ffmpeg, salida_youtube,
+)
+from src.ytdlp_sesion import get_ytdlp
 
 
 MAX_RETRIES = 5
 BASE_TIMEOUT = 60
 LARGE_FILE_TIMEOUT = 300
 RETRY_BASE_DELAY = 5
+PARTIAL_SUFFIX = ".part"
+BUFFER_SIZE = 256 * 1024
+PROGRESS_INTERVAL = 5
+
+# Mensaje de cada motivo de reintento (el resto: "Error al descargar el audio")
+MENSAJES_ERROR = {
+    "timeout": "Timeout agotado",
+    "conexion": "Error de conexión",
+    "incompleta": "Descarga incompleta",
+    "parcial": "El archivo parcial no coincide con el servidor",
+}
+
+_buffers = threading.local()
+
+
+class DescargaIncompletaError(requests.exceptions.RequestException):
+    """La conexión terminó antes de recibir todo el Content-Length"""
+
+
+class RespuestaInesperadaError(requests.exceptions.RequestException):
+    """El servidor respondió algo que no es el audio (estado HTTP o Range inválido)"""
+
+    def __init__(self, mensaje, motivo, codigo=None):
+        super().__init__(mensaje)
+        self.motivo = motivo
+        self.codigo = codigo
+
+
+class DescargaReintentable(Exception):
+    """Intento fallido que se puede repetir a partir de no_antes_de (time.monotonic)
+
+    Quien llamó a intentar_descarga decide cuándo repetirlo, en lugar de
+    dormir en el hilo de la descarga.
+    """
+
+    def __init__(self, motivo, intento, espera):
+        super().__init__(f"{motivo}: reintento {intento + 1}/{MAX_RETRIES} en {espera}s")
+        self.motivo = motivo
+        self.intento = intento
+        self.espera = espera
+        self.no_antes_de = time.monotonic() + espera
 
 
 def get_resource_path(relative_path):
@@ -21,7 +75,104 @@ def get_resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
-def descargar_audio(audio_url, nombre_programa, titulo, directorio_base=None):
+def descargar_audio(audio_url, nombre_programa, titulo, directorio_base=None, salida_youtube=None):
+    """Descarga el audio de un episodio, reintentando en el mismo hilo.
+
+    Para usos sueltos: ProgramaManager y AsyncProgramaManager llaman a
+    intentar_descarga y devuelven los reintentos a su planificador, así que
+    la espera entre intentos no bloquea otras descargas.
+    """
+    intento = 0
+    while True:
+        try:
+            return intentar_descarga(audio_url, nombre_programa, titulo, directorio_base, salida_youtube, intento)
+        except DescargaReintentable as reintento:
+            time.sleep(reintento.espera)
+            intento = reintento.intento
+
+
+def intentar_descarga(audio_url, nombre_programa, titulo, directorio_base=None, salida_youtube=None, intento=0):
+    """Un intento de descarga del audio de un episodio.
+
+    salida_youtube (m4a, remux o mp3) decide el formato de los videos de
+    YouTube; el resto de los audios se guardan tal cual como .mp3.
+
+    intento es el número de intento (desde 0). Si falla la transferencia y
+    quedan intentos, lanza DescargaReintentable con la espera que corresponde
+    (RETRY_BASE_DELAY * 2**intento); el .part queda para reanudar. Un estado
+    4xx (salvo 408 y 429) no se reintenta.
+
+    Returns:
+        Path del archivo descargado (o ya existente), None si falló, o un
+        Future con el Path final si el audio de YouTube quedó convirtiéndose.
+    """
+    ruta_archivo = _ruta_destino(nombre_programa, titulo, directorio_base)
+
+    metricas = get_metricas()
+
+    existente = _ya_existe(ruta_archivo, nombre_programa)
+    if existente:
+        return existente
+
+    if _es_youtube(audio_url):
+        with metricas.cronometro("autoradio_download_seconds", programa=nombre_programa, origen="youtube"):
+            ruta = _descargar_youtube(audio_url, ruta_archivo, titulo, salida_youtube, nombre_programa)
+        metricas.incrementar("autoradio_downloads_total", programa=nombre_programa,
+                             resultado="ok" if ruta else "error")
+        return ruta
+
+    if audio_url == "generate_local_audio":
+        print(f"Generando audio local para: {titulo}")
+        _generate_local_audio_file(ruta_archivo, titulo)
+        metricas.incrementar("autoradio_downloads_total", programa=nombre_programa, resultado="local")
+        return ruta_archivo
+
+    is_large_file, timeout = _timeout_descarga(audio_url, nombre_programa)
+
+    inicio = time.perf_counter()
+    try:
+        downloaded = _transferir(audio_url, nombre_programa, ruta_archivo, timeout)
+    except requests.exceptions.RequestException as e:
+        return _intento_fallido(e, nombre_programa, titulo, intento, inicio)
+
+    return _intento_completo(ruta_archivo, nombre_programa, downloaded, intento, inicio, is_large_file)
+
+
+async def intentar_descarga_async(audio_url, nombre_programa, titulo, directorio_base=None, salida_youtube=None,
+                                  intento=0):
+    """Versión async de intentar_descarga (mismos reintentos y resultado)
+
+    La transferencia HTTP va por aiohttp en el event loop. YouTube (yt-dlp)
+    y el audio local no tienen cliente async: pasan a intentar_descarga en
+    un hilo.
+    """
+    if _es_youtube(audio_url) or audio_url == "generate_local_audio":
+        return await asyncio.to_thread(
+            intentar_descarga, audio_url, nombre_programa, titulo, directorio_base, salida_youtube, intento
+        )
+
+    ruta_archivo = _ruta_destino(nombre_programa, titulo, directorio_base)
+    existente = _ya_existe(ruta_archivo, nombre_programa)
+    if existente:
+        return existente
+
+    is_large_file, timeout = _timeout_descarga(audio_url, nombre_programa)
+
+    inicio = time.perf_counter()
+    try:
+        downloaded = await _transferir_async(audio_url, nombre_programa, ruta_archivo, timeout)
+    except requests.exceptions.RequestException as e:
+        return _intento_fallido(e, nombre_programa, titulo, intento, inicio)
+
+    return _intento_completo(ruta_archivo, nombre_programa, downloaded, intento, inicio, is_large_file)
+
+
+def _es_youtube(audio_url):
+    return 'youtube.com' in audio_url or 'youtu.be' in audio_url
+
+
+def _ruta_destino(nombre_programa, titulo, directorio_base):
+    """Ruta .mp3 del episodio dentro de la carpeta de su programa (que se crea si falta)"""
     if directorio_base:
         carpeta_base = Path(directorio_base)
     else:
@@ -30,150 +181,437 @@ def descargar_audio(audio_url, nombre_programa, titulo, directorio_base=None):
     carpeta_programa = carpeta_base / limpiar_nombre_archivo(nombre_programa)
     carpeta_programa.mkdir(parents=True, exist_ok=True)
 
-    ruta_archivo = carpeta_programa / f"{limpiar_nombre_archivo(titulo)}.mp3"
+    return carpeta_programa / f"{limpiar_nombre_archivo(titulo)}.mp3"
 
-    if ruta_archivo.exists():
-        print(f"El archivo ya existe: {ruta_archivo}. Se omite la descarga.")
-        return
 
-    if 'youtube.com' in audio_url or 'youtu.be' in audio_url:
-        return _descargar_youtube(audio_url, ruta_archivo, titulo)
+def _ya_existe(ruta_archivo, nombre_programa):
+    """Audio ya descargado para ruta_archivo (con cualquier extensión), o None"""
+    existente = buscar_audio(ruta_archivo)
+    if existente:
+        print(f"El archivo ya existe: {existente}. Se omite la descarga.")
+        get_metricas().incrementar("autoradio_downloads_total", programa=nombre_programa, resultado="existente")
+    return existente
 
-    if audio_url == "generate_local_audio":
-        print(f"Generando audio local para: {titulo}")
-        _generate_local_audio_file(ruta_archivo, titulo)
-        return
 
+def _timeout_descarga(audio_url, nombre_programa):
+    """(si es un archivo grande, timeout de conexión y lectura)"""
     is_large_file = 'podbean.com' in audio_url or 'sabiduria' in nombre_programa.lower()
-    timeout = LARGE_FILE_TIMEOUT if is_large_file else BASE_TIMEOUT
+    return is_large_file, LARGE_FILE_TIMEOUT if is_large_file else BASE_TIMEOUT
 
-    for intento in range(MAX_RETRIES):
-        try:
-            print(f"Descargando audio desde: {audio_url}")
-
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'audio/webm,audio/ogg,audio/wav,audio/*;q=0.9,*/*;q=0.5',
-                'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-                'Connection': 'keep-alive',
-                'Accept-Encoding': 'identity',
-            }
-
-            response = requests.get(audio_url, stream=True, timeout=timeout, headers=headers, allow_redirects=True)
-
-            if response.status_code == 200:
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded = 0
-
-                with ruta_archivo.open("wb") as f:
-                    chunk_size = 131072 if is_large_file else 65536
-
-                    for chunk in response.iter_content(chunk_size=chunk_size):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-
-                            if total_size > 0 and is_large_file:
-                                progress = (downloaded / total_size) * 100
-                                if downloaded % (5 * 1024 * 1024) < chunk_size:
-                                    print(f"Progreso: {progress:.1f}% ({downloaded // 1024 // 1024} MB / {total_size // 1024 // 1024} MB)")
-                            elif total_size > 0 and not is_large_file:
-                                progress = (downloaded / total_size) * 100
-                                if downloaded % (2 * 1024 * 1024) < chunk_size:
-                                    print(f"Progreso: {progress:.1f}% ({downloaded // 1024 // 1024} MB / {total_size // 1024 // 1024} MB)")
-
-                if is_large_file:
-                    print(f"Audio grande guardado en: {ruta_archivo}")
-                    print(f"Tamaño: {downloaded // 1024 // 1024} MB")
-                else:
-                    print(f"Audio guardado en: {ruta_archivo}")
-                return
-
-            print(f"Error al descargar el audio: {response.status_code}")
-
-        except requests.exceptions.Timeout as e:
-            espera = RETRY_BASE_DELAY * (2 ** intento)
-            print(f"Timeout agotado (intento {intento + 1}/{MAX_RETRIES}): {e}")
-            if intento < MAX_RETRIES - 1:
-                print(f"Reintentando en {espera}s...")
-                time.sleep(espera)
-
-        except requests.exceptions.ConnectionError as e:
-            espera = RETRY_BASE_DELAY * (2 ** intento)
-            print(f"Error de conexión (intento {intento + 1}/{MAX_RETRIES}): {e}")
-            if intento < MAX_RETRIES - 1:
-                print(f"Reintentando en {espera}s...")
-                time.sleep(espera)
-
-        except requests.exceptions.RequestException as e:
-            espera = RETRY_BASE_DELAY * (2 ** intento)
-            print(f"Error de conexión (intento {intento + 1}/{MAX_RETRIES}): {e}")
-            if intento < MAX_RETRIES - 1:
-                print(f"Reintentando en {espera}s...")
-                time.sleep(espera)
+
+def _intento_fallido(e, nombre_programa, titulo, intento, inicio):
+    """Métricas y mensaje de una transferencia fallida
+
+    Lanza DescargaReintentable si se puede repetir; si no, devuelve None.
+    """
+    metricas = get_metricas()
+    motivo = _motivo(e)
+    metricas.observar("autoradio_download_attempt_seconds", time.perf_counter() - inicio,
+                      programa=nombre_programa, resultado=motivo)
+    if not _reintentable(e):
+        print(f"{MENSAJES_ERROR.get(motivo, 'Error al descargar el audio')}: {e}. No se reintenta: {titulo}")
+        metricas.incrementar("autoradio_downloads_total", programa=nombre_programa, resultado="error")
+        return None
+
+    metricas.incrementar("autoradio_download_retries_total", programa=nombre_programa, motivo=motivo)
+    print(f"{MENSAJES_ERROR.get(motivo, 'Error al descargar el audio')} (intento {intento + 1}/{MAX_RETRIES}): {e}")
+    if intento < MAX_RETRIES - 1:
+        # Un parcial que no coincide con el servidor se descarta y se repite enseguida
+        espera = 0 if motivo == "parcial" else RETRY_BASE_DELAY * (2 ** intento)
+        print(f"Reintentando en {espera}s...")
+        raise DescargaReintentable(motivo, intento + 1, espera) from e
 
     print(f"Se alcanzó el número máximo de intentos ({MAX_RETRIES}). No se pudo descargar: {titulo}")
+    metricas.incrementar("autoradio_downloads_total", programa=nombre_programa, resultado="error")
+    metricas.incrementar("autoradio_download_retry_outcomes_total", programa=nombre_programa, resultado="agotado")
     return None
 
 
-def _descargar_youtube(video_url, ruta_archivo, titulo):
-    """Descarga audio desde YouTube usando yt-dlp"""
+def _intento_completo(ruta_archivo, nombre_programa, downloaded, intento, inicio, is_large_file):
+    """Métricas y mensaje de una transferencia terminada; devuelve ruta_archivo"""
+    metricas = get_metricas()
+    segundos = time.perf_counter() - inicio
+    metricas.observar("autoradio_download_attempt_seconds", segundos, programa=nombre_programa, resultado="ok")
+    metricas.observar("autoradio_download_seconds", segundos, programa=nombre_programa, origen="http")
+    metricas.incrementar("autoradio_downloads_total", programa=nombre_programa, resultado="ok")
+    if intento:
+        metricas.incrementar("autoradio_download_retry_outcomes_total", programa=nombre_programa, resultado="recuperada")
+
+    if is_large_file:
+        print(f"Audio grande guardado en: {ruta_archivo}")
+        print(f"Tamaño: {downloaded // 1024 // 1024} MB")
+    else:
+        print(f"Audio guardado en: {ruta_archivo}")
+    return ruta_archivo
+
+
+def _motivo(error):
+    """Etiqueta del motivo de un intento fallido para las métricas"""
+    if isinstance(error, requests.exceptions.Timeout):
+        return "timeout"
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return "conexion"
+    if isinstance(error, DescargaIncompletaError):
+        return "incompleta"
+    if isinstance(error, RespuestaInesperadaError):
+        return error.motivo
+    return "http"
+
+
+def _reintentable(error):
+    """Los 4xx (salvo 408 y 429) no cambian al repetir la petición"""
+    codigo = getattr(error, "codigo", None)
+    return not (codigo and 400 <= codigo < 500 and codigo not in (408, 429))
+
+
+def _transferir(audio_url, nombre_programa, ruta_archivo, timeout):
+    """Una petición HTTP del audio a ruta_archivo; devuelve los bytes del archivo
+
+    La descarga se escribe en un .part y solo se renombra al .mp3 final
+    cuando está completa, así un corte nunca deja un .mp3 truncado.
+    """
+    ruta_parcial, ruta_meta = _rutas_parciales(ruta_archivo)
+
+    print(f"Descargando audio desde: {audio_url}")
+
+    offset, meta = _preparar_reanudacion(ruta_parcial, ruta_meta, audio_url)
+    headers = _cabeceras_descarga(offset, meta)
+
+    response = get_session(audio_url).get(audio_url, stream=True, timeout=timeout, headers=headers, allow_redirects=True)
+
     try:
-        import yt_dlp
-        
-        print(f"📺 Descargando audio de YouTube: {video_url}")
-        
-        # Buscar cookies.txt en múltiples ubicaciones
-        cookies_paths = [
-            'cookies.txt',  # Directorio actual
-            get_resource_path('cookies.txt'),  # Incluido en PyInstaller
-            os.path.join(os.path.dirname(sys.executable), 'cookies.txt'),  # Junto al .exe
-        ]
-        
-        cookiefile = None
-        for path in cookies_paths:
-            if os.path.exists(path):
-                cookiefile = path
-                print(f"   ✓ Usando cookies: {path}")
+        completo = _comprobar_respuesta(response, offset, meta, ruta_parcial, ruta_meta, ruta_archivo)
+    except RespuestaInesperadaError:
+        response.close()
+        raise
+    if completo is not None:
+        response.close()
+        return completo
+
+    modo, offset, total_size = _modo_escritura(response, offset)
+    _guardar_meta_parcial(ruta_meta, audio_url, response, total_size)
+
+    progreso = _Progreso(total_size, offset)
+    inicio = time.perf_counter()
+    try:
+        with ruta_parcial.open(modo) as f, progreso:
+            copiar_respuesta(response, f, progreso)
+    finally:
+        _registrar_transferencia(audio_url, nombre_programa, progreso.descargado - offset,
+                                 time.perf_counter() - inicio)
+
+    return _completar_parcial(progreso.descargado, total_size, ruta_parcial, ruta_meta, ruta_archivo)
+
+
+async def _transferir_async(audio_url, nombre_programa, ruta_archivo, timeout):
+    """Versión async de _transferir: el cuerpo llega por aiohttp en el event loop"""
+    ruta_parcial, ruta_meta = _rutas_parciales(ruta_archivo)
+
+    print(f"Descargando audio desde: {audio_url}")
+
+    offset, meta = _preparar_reanudacion(ruta_parcial, ruta_meta, audio_url)
+    headers = _cabeceras_descarga(offset, meta)
+
+    async with abrir(audio_url, headers=headers, timeout=timeout) as (response, cuerpo):
+        completo = _comprobar_respuesta(response, offset, meta, ruta_parcial, ruta_meta, ruta_archivo)
+        if completo is not None:
+            return completo
+
+        modo, offset, total_size = _modo_escritura(response, offset)
+        _guardar_meta_parcial(ruta_meta, audio_url, response, total_size)
+
+        # Sin hilo de progreso: se informa entre bloques
+        progreso = _Progreso(total_size, offset, intervalo=0)
+        siguiente_informe = time.monotonic() + PROGRESS_INTERVAL
+        inicio = time.perf_counter()
+        try:
+            with ruta_parcial.open(modo) as f:
+                async for chunk in cuerpo.content.iter_chunked(BUFFER_SIZE):
+                    f.write(chunk)
+                    progreso.descargado += len(chunk)
+                    if time.monotonic() >= siguiente_informe:
+                        progreso.informar()
+                        siguiente_informe += PROGRESS_INTERVAL
+        finally:
+            _registrar_transferencia(audio_url, nombre_programa, progreso.descargado - offset,
+                                     time.perf_counter() - inicio)
+
+    return _completar_parcial(progreso.descargado, total_size, ruta_parcial, ruta_meta, ruta_archivo)
+
+
+def _rutas_parciales(ruta_archivo):
+    """(.part, .part.json) de ruta_archivo"""
+    return (ruta_archivo.with_name(ruta_archivo.name + PARTIAL_SUFFIX),
+            ruta_archivo.with_name(ruta_archivo.name + PARTIAL_SUFFIX + ".json"))
+
+
+def _cabeceras_descarga(offset, meta):
+    """Cabeceras de la petición del audio (con Range/If-Range si se reanuda un .part)"""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'audio/webm,audio/ogg,audio/wav,audio/*;q=0.9,*/*;q=0.5',
+        'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+        'Connection': 'keep-alive',
+        'Accept-Encoding': 'identity',
+    }
+    if offset:
+        headers['Range'] = f"bytes={offset}-"
+        headers['If-Range'] = meta['validador']
+    return headers
+
+
+def _comprobar_respuesta(response, offset, meta, ruta_parcial, ruta_meta, ruta_archivo):
+    """Valida el estado de la respuesta del audio (sin leer el cuerpo)
+
+    Devuelve los bytes del archivo si el .part ya estaba completo (416),
+    None si hay que leer el cuerpo, o lanza RespuestaInesperadaError.
+    """
+    if response.status_code == 416 and offset:
+        # El servidor no tiene más bytes: el parcial puede estar completo
+        if meta.get('total') == offset:
+            _finalizar_parcial(ruta_parcial, ruta_meta, ruta_archivo)
+            return offset
+        _descartar_parcial(ruta_parcial, ruta_meta)
+        raise RespuestaInesperadaError("se descarga desde cero", motivo="parcial")
+
+    if response.status_code not in (200, 206):
+        raise RespuestaInesperadaError(
+            f"HTTP {response.status_code}", motivo=f"http_{response.status_code}", codigo=response.status_code
+        )
+    return None
+
+
+def _modo_escritura(response, offset):
+    """(modo de apertura del .part, offset real, tamaño total) según el estado 200/206"""
+    if response.status_code == 206:
+        print(f"Reanudando descarga desde {offset // 1024 // 1024} MB")
+        return "ab", offset, _tamano_total(response, offset)
+    # 200: el servidor ignoró el Range o el archivo cambió (If-Range)
+    return "wb", 0, int(response.headers.get('content-length', 0))
+
+
+def _completar_parcial(downloaded, total_size, ruta_parcial, ruta_meta, ruta_archivo):
+    """Comprueba que llegó todo y renombra el .part; devuelve los bytes del archivo"""
+    if total_size > 0 and downloaded != total_size:
+        raise DescargaIncompletaError(f"se recibieron {downloaded} de {total_size} bytes")
+
+    _finalizar_parcial(ruta_parcial, ruta_meta, ruta_archivo)
+    return downloaded
+
+
+def _registrar_transferencia(audio_url, nombre_programa, recibidos, segundos):
+    """Bytes, tiempo de transferencia y MB/s efectivos de un intento de descarga"""
+    metricas = get_metricas()
+    host = urlparse(audio_url).netloc.lower()
+    metricas.incrementar("autoradio_download_bytes_total", recibidos, programa=nombre_programa, host=host)
+    metricas.incrementar("autoradio_download_transfer_seconds_total", segundos, programa=nombre_programa, host=host)
+    if recibidos > 0 and segundos > 0:
+        metricas.observar("autoradio_download_mbps", recibidos / 1024 / 1024 / segundos,
+                          buckets=MBPS_BUCKETS, programa=nombre_programa, host=host)
+
+
+class _Progreso:
+    """Informa del progreso de una descarga cada PROGRESS_INTERVAL segundos
+
+    El bucle de copia solo suma bytes a ``descargado``; un hilo aparte
+    imprime el progreso, en lugar de comprobarlo en cada bloque.
+    """
+
+    def __init__(self, total, descargado=0, intervalo=PROGRESS_INTERVAL):
+        self.total = total
+        self.descargado = descargado
+        self._informado = descargado
+        self.intervalo = intervalo
+        self._fin = threading.Event()
+        self._hilo = threading.Thread(target=self._informar, name="progreso", daemon=True)
+
+    def __enter__(self):
+        if self.intervalo:
+            self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._fin.set()
+        if self._hilo.is_alive():
+            self._hilo.join()
+
+    def _informar(self):
+        while not self._fin.wait(self.intervalo):
+            self.informar()
+
+    def informar(self):
+        """Imprime el progreso si avanzó desde el último informe"""
+        descargado = self.descargado
+        if descargado == self._informado:
+            return
+        self._informado = descargado
+        if self.total > 0:
+            progress = (descargado / self.total) * 100
+            print(f"Progreso: {progress:.1f}% ({descargado // 1024 // 1024} MB / {self.total // 1024 // 1024} MB)")
+        else:
+            print(f"Progreso: {descargado // 1024 // 1024} MB")
+
+
+def _buffer():
+    """Buffer de lectura preasignado, reutilizado por todas las descargas del hilo"""
+    vista = getattr(_buffers, 'vista', None)
+    if vista is None:
+        vista = _buffers.vista = memoryview(bytearray(BUFFER_SIZE))
+    return vista
+
+
+def copiar_respuesta(response, f, progreso):
+    """Copia el cuerpo de una respuesta (stream=True) al archivo f
+
+    Lee del socket directamente al buffer preasignado del hilo con readinto
+    y escribe ese mismo buffer al archivo, sin crear un objeto bytes por
+    bloque. Las respuestas comprimidas, que hay que decodificar, usan
+    iter_content.
+    """
+    fp = getattr(response.raw, '_fp', None)
+    codificacion = response.headers.get('Content-Encoding', 'identity').strip().lower()
+    if fp is None or not hasattr(fp, 'readinto') or codificacion not in ('', 'identity'):
+        for chunk in response.iter_content(chunk_size=BUFFER_SIZE):
+            f.write(chunk)
+            progreso.descargado += len(chunk)
+        return
+
+    vista = _buffer()
+    try:
+        while True:
+            try:
+                n = fp.readinto(vista)
+            except socket.timeout as e:
+                raise requests.exceptions.Timeout(e)
+            except (http.client.HTTPException, OSError) as e:
+                raise requests.exceptions.ConnectionError(e)
+            if not n:
                 break
+            f.write(vista[:n])
+            progreso.descargado += n
+    finally:
+        # Cuerpo leído entero: la conexión vuelve al pool; si no, se cierra
+        if fp.isclosed():
+            response.raw.release_conn()
+        else:
+            response.close()
+
+
+def _preparar_reanudacion(ruta_parcial, ruta_meta, audio_url):
+    """Devuelve (offset, meta) para reanudar un .part, o (0, {}) si hay que empezar de cero"""
+    if not ruta_parcial.exists():
+        return 0, {}
+
+    offset = ruta_parcial.stat().st_size
+    try:
+        with ruta_meta.open("r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+
+    # Sin validador no se puede garantizar que los bytes sean del mismo archivo
+    if not offset or meta.get('url') != audio_url or not meta.get('validador'):
+        _descartar_parcial(ruta_parcial, ruta_meta)
+        return 0, {}
+
+    return offset, meta
+
+
+def _guardar_meta_parcial(ruta_meta, audio_url, response, total_size):
+    """Guarda junto al .part los validadores (ETag/Last-Modified) de la respuesta"""
+    etag = response.headers.get('ETag')
+    # If-Range solo admite ETags fuertes
+    validador = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+
+    with ruta_meta.open("w", encoding="utf-8") as f:
+        json.dump({'url': audio_url, 'validador': validador, 'total': total_size}, f)
+
+
+def _tamano_total(response, offset):
+    """Tamaño total del archivo a partir de una respuesta 206"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        if total.isdigit():
+            return int(total)
+
+    content_length = int(response.headers.get('content-length', 0))
+    return offset + content_length if content_length else 0
+
+
+def _finalizar_parcial(ruta_parcial, ruta_meta, ruta_archivo):
+    """Mueve atómicamente el .part completo a su nombre final"""
+    os.replace(ruta_parcial, ruta_archivo)
+    ruta_meta.unlink(missing_ok=True)
+
+
+def _descartar_parcial(ruta_parcial, ruta_meta):
+    ruta_parcial.unlink(missing_ok=True)
+    ruta_meta.unlink(missing_ok=True)
+
+
+def consultar_tamano(audio_url, timeout=10):
+    """Tamaño en bytes de un audio según un HEAD (Content-Length), o None"""
+    if not _consultable(audio_url):
+        return None
+    try:
+        response = get_session(audio_url).head(audio_url, timeout=timeout, allow_redirects=True)
+    except requests.exceptions.RequestException:
+        return None
+    return _tamano_declarado(response)
+
+
+async def consultar_tamano_async(audio_url, timeout=10):
+    """Versión async de consultar_tamano (HEAD por aiohttp)"""
+    if not _consultable(audio_url):
+        return None
+    try:
+        response = await solicitar("HEAD", audio_url, timeout=timeout)
+    except requests.exceptions.RequestException:
+        return None
+    return _tamano_declarado(response)
+
+
+def _consultable(audio_url):
+    return audio_url and audio_url != "generate_local_audio" and not _es_youtube(audio_url)
+
+
+def _tamano_declarado(response):
+    if response.status_code != 200:
+        return None
+    try:
+        return int(response.headers.get('content-length', 0)) or None
+    except ValueError:
+        return None
+
+
+def _descargar_youtube(video_url, ruta_archivo, titulo, salida=None, nombre_programa=None):
+    """Descarga audio desde YouTube con la sesión de yt-dlp compartida
+
+    salida es el youtube_output del programa (m4a, remux o mp3). Con m4a se
+    devuelve la ruta del audio; si hace falta ffmpeg, el archivo descargado
+    pasa al pool de postproceso y se devuelve un Future con la ruta final,
+    sin esperar la conversión.
+    """
+    try:
+        print(f"📺 Descargando audio de YouTube: {video_url}")
         
-        if not cookiefile:
-            print(f"   ⚠️  cookies.txt no encontrado, intentando sin cookies...")
-        
-        # Configuración para yt-dlp
-        ydl_opts = {
-            'format': '140/bestaudio/best',
-            'outtmpl': str(ruta_archivo.with_suffix('')),
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-            'extractor_args': {
-                'youtube': {
-                    'player_client': ['android', 'web'],
-                    'skip': ['hls', 'dash', 'translated_subs'],
-                }
-            },
-            'http_headers': {
-                'User-Agent': 'com.google.android.youtube/19.09.37 (Linux; U; Android 11) gzip',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-us,en;q=0.5',
-                'Sec-Fetch-Mode': 'navigate',
-            },
-            'quiet': False,
-            'no_warnings': False,
-        }
-        
-        # Solo agregar cookies si el archivo existe
-        if cookiefile:
-            ydl_opts['cookiefile'] = cookiefile
+        salida = salida_youtube(salida)
+        destino = ruta_archivo.with_suffix('')
+        convertir = necesita_ffmpeg(salida)
+        plantilla = str(destino) + (SUFIJO_DESCARGA if convertir else '') + '.%(ext)s'
+        ruta = get_ytdlp().descargar(video_url, plantilla, formato=SALIDAS_YOUTUBE[salida])
+        ruta = Path(ruta) if ruta else None
+        if not ruta or not ruta.exists():
+            print(f"✗ yt-dlp terminó sin dejar el audio de {video_url}")
+            return None
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([video_url])
+        if convertir:
+            print(f"⚙️  Audio de YouTube descargado, convirtiendo en segundo plano ({salida}): {ruta}")
+            return get_postprocesador().enviar(nombre_programa, ruta, destino, salida)
         
-        print(f"✅ Audio de YouTube guardado en: {ruta_archivo}")
-        return
+        print(f"✅ Audio de YouTube guardado en: {ruta}")
+        return ruta
         
     except ImportError:
         print("⚠ ERROR: yt-dlp no está instalado")
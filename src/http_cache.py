@@ -0,0 +1,257 @@
+import copy
+import hashlib
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from .http_session_async import solicitar
+
+
+DEFAULT_CACHE_DIR = "cache"
+INDEX_FILE = "index.json"
+
+_cache_dir = None
+_cache_enabled = True
+_http_cache = None
+_http_cache_lock = Lock()
+
+
+def set_cache_dir(directorio):
+    """Set the directory used for persistent caches (HTTP cache, scraper state...)"""
+    global _cache_dir, _http_cache
+    _cache_dir = Path(directorio)
+    with _http_cache_lock:
+        _http_cache = None
+
+
+def set_http_cache_enabled(enabled: bool):
+    """Enable or disable conditional GETs (e.g. --no-cache)"""
+    global _cache_enabled, _http_cache
+    _cache_enabled = enabled
+    with _http_cache_lock:
+        _http_cache = None
+
+
+def get_cache_dir() -> Path:
+    """Directory for persistent caches: CACHE_DIR env > set_cache_dir() > ./cache"""
+    env_dir = os.getenv("CACHE_DIR")
+    if env_dir:
+        return Path(env_dir)
+    return _cache_dir or Path(DEFAULT_CACHE_DIR)
+
+
+def get_http_cache() -> "HttpCache":
+    """Process-wide HTTP cache shared by every scraper"""
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache(get_cache_dir() / "http", enabled=_cache_enabled)
+        return _http_cache
+
+
+class CachedResponse:
+    """Response of a conditional GET
+
+    Behaves like the parts of ``requests.Response`` the scrapers use. When the
+    server answers 304 the body comes from disk and ``status_code`` is 200.
+    ``unchanged`` is True when the body is the same as in the previous run
+    (304 or identical body hash). For streamed responses the body is only
+    read when ``content``/``text``/``iter_content`` is used.
+    """
+
+    def __init__(self, response, url: str, content: bytes = None, encoding: str = None, unchanged: bool = False):
+        self.response = response
+        self.url = url
+        self.headers = response.headers
+        self.unchanged = unchanged
+        self.from_cache = response.status_code == 304
+        self.status_code = 200 if self.from_cache else response.status_code
+        self._content = content
+        self.encoding = encoding if self.from_cache else response.encoding
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            return self.response.content
+        return self._content
+
+    def iter_content(self, chunk_size: int = 16 * 1024):
+        if not self.from_cache:
+            return self.response.iter_content(chunk_size)
+        content = self.content or b''
+        return (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+
+    def close(self):
+        self.response.close()
+
+    @property
+    def text(self) -> str:
+        if not self.from_cache:
+            return self.response.text
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def raise_for_status(self):
+        if not self.from_cache:
+            self.response.raise_for_status()
+
+
+class HttpCache:
+    """Persistent conditional-GET cache
+
+    Stores ETag/Last-Modified, a SHA-256 of the body and the body itself per
+    URL, plus the results scrapers derived from that body, so an unchanged
+    feed or page can skip both the transfer and the parse/extract step.
+    """
+
+    def __init__(self, directorio, enabled: bool = True):
+        self.directorio = Path(directorio)
+        self.enabled = enabled
+        self._lock = Lock()
+        self._index = self._load_index() if enabled else {}
+
+    def _load_index(self) -> Dict[str, Any]:
+        index_file = self.directorio / INDEX_FILE
+        try:
+            if index_file.exists():
+                with open(index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Error leyendo caché HTTP ({index_file}): {e}")
+        return {}
+
+    def _save_index(self):
+        """Write the index atomically (caller holds the lock)"""
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        index_file = self.directorio / INDEX_FILE
+        tmp_file = index_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_file, index_file)
+
+    def _body_path(self, url: str) -> Path:
+        return self.directorio / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.body"
+
+    def get(self, session, url: str, **kwargs) -> CachedResponse:
+        """GET url sending If-None-Match/If-Modified-Since from the previous run
+
+        With ``stream=True`` the body is left unread for the caller (streaming
+        parsers may stop early), so only the validators are stored: a 304 is
+        then only useful to reuse the results derived from the last body.
+        """
+        if not self.enabled:
+            return CachedResponse(session.get(url, **kwargs), url)
+
+        stream = kwargs.get('stream', False)
+        request_headers = kwargs.pop('headers', None)
+        entry, headers = self._condicional(url, request_headers, stream)
+        response = session.get(url, headers=headers or None, **kwargs)
+        cached = self._procesar(url, entry, response, stream)
+        if cached is None:
+            return self.get(session, url, headers=request_headers, **kwargs)
+        return cached
+
+    async def get_async(self, url: str, headers: Dict[str, str] = None, timeout: float = 30) -> CachedResponse:
+        """Async counterpart of get over aiohttp (the whole body is read, like without stream)"""
+        if not self.enabled:
+            return CachedResponse(await solicitar("GET", url, headers=headers, timeout=timeout), url)
+
+        entry, condicionales = self._condicional(url, headers, False)
+        response = await solicitar("GET", url, headers=condicionales or None, timeout=timeout)
+        cached = self._procesar(url, entry, response, False)
+        if cached is None:
+            return await self.get_async(url, headers, timeout)
+        return cached
+
+    def _condicional(self, url: str, request_headers, stream: bool):
+        """(previous index entry, request headers with its validators)"""
+        with self._lock:
+            entry = dict(self._index.get(url, {}))
+
+        headers = dict(request_headers or {})
+        if entry and (entry.get('results') if stream else self._body_path(url).exists()):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return entry, headers
+
+    def _procesar(self, url: str, entry: Dict[str, Any], response, stream: bool) -> Optional[CachedResponse]:
+        """CachedResponse of response, updating the index; None if a 304's body was lost"""
+        body_path = self._body_path(url)
+
+        if response.status_code == 304 and stream:
+            content = body_path.read_bytes() if body_path.exists() else b''
+            return CachedResponse(response, url, content=content, encoding=entry.get('encoding'), unchanged=True)
+
+        if response.status_code == 304:
+            try:
+                content = body_path.read_bytes()
+            except OSError:
+                # Body lost: repeat the request without validators
+                with self._lock:
+                    self._index.pop(url, None)
+                return None
+            return CachedResponse(response, url, content=content, encoding=entry.get('encoding'), unchanged=True)
+
+        if response.status_code != 200:
+            return CachedResponse(response, url)
+
+        if stream:
+            with self._lock:
+                self._index[url] = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'sha256': None,
+                    'encoding': response.encoding,
+                    'results': {},
+                }
+                try:
+                    self._save_index()
+                except OSError as e:
+                    print(f"Error guardando caché HTTP para {url}: {e}")
+            return CachedResponse(response, url)
+
+        content = response.content
+        body_hash = hashlib.sha256(content).hexdigest()
+        unchanged = bool(entry) and entry.get('sha256') == body_hash
+
+        with self._lock:
+            new_entry = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'sha256': body_hash,
+                'encoding': response.encoding,
+                'results': entry.get('results', {}) if unchanged else {},
+            }
+            try:
+                if not unchanged or not body_path.exists():
+                    self.directorio.mkdir(parents=True, exist_ok=True)
+                    body_path.write_bytes(content)
+                self._index[url] = new_entry
+                self._save_index()
+            except OSError as e:
+                print(f"Error guardando caché HTTP para {url}: {e}")
+
+        return CachedResponse(response, url, unchanged=unchanged)
+
+    def load_result(self, url: str, clave: str) -> Optional[Any]:
+        """Result previously derived from url's body by the scraper clave"""
+        with self._lock:
+            result = self._index.get(url, {}).get('results', {}).get(clave)
+            return copy.deepcopy(result)
+
+    def save_result(self, url: str, clave: str, result: Any):
+        """Remember what scraper clave derived from url's current body"""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return
+            entry.setdefault('results', {})[clave] = copy.deepcopy(result)
+            try:
+                self._save_index()
+            except OSError as e:
+                print(f"Error guardando caché HTTP para {url}: {e}")
\ No newline at end of file
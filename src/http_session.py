@@ -0,0 +1,109 @@
+from threading import Lock
+from typing import Dict
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from .metricas import get_metricas, programa_actual
+
+
+DEFAULT_POOL_MAXSIZE = 10
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = Lock()
+_pool_maxsize = DEFAULT_POOL_MAXSIZE
+_pool_sizes: Dict[str, int] = {}
+
+
+def configure_pools(pool_maxsize: int = None, pool_sizes: Dict[str, int] = None):
+    """Tune connection pool sizes (global default and per-host overrides)
+
+    Only affects sessions created afterwards, so call it before the run starts.
+    """
+    global _pool_maxsize, _pool_sizes
+    if pool_maxsize:
+        _pool_maxsize = max(1, int(pool_maxsize))
+    if pool_sizes is not None:
+        _pool_sizes = {host.lower(): max(1, int(size)) for host, size in pool_sizes.items()}
+
+
+def _host(url_or_host: str) -> str:
+    if '://' in url_or_host:
+        return urlparse(url_or_host).netloc.lower()
+    return url_or_host.lower()
+
+
+def pool_size(url_or_host: str) -> int:
+    """Maximum simultaneous connections to a host"""
+    return _pool_sizes.get(_host(url_or_host), _pool_maxsize)
+
+
+def _registrar_respuesta(response, *args, **kwargs):
+    """Response hook: requests, latency and declared bytes per host and program"""
+    metricas = get_metricas()
+    host = _host(response.url)
+    programa = programa_actual()
+    metricas.incrementar(
+        "autoradio_http_requests_total",
+        host=host, metodo=response.request.method, estado=response.status_code, programa=programa,
+    )
+    metricas.observar("autoradio_http_response_seconds", response.elapsed.total_seconds(), host=host)
+    try:
+        declarados = int(response.headers.get('Content-Length', 0))
+    except ValueError:
+        declarados = 0
+    if declarados and response.request.method != 'HEAD':
+        metricas.incrementar("autoradio_http_response_bytes_total", declarados, host=host, programa=programa)
+    return response
+
+
+def get_session(url_or_host: str) -> requests.Session:
+    """Process-wide pooled session for a host
+
+    Every scraper and the downloader share these sessions, so TCP/TLS
+    connections to the same host are reused across the whole run.
+    """
+    host = _host(url_or_host)
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size(host))
+            session = requests.Session()
+            session.hooks['response'].append(_registrar_respuesta)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[host] = session
+        return session
+
+
+def close_sessions():
+    """Close every pooled session (end of run)"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+class PooledSession:
+    """Per-scraper view over the shared sessions
+
+    Keeps its own default ``headers`` (scrapers customise them freely) and
+    sends each request through the pooled session of the target host.
+    """
+
+    def __init__(self, headers: Dict[str, str] = None):
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    def request(self, method: str, url: str, headers: Dict[str, str] = None, **kwargs) -> requests.Response:
+        merged_headers = CaseInsensitiveDict(self.headers)
+        if headers:
+            merged_headers.update(headers)
+        return get_session(url).request(method, url, headers=merged_headers, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
\ No newline at end of file
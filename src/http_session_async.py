@@ -0,0 +1,122 @@
+"""Asyncio HTTP client for the --async engine
+
+Counterpart of http_session on top of aiohttp: one ClientSession for the
+event loop, at most ``pool_size(host)`` connections per host and the same
+metrics, so feed fetches, HEAD probes and downloads are all in flight on
+the event loop's thread instead of holding a worker thread each.
+
+Errors are raised as the equivalent ``requests`` exceptions (Timeout,
+ConnectionError...), so the retry and error handling is shared with the
+synchronous engine.
+
+aiohttp is optional: without it --async is not available.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Dict
+import requests
+from requests.structures import CaseInsensitiveDict
+from .http_session import _host, _registrar_respuesta, pool_size
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+AIOHTTP_DISPONIBLE = aiohttp is not None
+
+_session = None
+_limites: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_async_session() -> "aiohttp.ClientSession":
+    """ClientSession of the running event loop (created on first use)"""
+    global _session
+    if _session is None or _session.closed:
+        # Per-host limits are the semaphores of _limite; the connector only pools
+        _session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0, ttl_dns_cache=300))
+    return _session
+
+
+async def close_async_sessions():
+    """Close the ClientSession (end of the event loop)"""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+    _limites.clear()
+
+
+def _limite(url: str) -> asyncio.Semaphore:
+    host = _host(url)
+    limite = _limites.get(host)
+    if limite is None:
+        limite = _limites[host] = asyncio.Semaphore(pool_size(host))
+    return limite
+
+
+def _timeout(timeout: float) -> "aiohttp.ClientTimeout":
+    # Like requests: a limit per connection attempt and per read, not for the whole body
+    return aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+
+
+def _como_requests(error: Exception, url: str) -> requests.exceptions.RequestException:
+    """The requests exception equivalent to an aiohttp/asyncio error"""
+    if isinstance(error, (asyncio.TimeoutError, aiohttp.ServerTimeoutError)):
+        return requests.exceptions.Timeout(f"{url}: {error or 'timeout'}")
+    if isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+        return requests.exceptions.ConnectionError(f"{url}: {error}")
+    return requests.exceptions.RequestException(f"{url}: {error}")
+
+
+def _respuesta(metodo: str, url: str, response, inicio: float, cuerpo: bytes = None) -> requests.Response:
+    """requests.Response built from an aiohttp response (body already read, if any)"""
+    resultado = requests.Response()
+    resultado.status_code = response.status
+    resultado.reason = response.reason
+    resultado.url = str(response.url)
+    resultado.headers = CaseInsensitiveDict(response.headers)
+    resultado.encoding = requests.utils.get_encoding_from_headers(resultado.headers)
+    resultado.elapsed = timedelta(seconds=time.perf_counter() - inicio)
+    resultado.request = requests.Request(metodo, url).prepare()
+    resultado._content = cuerpo if cuerpo is not None else b""
+    resultado._content_consumed = True
+    return resultado
+
+
+async def solicitar(metodo: str, url: str, headers: Dict[str, str] = None, timeout: float = 30,
+                    allow_redirects: bool = True) -> requests.Response:
+    """Request url and read the whole body; returns a requests.Response"""
+    inicio = time.perf_counter()
+    try:
+        async with _limite(url):
+            async with get_async_session().request(
+                metodo, url, headers=headers, timeout=_timeout(timeout), allow_redirects=allow_redirects
+            ) as response:
+                cuerpo = await response.read() if metodo.upper() != "HEAD" else b""
+                resultado = _respuesta(metodo, url, response, inicio, cuerpo)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise _como_requests(e, url) from e
+    _registrar_respuesta(resultado)
+    return resultado
+
+
+@asynccontextmanager
+async def abrir(url: str, headers: Dict[str, str] = None, timeout: float = 30):
+    """GET url with the body left in the stream: yields (requests.Response headers view, aiohttp response)
+
+    The first value has status, headers and url (no body) for the shared
+    helpers; the body is read from the second one. aiohttp errors raised
+    while reading inside the block also come out as requests exceptions.
+    """
+    inicio = time.perf_counter()
+    try:
+        async with _limite(url):
+            async with get_async_session().get(url, headers=headers, timeout=_timeout(timeout)) as response:
+                resultado = _respuesta("GET", url, response, inicio)
+                _registrar_respuesta(resultado)
+                yield resultado, response
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise _como_requests(e, url) from e
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional
+
+
+class DownloadManifest:
+    """Local record (SQLite) of every downloaded episode
+
+    Episodes are keyed by a stable identity (feed GUID, audio URL or episode
+    page) instead of the file name, so a renamed title or a file removed by
+    the cleanup does not trigger a new download.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.ruta), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS episodios (
+                    clave TEXT PRIMARY KEY,
+                    guid TEXT,
+                    audio_url TEXT,
+                    programa TEXT,
+                    titulo TEXT,
+                    ruta TEXT,
+                    tamano INTEGER,
+                    sha256 TEXT,
+                    descargado_en TEXT,
+                    retirado_en TEXT
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_episodios_audio_url ON episodios(audio_url)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_episodios_ruta ON episodios(ruta)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS marcas (
+                    programa TEXT PRIMARY KEY,
+                    guid TEXT,
+                    fecha TEXT,
+                    actualizado_en TEXT
+                )
+            """)
+
+    @staticmethod
+    def clave_episodio(programa: Dict) -> str:
+        """Stable identity of an episode: GUID > audio URL > episode page > program + title"""
+        for campo in ("guid", "audio_url", "escuchar_link"):
+            valor = programa.get(campo)
+            if valor:
+                return f"{campo}:{valor}"
+        return f"titulo:{programa.get('nombre_programa', '')}|{programa.get('titulo', '')}"
+
+    def obtener(self, programa: Dict) -> Optional[Dict]:
+        """Manifest entry for an episode, or None if it was never downloaded"""
+        clave = self.clave_episodio(programa)
+        audio_url = programa.get("audio_url")
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM episodios WHERE clave = ?", (clave,)).fetchone()
+            if row is None and audio_url:
+                row = self._conn.execute("SELECT * FROM episodios WHERE audio_url = ?", (audio_url,)).fetchone()
+        return dict(row) if row else None
+
+    def ya_descargado(self, programa: Dict) -> bool:
+        """True if the episode was downloaded before (even if already retired)"""
+        return self.obtener(programa) is not None
+
+    def registrar(self, programa: Dict, ruta: Path, audio_url: str = None):
+        """Record a finished download"""
+        ruta = Path(ruta)
+        tamano = ruta.stat().st_size if ruta.exists() else None
+        sha256 = _sha256_archivo(ruta) if ruta.exists() else None
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO episodios
+                    (clave, guid, audio_url, programa, titulo, ruta, tamano, sha256, descargado_en, retirado_en)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)
+                """,
+                (
+                    self.clave_episodio(programa),
+                    programa.get("guid"),
+                    audio_url or programa.get("audio_url"),
+                    programa.get("nombre_programa"),
+                    programa.get("titulo"),
+                    os.path.abspath(ruta),
+                    tamano,
+                    sha256,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+
+    def marcar_retirados(self, rutas):
+        """Mark the episodes stored at rutas as removed, in one transaction"""
+        retirado_en = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE episodios SET retirado_en = ? WHERE ruta = ? AND retirado_en IS NULL",
+                [(retirado_en, os.path.abspath(ruta)) for ruta in rutas],
+            )
+
+    def obtener_marca(self, programa: str) -> Optional[Dict]:
+        """Last seen episode (guid/fecha) of a program, used as "since" watermark"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT guid, fecha FROM marcas WHERE programa = ?", (programa,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def guardar_marca(self, programa: str, guid: str = None, fecha: str = None):
+        """Advance the watermark of a program to its newest downloaded episode"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO marcas (programa, guid, fecha, actualizado_en) VALUES (?, ?, ?, ?)",
+                (programa, guid, fecha, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def cerrar(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _sha256_archivo(ruta: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(bloque)
+    return sha256.hexdigest()
\ No newline at end of file
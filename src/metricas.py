@@ -0,0 +1,210 @@
+"""Runtime metrics: counters, gauges, histograms and timers
+
+Instrumented code records into the process-wide registry returned by
+get_metricas(); at the end of a run main.py exports it as JSON and as a
+Prometheus textfile (node_exporter textfile collector format).
+
+The program being processed is tracked in a context variable (en_programa),
+so lower layers such as the HTTP session hooks can label what they record
+without receiving it as a parameter.
+"""
+import bisect
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Tuple
+
+
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+MBPS_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 200)
+
+JSON_FILE = "metricas.json"
+PROMETHEUS_FILE = "autoradio.prom"
+
+_programa: ContextVar[str] = ContextVar("programa", default="")
+
+_metricas = None
+_metricas_lock = Lock()
+
+
+def get_metricas() -> "Metricas":
+    """Process-wide metrics registry"""
+    global _metricas
+    with _metricas_lock:
+        if _metricas is None:
+            _metricas = Metricas()
+        return _metricas
+
+
+@contextmanager
+def en_programa(nombre: str):
+    """Label what is recorded inside the block with programa=nombre"""
+    token = _programa.set(nombre or "")
+    try:
+        yield
+    finally:
+        _programa.reset(token)
+
+
+def programa_actual() -> str:
+    return _programa.get()
+
+
+def _clave(nombre: str, etiquetas: Dict[str, str]) -> Tuple:
+    return (nombre, tuple(sorted((k, str(v)) for k, v in etiquetas.items() if v is not None)))
+
+
+class _Histograma:
+    __slots__ = ('buckets', 'cuentas', 'suma', 'cuenta')
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.cuentas = [0] * len(self.buckets)
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, valor: float):
+        i = bisect.bisect_left(self.buckets, valor)
+        if i < len(self.cuentas):
+            self.cuentas[i] += 1
+        self.suma += valor
+        self.cuenta += 1
+
+    def acumulados(self):
+        """(límite, cuenta acumulada) de cada bucket, terminando en +Inf"""
+        total = 0
+        for limite, cuenta in zip(self.buckets, self.cuentas):
+            total += cuenta
+            yield limite, total
+        yield math.inf, self.cuenta
+
+
+class Metricas:
+    """Thread-safe registry of labelled counters, gauges and histograms"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._contadores: Dict[Tuple, float] = {}
+        self._valores: Dict[Tuple, float] = {}
+        self._histogramas: Dict[Tuple, _Histograma] = {}
+
+    def incrementar(self, nombre: str, valor: float = 1, **etiquetas):
+        """Add valor to a counter"""
+        clave = _clave(nombre, etiquetas)
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + valor
+
+    def fijar(self, nombre: str, valor: float, **etiquetas):
+        """Set a gauge"""
+        with self._lock:
+            self._valores[_clave(nombre, etiquetas)] = valor
+
+    def observar(self, nombre: str, valor: float, buckets=SECONDS_BUCKETS, **etiquetas):
+        """Record valor in a histogram (buckets are fixed on first use)"""
+        clave = _clave(nombre, etiquetas)
+        with self._lock:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = _Histograma(buckets)
+            histograma.observar(valor)
+
+    @contextmanager
+    def cronometro(self, nombre: str, **etiquetas):
+        """Time the block (seconds, also on error) into a histogram"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nombre, time.perf_counter() - inicio, **etiquetas)
+
+    def a_dict(self) -> Dict:
+        """Snapshot of every metric, JSON-serializable"""
+        with self._lock:
+            return {
+                "generado": datetime.now().isoformat(timespec="seconds"),
+                "contadores": [
+                    {"nombre": nombre, "etiquetas": dict(etiquetas), "valor": valor}
+                    for (nombre, etiquetas), valor in sorted(self._contadores.items())
+                ],
+                "valores": [
+                    {"nombre": nombre, "etiquetas": dict(etiquetas), "valor": valor}
+                    for (nombre, etiquetas), valor in sorted(self._valores.items())
+                ],
+                "histogramas": [
+                    {
+                        "nombre": nombre,
+                        "etiquetas": dict(etiquetas),
+                        "cuenta": histograma.cuenta,
+                        "suma": histograma.suma,
+                        "buckets": {
+                            ("+Inf" if math.isinf(limite) else str(limite)): cuenta
+                            for limite, cuenta in histograma.acumulados()
+                        },
+                    }
+                    for (nombre, etiquetas), histograma in sorted(self._histogramas.items(), key=lambda x: x[0])
+                ],
+            }
+
+    def a_prometheus(self) -> str:
+        """Metrics in Prometheus text exposition format"""
+        lineas = []
+        tipos = set()
+
+        def tipo(nombre, clase):
+            if nombre not in tipos:
+                tipos.add(nombre)
+                lineas.append(f"# TYPE {nombre} {clase}")
+
+        with self._lock:
+            for (nombre, etiquetas), valor in sorted(self._contadores.items()):
+                tipo(nombre, "counter")
+                lineas.append(f"{nombre}{_etiquetas(etiquetas)} {_numero(valor)}")
+            for (nombre, etiquetas), valor in sorted(self._valores.items()):
+                tipo(nombre, "gauge")
+                lineas.append(f"{nombre}{_etiquetas(etiquetas)} {_numero(valor)}")
+            for (nombre, etiquetas), histograma in sorted(self._histogramas.items(), key=lambda x: x[0]):
+                tipo(nombre, "histogram")
+                for limite, cuenta in histograma.acumulados():
+                    le = "+Inf" if math.isinf(limite) else _numero(limite)
+                    lineas.append(f"{nombre}_bucket{_etiquetas(etiquetas + (('le', le),))} {cuenta}")
+                lineas.append(f"{nombre}_sum{_etiquetas(etiquetas)} {_numero(histograma.suma)}")
+                lineas.append(f"{nombre}_count{_etiquetas(etiquetas)} {histograma.cuenta}")
+        return "\n".join(lineas) + "\n"
+
+    def exportar(self, directorio) -> Tuple[Path, Path]:
+        """Write metricas.json and autoradio.prom into directorio (atomically)"""
+        directorio = Path(directorio)
+        directorio.mkdir(parents=True, exist_ok=True)
+        ruta_json = directorio / JSON_FILE
+        ruta_prometheus = directorio / PROMETHEUS_FILE
+        _escribir(ruta_json, json.dumps(self.a_dict(), ensure_ascii=False, indent=2))
+        _escribir(ruta_prometheus, self.a_prometheus())
+        return ruta_json, ruta_prometheus
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+def _etiquetas(etiquetas) -> str:
+    if not etiquetas:
+        return ""
+    pares = []
+    for clave, valor in etiquetas:
+        valor = valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pares.append(f'{clave}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+
+def _escribir(ruta: Path, texto: str):
+    # Textfile collectors may read at any time: never expose a half-written file
+    tmp = ruta.with_name(ruta.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(texto)
+    os.replace(tmp, ruta)
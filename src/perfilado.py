@@ -0,0 +1,176 @@
+"""Per-program profiling for ``main.py --profile``
+
+Each program's discovery, resolution, download and cleanup run under the
+program's own cProfile profiler. cProfile measures wall-clock time, so
+the self time of every function is classified to split a program's time
+into network wait, parsing, disk, yt-dlp, subprocesses, waits (locks and
+sleeps) and the remaining Python CPU. Builtins that are not waits
+themselves (isinstance, dict.get...) count towards whoever called them.
+
+Profilers cannot overlap, so main.py runs sequentially while profiling.
+"""
+import cProfile
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+
+from .limpiarNombreArchivo import limpiar_nombre_archivo
+
+
+TOP_FUNCIONES = 25
+
+CATEGORIAS = ("red", "parseo", "disco", "yt-dlp", "subprocesos", "espera", "cpu")
+
+_MODULOS_PARSEO = (
+    "/bs4/", "/lxml/", "/soupsieve/", "/html5lib/", "/html/parser.py", "/xml/etree/", "/xml/dom/",
+    "feed_engine.py",
+)
+
+
+def _categoria_builtin(funcion: str):
+    """Category of a C function, or None when it belongs to its caller"""
+    if "_socket." in funcion or "_ssl." in funcion or "select" in funcion or "getaddrinfo" in funcion:
+        return "red"
+    if "waitpid" in funcion or "WaitForSingleObject" in funcion:
+        return "subprocesos"
+    if "'acquire'" in funcion or "time.sleep" in funcion:
+        return "espera"
+    if any(m in funcion for m in ("_io.", "io.open", "posix.", "nt.", "_sqlite3")):
+        return "disco"
+    if "lxml" in funcion or "pyexpat" in funcion or "_elementtree" in funcion:
+        return "parseo"
+    return None
+
+
+def _categoria_python(archivo: str) -> str:
+    ruta = archivo.replace("\\", "/")
+    if "/yt_dlp/" in ruta:
+        return "yt-dlp"
+    if any(m in ruta for m in _MODULOS_PARSEO):
+        return "parseo"
+    return "cpu"
+
+
+def _describir(clave) -> str:
+    archivo, linea, funcion = clave
+    if archivo == "~":
+        return funcion
+    # Package and module name: "bs4/__init__.py" rather than a bare "__init__.py"
+    return f"{'/'.join(Path(archivo).parts[-2:])}:{linea}({funcion})"
+
+
+class Perfilador:
+    """One cProfile profiler and one phase clock per program"""
+
+    def __init__(self, directorio, top: int = TOP_FUNCIONES):
+        self.directorio = Path(directorio)
+        self.top = top
+        self._perfiles: Dict[str, cProfile.Profile] = {}
+        self._fases: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._activo = None
+
+    @contextmanager
+    def perfilar(self, programa: str, fase: str):
+        """Profile the block as fase of programa (nested calls add to the outer one)"""
+        if self._activo is not None:
+            yield
+            return
+
+        programa = programa or "(sin programa)"
+        perfil = self._perfiles.setdefault(programa, cProfile.Profile())
+        self._activo = programa
+        inicio = time.perf_counter()
+        perfil.enable()
+        try:
+            yield
+        finally:
+            perfil.disable()
+            self._fases[programa][fase] += time.perf_counter() - inicio
+            self._activo = None
+
+    def _categorias(self, stats: pstats.Stats) -> Dict:
+        """Self time of every function, categorized; builtins inherit their callers' category"""
+        cache = {}
+
+        def categoria(clave, profundidad=0):
+            if clave in cache:
+                return cache[clave]
+            archivo, _, funcion = clave
+            if archivo != "~":
+                resultado = {_categoria_python(archivo): 1.0}
+            else:
+                propia = _categoria_builtin(funcion)
+                if propia:
+                    resultado = {propia: 1.0}
+                else:
+                    # Share it among the callers, weighted by the time spent for each one
+                    resultado = defaultdict(float)
+                    llamadores = stats.stats.get(clave, (0, 0, 0, 0, {}))[4]
+                    total = sum(datos[2] for datos in llamadores.values())
+                    if not total or profundidad > 5:
+                        resultado = {"cpu": 1.0}
+                    else:
+                        for llamador, datos in llamadores.items():
+                            for cat, peso in categoria(llamador, profundidad + 1).items():
+                                resultado[cat] += peso * datos[2] / total
+            cache[clave] = resultado
+            return resultado
+
+        tiempos = defaultdict(float)
+        for clave, (_, _, tottime, _, _) in stats.stats.items():
+            for cat, peso in categoria(clave).items():
+                tiempos[cat] += tottime * peso
+        return tiempos, cache
+
+    def reporte(self, programa: str) -> str:
+        """Phases, time split by category and CPU hotspots of a program"""
+        fases = self._fases[programa]
+        total = sum(fases.values())
+        lineas = [f"Perfil de {programa}", "=" * 60, "", f"Tiempo total: {total:.2f} s", ""]
+
+        lineas.append("Fases:")
+        for fase, segundos in sorted(fases.items(), key=lambda x: -x[1]):
+            lineas.append(f"  {fase:<16}{segundos:>9.2f} s")
+
+        stats = pstats.Stats(self._perfiles[programa])
+        tiempos, categorias = self._categorias(stats)
+        medido = sum(tiempos.values()) or 1
+        lineas += ["", "Reparto del tiempo:"]
+        for cat in CATEGORIAS:
+            if tiempos.get(cat):
+                lineas.append(f"  {cat:<16}{tiempos[cat]:>9.2f} s {tiempos[cat] / medido * 100:>6.1f}%")
+
+        # Hotspots: what actually used the CPU (waits are already in the split above)
+        lineas += ["", f"Funciones con más tiempo propio de CPU (top {self.top}):",
+                   f"  {'propio':>9} {'acumulado':>10} {'llamadas':>9}  función"]
+        candidatas = [
+            (datos[2], datos[3], datos[1], clave)
+            for clave, datos in stats.stats.items()
+            if not {"red", "espera", "subprocesos"} & set(categorias.get(clave, {}))
+        ]
+        for tottime, cumtime, llamadas, clave in sorted(candidatas, key=lambda x: -x[0])[:self.top]:
+            lineas.append(f"  {tottime:>8.3f}s {cumtime:>9.3f}s {llamadas:>9}  {_describir(clave)}")
+        return "\n".join(lineas) + "\n"
+
+    def escribir(self) -> Path:
+        """Write <programa>.txt and <programa>.prof per program plus resumen.txt"""
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        filas = []
+        for programa, perfil in self._perfiles.items():
+            nombre = limpiar_nombre_archivo(programa)
+            (self.directorio / f"{nombre}.txt").write_text(self.reporte(programa), encoding="utf-8")
+            perfil.dump_stats(str(self.directorio / f"{nombre}.prof"))
+            tiempos, _ = self._categorias(pstats.Stats(perfil))
+            filas.append((sum(self._fases[programa].values()), programa, tiempos))
+
+        cabecera = f"{'programa':<40}{'total':>9}" + "".join(f"{cat:>13}" for cat in CATEGORIAS)
+        lineas = ["Programas ordenados por tiempo total (segundos)", "", cabecera]
+        for total, programa, tiempos in sorted(filas, key=lambda x: -x[0]):
+            lineas.append(
+                f"{programa[:39]:<40}{total:>9.2f}" + "".join(f"{tiempos.get(cat, 0):>13.2f}" for cat in CATEGORIAS)
+            )
+        (self.directorio / "resumen.txt").write_text("\n".join(lineas) + "\n", encoding="utf-8")
+        return self.directorio
@@ -0,0 +1,60 @@
+from typing import Callable, Dict, List
+
+
+POLITICA_POR_DEFECTO = "shortest"
+
+POLITICAS: Dict[str, Callable[[List[Dict]], List[Dict]]] = {}
+
+
+def registrar_politica(nombre: str, politica: Callable[[List[Dict]], List[Dict]]):
+    """Add a scheduling policy: a function returning the episodes in download order"""
+    POLITICAS[nombre] = politica
+
+
+def _tamano(episodio: Dict):
+    return episodio.get("tamano")
+
+
+def mas_cortos_primero(episodios: List[Dict]) -> List[Dict]:
+    """Shortest-job-first: small files first, unknown sizes last"""
+    return sorted(episodios, key=lambda e: (_tamano(e) is None, _tamano(e) or 0))
+
+
+def mas_largos_primero(episodios: List[Dict]) -> List[Dict]:
+    """Largest first (long transfers start early), unknown sizes last"""
+    return sorted(episodios, key=lambda e: (_tamano(e) is None, -(_tamano(e) or 0)))
+
+
+def justo_por_programa(episodios: List[Dict]) -> List[Dict]:
+    """Round-robin between programs, each program's episodes shortest-first"""
+    colas: Dict[str, List[Dict]] = {}
+    for episodio in mas_cortos_primero(episodios):
+        colas.setdefault(episodio.get("nombre_programa"), []).append(episodio)
+
+    plan = []
+    ronda = 0
+    while len(plan) < len(episodios):
+        turno = [cola[ronda] for cola in colas.values() if ronda < len(cola)]
+        plan.extend(mas_cortos_primero(turno))
+        ronda += 1
+    return plan
+
+
+def orden_del_feed(episodios: List[Dict]) -> List[Dict]:
+    """Keep discovery (feed) order"""
+    return list(episodios)
+
+
+registrar_politica("shortest", mas_cortos_primero)
+registrar_politica("largest", mas_largos_primero)
+registrar_politica("fair", justo_por_programa)
+registrar_politica("feed", orden_del_feed)
+
+
+def planificar(episodios: List[Dict], politica: str = POLITICA_POR_DEFECTO) -> List[Dict]:
+    """Order pending episodes for download according to politica"""
+    funcion = POLITICAS.get(politica)
+    if funcion is None:
+        print(f"Política de descarga desconocida: {politica} (usando {POLITICA_POR_DEFECTO})")
+        funcion = POLITICAS[POLITICA_POR_DEFECTO]
+    return funcion(episodios)
@@ -0,0 +1,208 @@
+"""What is done with the audio of YouTube videos
+
+``youtube_output`` (global setting, overridable per program) picks one of:
+
+- m4a: keep YouTube's AAC stream (format 140) as downloaded, without ffmpeg
+- remux: best audio stream copied into its own container by ffmpeg, without
+  re-encoding
+- mp3: transcode to 192 kbps MP3, for playout systems that only take MP3
+
+yt-dlp only downloads; remuxing and transcoding run in a process pool
+bounded to the number of cores (``postprocess_workers``), so the download
+worker hands the raw file over and moves on to the next fetch instead of
+waiting for ffmpeg.
+"""
+import os
+import subprocess
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Optional
+
+from .metricas import get_metricas
+
+
+SALIDA_POR_DEFECTO = "m4a"
+
+# yt-dlp format selector of each output
+SALIDAS_YOUTUBE = {
+    "m4a": "140/bestaudio[ext=m4a]/bestaudio",
+    "remux": "bestaudio/best",
+    "mp3": "140/bestaudio/best",
+}
+
+# Extensions an episode can end up with (mp3 for every non-YouTube download)
+EXTENSIONES_AUDIO = (".mp3", ".m4a", ".aac", ".opus", ".ogg", ".webm")
+
+# Raw yt-dlp downloads waiting for ffmpeg: "<título>.descarga.<ext>"
+SUFIJO_DESCARGA = ".descarga"
+
+# Container for each codec when remuxing
+CONTENEDORES = {"aac": ".m4a", "mp3": ".mp3", "opus": ".opus", "vorbis": ".ogg", "flac": ".flac"}
+
+_postprocesador = None
+_postprocesador_lock = Lock()
+_max_procesos = None
+
+
+def salida_youtube(nombre: str = None) -> str:
+    """A valid youtube_output value (unknown values: the default)"""
+    if nombre and nombre not in SALIDAS_YOUTUBE:
+        print(f"⚠ youtube_output desconocido: {nombre} (se usa {SALIDA_POR_DEFECTO})")
+        return SALIDA_POR_DEFECTO
+    return nombre or SALIDA_POR_DEFECTO
+
+
+def necesita_ffmpeg(salida: str) -> bool:
+    return salida_youtube(salida) != "m4a"
+
+
+def es_audio(ruta: Path) -> bool:
+    return ruta.suffix.lower() in EXTENSIONES_AUDIO and not ruta.stem.endswith(SUFIJO_DESCARGA)
+
+
+def buscar_audio(ruta: Path) -> Optional[Path]:
+    """ruta, or the same episode saved with another audio extension, if it exists"""
+    for extension in EXTENSIONES_AUDIO:
+        candidata = ruta.with_suffix(extension)
+        if candidata.exists():
+            return candidata
+    return None
+
+
+def _codec(origen: Path) -> Optional[str]:
+    try:
+        resultado = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "a:0", "-show_entries", "stream=codec_name",
+             "-of", "default=noprint_wrappers=1:nokey=1", str(origen)],
+            capture_output=True, text=True,
+        )
+    except OSError:
+        return None
+    return resultado.stdout.strip() or None
+
+
+def convertir(origen: str, destino: str, salida: str) -> str:
+    """Remux or transcode origen to destino + extension (runs in a pool process)
+
+    Writes to a temporary file and replaces atomically; origen is deleted
+    once the final file is in place. Returns the final path.
+    """
+    origen = Path(origen)
+    if salida == "mp3":
+        final = Path(destino + ".mp3")
+        argumentos = ["-vn", "-codec:a", "libmp3lame", "-b:a", "192k"]
+    else:
+        final = Path(destino + CONTENEDORES.get(_codec(origen), origen.suffix))
+        if final.suffix == origen.suffix:
+            # Already audio only in its own container: nothing for ffmpeg to do
+            os.replace(origen, final)
+            return str(final)
+        argumentos = ["-vn", "-codec:a", "copy"]
+
+    temporal = final.with_name(f"{final.stem}.tmp{final.suffix}")
+    resultado = subprocess.run(
+        ["ffmpeg", "-y", "-nostdin", "-loglevel", "error", "-i", str(origen), *argumentos, str(temporal)],
+        capture_output=True, text=True,
+    )
+    if resultado.returncode != 0:
+        temporal.unlink(missing_ok=True)
+        raise RuntimeError(f"ffmpeg terminó con código {resultado.returncode}: {resultado.stderr.strip()[-300:]}")
+    os.replace(temporal, final)
+    origen.unlink(missing_ok=True)
+    return str(final)
+
+
+def configurar_postproceso(max_procesos: int = None):
+    """Size of the ffmpeg process pool (None = number of cores)"""
+    global _max_procesos
+    _max_procesos = max_procesos
+
+
+def get_postprocesador() -> "Postprocesador":
+    """Process-wide ffmpeg post-processing pool"""
+    global _postprocesador
+    with _postprocesador_lock:
+        if _postprocesador is None:
+            _postprocesador = Postprocesador(_max_procesos)
+        return _postprocesador
+
+
+def cerrar_postproceso():
+    """Wait for pending conversions and shut the pool down"""
+    global _postprocesador
+    with _postprocesador_lock:
+        postprocesador, _postprocesador = _postprocesador, None
+    if postprocesador is not None:
+        postprocesador.cerrar()
+
+
+class Postprocesador:
+    """Bounded process pool for conversions, tracked per program"""
+
+    def __init__(self, max_procesos: int = None):
+        self.max_procesos = max_procesos or os.cpu_count() or 1
+        self._pool = None
+        self._lock = Lock()
+        self._pendientes = Counter()
+        self._al_terminar = defaultdict(list)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created on first use: runs with only m4a output never start a process
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_procesos)
+            return self._pool
+
+    def enviar(self, programa: str, origen: Path, destino: Path, salida: str) -> Future:
+        """Queue the conversion of origen; the Future resolves to the final path
+
+        Callbacks added to the returned Future run before the program's
+        cuando_termine() functions.
+        """
+        resultado = Future()
+        with self._lock:
+            self._pendientes[programa] += 1
+        inicio = time.perf_counter()
+        tarea = self._get_pool().submit(convertir, str(origen), str(destino), salida)
+        tarea.add_done_callback(lambda t: self._terminada(programa, salida, t, resultado, inicio))
+        return resultado
+
+    def _terminada(self, programa, salida, tarea, resultado: Future, inicio):
+        metricas = get_metricas()
+        metricas.observar("autoradio_postprocess_seconds", time.perf_counter() - inicio, programa=programa, salida=salida)
+        try:
+            ruta = Path(tarea.result())
+        except Exception as e:
+            print(f"✗ Error convirtiendo audio de {programa}: {e}")
+            metricas.incrementar("autoradio_postprocess_total", programa=programa, salida=salida, resultado="error")
+            resultado.set_exception(e)
+        else:
+            print(f"✅ Audio convertido ({salida}): {ruta}")
+            metricas.incrementar("autoradio_postprocess_total", programa=programa, salida=salida, resultado="ok")
+            resultado.set_result(ruta)
+        finally:
+            with self._lock:
+                self._pendientes[programa] -= 1
+                funciones = self._al_terminar.pop(programa, []) if self._pendientes[programa] <= 0 else []
+            for funcion in funciones:
+                try:
+                    funcion()
+                except Exception as e:
+                    print(f"Error finalizando {programa}: {e}")
+
+    def cuando_termine(self, programa: str, funcion: Callable[[], None]):
+        """Run funcion now, or after the program's pending conversions"""
+        with self._lock:
+            if self._pendientes[programa] > 0:
+                self._al_terminar[programa].append(funcion)
+                return
+        funcion()
+
+    def cerrar(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
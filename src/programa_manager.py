@@ -1,83 +1,336 @@
-from typing import List, Dict
+from collections import Counter
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Callable, List, Dict, Optional
 from .scraper_factory import ScraperFactory
-from .descargarAudio import descargar_audio
+from .scrapers import BaseScraper
+from .descargarAudio import DescargaReintentable, intentar_descarga, consultar_tamano
+from .manifest import DownloadManifest
+from .metricas import en_programa, get_metricas
+from .reintentos import ColaReintentos
 
 
 class ProgramaManager:
     """Generic manager for radio programs"""
     
-    def __init__(self, directorio_base=None):
+    def __init__(self, directorio_base=None, max_workers: int = 1, manifest: DownloadManifest = None,
+                 perfilador=None):
         self.factory = ScraperFactory()
         self.directorio_base = directorio_base
+        self.manifest = manifest
+        # Perfilador (main.py --profile): each program's phases are profiled separately
+        self.perfilador = perfilador
+        self.max_workers = max(1, max_workers or 1)
+        self._executor = None
+        self._executor_lock = Lock()
+        self._episode_scrapers = {}
+        self._episode_scrapers_lock = Lock()
     
-    def obtener_enlaces_programas(self, url: str, program_name: str = None) -> List[Dict]:
-        """Get program episodes from any supported radio website"""
-        try:
-            scraper = self.factory.create_scraper(url)
-            
-            # Override the program name if provided (for multiple programs from same domain)
-            if program_name:
-                scraper.program_name = program_name
-            
-            episodes = scraper.get_episodes()
-            
-            # Update episode data with the correct program name and original URL
-            for episode in episodes:
-                episode["nombre_programa"] = scraper.program_name
-                episode["original_url"] = url  # Store original URL for proper scraper creation
-            
-            print(f"Encontrados {len(episodes)} episodios en {scraper.program_name}")
-            return episodes
-        except ValueError as e:
-            print(f"Error: {e}")
-            return []
-        except Exception as e:
-            print(f"Error inesperado al procesar {url}: {e}")
-            return []
-    
-    def obtener_y_descargar_audio(self, programa: Dict):
-        """Get and download audio from program episode"""
-        try:
-            # If we already have the audio URL, use it directly
-            if "audio_url" in programa:
-                audio_url = programa["audio_url"]
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Shared download pool, created on first parallel use"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="descarga",
+                )
+            return self._executor
+    
+    def perfilar(self, programa: str, fase: str):
+        """Profile the block as fase of programa when running with --profile"""
+        if self.perfilador is None:
+            return nullcontext()
+        return self.perfilador.perfilar(programa, fase)
+    
+    def crear_scraper(self, url: str, program_name: str = None) -> BaseScraper:
+        """Create the scraper for a program URL"""
+        scraper = self.factory.create_scraper(url)
+        
+        # Override the program name if provided (for multiple programs from same domain)
+        if program_name:
+            scraper.program_name = program_name
+        
+        # Feed scrapers only return episodes newer than the last seen one
+        if self.manifest:
+            scraper.since = self.manifest.obtener_marca(scraper.program_name)
+        
+        return scraper
+    
+    def anotar_episodios(self, episodes: List[Dict], scraper: BaseScraper, url: str) -> List[Dict]:
+        """Update episode data with the correct program name and original URL"""
+        for episode in episodes:
+            episode["nombre_programa"] = scraper.program_name
+            episode["original_url"] = url  # Store original URL for proper scraper creation
+        
+        get_metricas().incrementar("autoradio_episodes_found_total", len(episodes), programa=scraper.program_name)
+        print(f"Encontrados {len(episodes)} episodios en {scraper.program_name}")
+        return episodes
+    
+    def crear_scraper_para_episodio(self, programa: Dict) -> BaseScraper:
+        """Create the scraper able to resolve the audio of an episode"""
+        # Create scraper based on the original URL to ensure correct scraper type
+        original_url = programa.get("original_url")
+        if not original_url:
+            # Fallback: try to determine original URL from program name
+            if "Visión para Vivir" in programa.get("nombre_programa", ""):
+                original_url = "https://visionparavivir.org/escuche/programa-actual/"
+            elif "Coalición" in programa.get("nombre_programa", ""):
+                original_url = "https://www.coalicionporelevangelio.org/podcasts/mujeres/"
+            elif "Ligonier" in programa.get("nombre_programa", ""):
+                original_url = "https://es.ligonier.org/renovandotumente/archivo/"
+            elif "Camino" in programa.get("nombre_programa", ""):
+                original_url = "https://www.elcaminodelavida.org/reflexion-para-hoy/"
             else:
-                # Otherwise, we need to extract it using the appropriate scraper
-                # We need to determine which scraper to use based on the episode data
-                if "escuchar_link" in programa:
-                    # Create scraper based on the original URL to ensure correct scraper type
-                    original_url = programa.get("original_url")
-                    if not original_url:
-                        # Fallback: try to determine original URL from program name
-                        if "Visión para Vivir" in programa.get("nombre_programa", ""):
-                            original_url = "https://visionparavivir.org/escuche/programa-actual/"
-                        elif "Coalición" in programa.get("nombre_programa", ""):
-                            original_url = "https://www.coalicionporelevangelio.org/podcasts/mujeres/"
-                        elif "Ligonier" in programa.get("nombre_programa", ""):
-                            original_url = "https://es.ligonier.org/renovandotumente/archivo/"
-                        elif "Camino" in programa.get("nombre_programa", ""):
-                            original_url = "https://www.elcaminodelavida.org/reflexion-para-hoy/"
-                        else:
-                            original_url = programa["escuchar_link"]  # Last resort
-                    
-                    scraper = self.factory.create_scraper(original_url)
-                    
-                    # Override program name to maintain consistency
-                    if "nombre_programa" in programa:
-                        scraper.program_name = programa["nombre_programa"]
-                    
-                    audio_url = scraper.get_audio_url(programa)
-                else:
-                    print(f"No se puede obtener el audio para {programa['titulo']}")
+                original_url = programa["escuchar_link"]  # Last resort
+        
+        # Reuse one scraper per program instead of building one per episode
+        clave = (original_url, programa.get("nombre_programa"))
+        with self._episode_scrapers_lock:
+            scraper = self._episode_scrapers.get(clave)
+            if scraper is None:
+                # Override program name to maintain consistency
+                scraper = self.crear_scraper(original_url, programa.get("nombre_programa"))
+                self._episode_scrapers[clave] = scraper
+            return scraper
+    
+    def obtener_enlaces_programas(self, url: str, program_name: str = None) -> Optional[List[Dict]]:
+        """Get program episodes from any supported radio website (None if scraping failed)"""
+        metricas = get_metricas()
+        with en_programa(program_name), self.perfilar(program_name or url, "descubrimiento"):
+            try:
+                scraper = self.crear_scraper(url, program_name)
+                
+                with metricas.cronometro(
+                    "autoradio_scrape_seconds", programa=scraper.program_name, scraper=type(scraper).__name__
+                ):
+                    episodes = scraper.get_episodes()
+                
+                return self.anotar_episodios(episodes, scraper, url)
+            except ValueError as e:
+                print(f"Error: {e}")
+                metricas.incrementar("autoradio_scrape_errors_total", programa=program_name)
+                return None
+            except Exception as e:
+                print(f"Error inesperado al procesar {url}: {e}")
+                metricas.incrementar("autoradio_scrape_errors_total", programa=program_name)
+                return None
+    
+    def ya_descargado(self, programa: Dict) -> bool:
+        """Check the manifest before doing any network work for an episode"""
+        if self.manifest and self.manifest.ya_descargado(programa):
+            print(f"Ya descargado anteriormente (manifest): {programa['titulo']}")
+            get_metricas().incrementar("autoradio_episodes_skipped_total", programa=programa.get("nombre_programa"))
+            return True
+        return False
+    
+    def registrar_descarga(self, programa: Dict, audio_url: str, ruta):
+        """Record a finished download in the manifest
+        
+        ruta may be a Future (audio still being converted): it is recorded
+        when the conversion succeeds.
+        """
+        if isinstance(ruta, Future):
+            def al_convertir(future):
+                if not future.cancelled() and future.exception() is None:
+                    self.registrar_descarga(programa, audio_url, future.result())
+            ruta.add_done_callback(al_convertir)
+            return
+        if self.manifest and ruta:
+            self.manifest.registrar(programa, ruta, audio_url)
+    
+    def actualizar_marca(self, programas: List[Dict]):
+        """Advance the program's "since" watermark to its newest episode
+        
+        Only done once every returned episode is in the manifest, so a
+        failed download is offered again on the next run.
+        """
+        if not self.manifest or not programas:
+            return
+        
+        mas_reciente = programas[0]
+        if not (mas_reciente.get("guid") or mas_reciente.get("fecha")):
+            return
+        if not all(self.manifest.ya_descargado(programa) for programa in programas):
+            return
+        
+        self.manifest.guardar_marca(
+            mas_reciente["nombre_programa"], mas_reciente.get("guid"), mas_reciente.get("fecha")
+        )
+    
+    def resolver_audio_url(self, programa: Dict) -> str:
+        """Audio URL of an episode, extracted from its page when needed
+        
+        The resolved URL is kept in "url_resuelta" (not "audio_url") so the
+        episode keeps the same identity in the manifest.
+        """
+        # If we already have the audio URL, use it directly
+        conocida = self.url_conocida(programa)
+        if conocida is not None:
+            return conocida
+        
+        # Otherwise, we need to extract it using the appropriate scraper
+        # We need to determine which scraper to use based on the episode data
+        scraper = self.crear_scraper_para_episodio(programa)
+        with get_metricas().cronometro(
+            "autoradio_resolve_seconds", programa=programa.get("nombre_programa"), scraper=type(scraper).__name__
+        ):
+            programa["url_resuelta"] = scraper.get_audio_url(programa)
+        return programa["url_resuelta"]
+    
+    def url_conocida(self, programa: Dict) -> Optional[str]:
+        """Audio URL of an episode if it needs no resolution (or was already resolved)"""
+        if "audio_url" in programa:
+            return programa["audio_url"]
+        return programa.get("url_resuelta")
+    
+    def tiene_enlace(self, programa: Dict) -> bool:
+        """Whether the episode has something to get the audio from"""
+        if "audio_url" not in programa and "escuchar_link" not in programa:
+            print(f"No se puede obtener el audio para {programa['titulo']}")
+            return False
+        return True
+    
+    def sin_audio(self, programa: Dict):
+        """Report an episode whose page had no audio link"""
+        print(f"No se encontró enlace de audio para {programa['titulo']}")
+        get_metricas().incrementar(
+            "autoradio_downloads_total", programa=programa.get("nombre_programa"), resultado="sin_enlace"
+        )
+    
+    def error_descarga(self, programa: Dict, error: Exception):
+        """Report an unexpected error while processing an episode"""
+        print(f"Error al procesar {programa['titulo']}: {error}")
+        get_metricas().incrementar(
+            "autoradio_downloads_total", programa=programa.get("nombre_programa"), resultado="error"
+        )
+    
+    def obtener_y_descargar_audio(self, programa: Dict, intento: int = 0):
+        """Get and download audio from program episode (one attempt)
+        
+        Raises DescargaReintentable when the transfer failed and can be
+        retried later; descargar_en_orden schedules it.
+        """
+        nombre = programa.get("nombre_programa")
+        with en_programa(nombre), self.perfilar(nombre, "descarga"):
+            try:
+                if self.ya_descargado(programa):
+                    return
+                
+                if not self.tiene_enlace(programa):
                     return
-            
-            if audio_url:
-                descargar_audio(audio_url, programa["nombre_programa"], programa["titulo"], self.directorio_base)
-            else:
-                print(f"No se encontró enlace de audio para {programa['titulo']}")
                 
-        except Exception as e:
-            print(f"Error al procesar {programa['titulo']}: {e}")
+                audio_url = self.resolver_audio_url(programa)
+                
+                if audio_url:
+                    ruta = intentar_descarga(
+                        audio_url, programa["nombre_programa"], programa["titulo"], self.directorio_base,
+                        programa.get("salida_youtube"), intento,
+                    )
+                    self.registrar_descarga(programa, audio_url, ruta)
+                else:
+                    self.sin_audio(programa)
+            
+            except DescargaReintentable:
+                raise
+            except Exception as e:
+                self.error_descarga(programa, e)
+    
+    def descargar_episodios(self, programas: List[Dict]):
+        """Download a program's episodes, in parallel when max_workers > 1
+        
+        Blocks until every episode of the list has been processed, so the
+        caller can safely run per-program cleanup afterwards.
+        """
+        self.descargar_en_orden(programas)
+    
+    def _preparar_episodio(self, programa: Dict) -> bool:
+        """Pre-flight of one episode: False if there is nothing to download"""
+        if self.ya_descargado(programa):
+            return False
+        nombre = programa.get("nombre_programa")
+        with en_programa(nombre), self.perfilar(nombre, "resolucion"):
+            try:
+                if "audio_url" in programa or "escuchar_link" in programa:
+                    audio_url = self.resolver_audio_url(programa)
+                    if not programa.get("tamano"):
+                        programa["tamano"] = consultar_tamano(audio_url)
+            except Exception as e:
+                print(f"Error preparando {programa['titulo']}: {e}")
+        return True
+    
+    def preparar_episodios(self, programas: List[Dict]) -> List[Dict]:
+        """Pre-flight stage: pending episodes with their audio URL and size
+        
+        Already downloaded episodes are dropped; sizes come from the feed
+        (enclosure length) or from concurrent HEAD requests.
+        """
+        if self.max_workers <= 1 or len(programas) <= 1:
+            return [programa for programa in programas if self._preparar_episodio(programa)]
+        
+        executor = self._get_executor()
+        futures = [executor.submit(self._preparar_episodio, programa) for programa in programas]
+        return [programa for programa, future in zip(programas, futures) if future.result()]
+    
+    def descargar_en_orden(self, programas: List[Dict], al_completar_programa: Callable[[str], None] = None):
+        """Download episodes in the given (planned) order
+        
+        al_completar_programa(nombre) runs as soon as the last episode of a
+        program finishes, so finished programs do not wait for the whole run.
+        
+        Failed transfers go back to a retry heap with their not-before time
+        instead of sleeping in a worker: the other downloads go on during the
+        backoff and each retry is dispatched when its delay expires.
+        """
+        restantes = Counter(programa["nombre_programa"] for programa in programas)
+        restantes_lock = Lock()
+        reintentos = ColaReintentos()
+        
+        def terminado(nombre):
+            with restantes_lock:
+                restantes[nombre] -= 1
+                completo = restantes[nombre] == 0
+            if completo and al_completar_programa:
+                try:
+                    al_completar_programa(nombre)
+                except Exception as e:
+                    print(f"Error finalizando {nombre}: {e}")
+        
+        def descargar(programa, intento=0):
+            reprogramado = False
+            try:
+                self.obtener_y_descargar_audio(programa, intento)
+            except DescargaReintentable as reintento:
+                reintentos.agregar(programa, reintento)
+                reprogramado = True
+            finally:
+                if not reprogramado:
+                    terminado(programa["nombre_programa"])
+        
+        if self.max_workers <= 1:
+            for programa in programas:
+                descargar(programa)
+            # Serial: only once every first attempt is done is there nothing else to do but wait
+            while len(reintentos):
+                for programa, intento in reintentos.esperar_listos():
+                    descargar(programa, intento)
+            return
+        
+        executor = self._get_executor()
+        en_curso = {executor.submit(descargar, programa) for programa in programas}
+        while en_curso or len(reintentos):
+            # With downloads in flight the loop never sleeps: it waits for one to finish or a retry to be due
+            listos = reintentos.listos() if en_curso else reintentos.esperar_listos()
+            en_curso.update(executor.submit(descargar, programa, intento) for programa, intento in listos)
+            if en_curso:
+                _, en_curso = wait(en_curso, timeout=reintentos.espera(), return_when=FIRST_COMPLETED)
+    
+    def cerrar(self):
+        """Shut down the download pool"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
     
     def get_supported_domains(self) -> List[str]:
         """Get list of supported domains"""
@@ -85,4 +338,4 @@ class ProgramaManager:
     
     def is_supported(self, url: str) -> bool:
         """Check if URL is supported"""
-        return self.factory.is_supported(url)
+        return self.factory.is_supported(url)
\ No newline at end of file
@@ -0,0 +1,162 @@
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional
+from .programa_manager import ProgramaManager
+from .descargarAudio import DescargaReintentable, consultar_tamano_async, intentar_descarga_async
+from .http_session_async import close_async_sessions
+from .metricas import en_programa, get_metricas
+
+
+class AsyncProgramaManager:
+    """Event-loop driver for ProgramaManager
+
+    HTTP (feeds, pages, HEAD requests and the audio transfers) goes through
+    aiohttp on the event loop. Scrapers are awaited through their
+    ``*_async`` methods: BaseScraper's defaults run the synchronous ones in
+    the loop's thread pool, so each scraper can be migrated to native
+    coroutines independently. yt-dlp also runs in that pool.
+    """
+
+    def __init__(self, programa_manager: ProgramaManager, max_concurrencia: int = 16):
+        self.programa_manager = programa_manager
+        self.max_concurrencia = max(1, max_concurrencia or 1)
+        self._semaforo = None
+
+    def run(self, corutina):
+        """Run a coroutine on a fresh event loop bounded to max_concurrencia"""
+        async def _principal():
+            loop = asyncio.get_running_loop()
+            loop.set_default_executor(
+                ThreadPoolExecutor(max_workers=self.max_concurrencia, thread_name_prefix="async")
+            )
+            self._semaforo = asyncio.Semaphore(self.max_concurrencia)
+            try:
+                return await corutina
+            finally:
+                await close_async_sessions()
+
+        return asyncio.run(_principal())
+
+    async def obtener_enlaces_programas(self, url: str, program_name: str = None) -> Optional[List[Dict]]:
+        """Get program episodes from any supported radio website (None if scraping failed)"""
+        metricas = get_metricas()
+        with en_programa(program_name):
+            try:
+                scraper = self.programa_manager.crear_scraper(url, program_name)
+
+                async with self._semaforo:
+                    with metricas.cronometro(
+                        "autoradio_scrape_seconds", programa=scraper.program_name, scraper=type(scraper).__name__
+                    ):
+                        episodes = await scraper.get_episodes_async()
+
+                return self.programa_manager.anotar_episodios(episodes, scraper, url)
+            except ValueError as e:
+                print(f"Error: {e}")
+                metricas.incrementar("autoradio_scrape_errors_total", programa=program_name)
+                return None
+            except Exception as e:
+                print(f"Error inesperado al procesar {url}: {e}")
+                metricas.incrementar("autoradio_scrape_errors_total", programa=program_name)
+                return None
+
+    async def obtener_y_descargar_audio(self, programa: Dict):
+        """Get and download audio from program episode
+
+        Between attempts the task sleeps with asyncio.sleep outside the
+        semaphore, so the backoff holds neither a thread nor a download slot.
+        """
+        intento = 0
+        while True:
+            try:
+                return await self._intentar_descarga(programa, intento)
+            except DescargaReintentable as reintento:
+                await asyncio.sleep(reintento.espera)
+                intento = reintento.intento
+
+    async def resolver_audio_url(self, programa: Dict) -> str:
+        """Versión async de ProgramaManager.resolver_audio_url"""
+        manager = self.programa_manager
+        conocida = manager.url_conocida(programa)
+        if conocida is not None:
+            return conocida
+
+        scraper = manager.crear_scraper_para_episodio(programa)
+        with get_metricas().cronometro(
+            "autoradio_resolve_seconds", programa=programa.get("nombre_programa"), scraper=type(scraper).__name__
+        ):
+            programa["url_resuelta"] = await scraper.get_audio_url_async(programa)
+        return programa["url_resuelta"]
+
+    async def _intentar_descarga(self, programa: Dict, intento: int):
+        """One attempt (see ProgramaManager.obtener_y_descargar_audio)"""
+        manager = self.programa_manager
+        with en_programa(programa.get("nombre_programa")):
+            try:
+                if manager.ya_descargado(programa) or not manager.tiene_enlace(programa):
+                    return
+
+                async with self._semaforo:
+                    audio_url = await self.resolver_audio_url(programa)
+                    if not audio_url:
+                        manager.sin_audio(programa)
+                        return
+                    ruta = await intentar_descarga_async(
+                        audio_url, programa["nombre_programa"], programa["titulo"], manager.directorio_base,
+                        programa.get("salida_youtube"), intento,
+                    )
+                manager.registrar_descarga(programa, audio_url, ruta)
+
+            except DescargaReintentable:
+                raise
+            except Exception as e:
+                manager.error_descarga(programa, e)
+
+    async def descargar_episodios(self, programas: List[Dict]):
+        """Download a program's episodes concurrently"""
+        await asyncio.gather(*(self.obtener_y_descargar_audio(programa) for programa in programas))
+
+    async def _preparar_episodio(self, programa: Dict) -> bool:
+        """Versión async de ProgramaManager._preparar_episodio"""
+        if self.programa_manager.ya_descargado(programa):
+            return False
+        with en_programa(programa.get("nombre_programa")):
+            try:
+                if "audio_url" in programa or "escuchar_link" in programa:
+                    async with self._semaforo:
+                        audio_url = await self.resolver_audio_url(programa)
+                        if not programa.get("tamano"):
+                            programa["tamano"] = await consultar_tamano_async(audio_url)
+            except Exception as e:
+                print(f"Error preparando {programa['titulo']}: {e}")
+        return True
+
+    async def preparar_episodios(self, programas: List[Dict]) -> List[Dict]:
+        """Pre-flight stage (see ProgramaManager.preparar_episodios)"""
+        pendientes = await asyncio.gather(*(self._preparar_episodio(programa) for programa in programas))
+        return [programa for programa, pendiente in zip(programas, pendientes) if pendiente]
+
+    async def descargar_en_orden(self, programas: List[Dict], al_completar_programa: Callable[[str], None] = None):
+        """Download episodes in the given (planned) order
+
+        Tasks are created in plan order and the semaphore wakes waiters
+        first-in first-out, so downloads start in that order.
+        al_completar_programa(nombre) runs (in a thread) once the last
+        episode of a program is done.
+        """
+        restantes = Counter(programa["nombre_programa"] for programa in programas)
+
+        async def descargar(programa):
+            try:
+                await self.obtener_y_descargar_audio(programa)
+            finally:
+                nombre = programa["nombre_programa"]
+                restantes[nombre] -= 1
+                if restantes[nombre] == 0 and al_completar_programa:
+                    try:
+                        await asyncio.to_thread(al_completar_programa, nombre)
+                    except Exception as e:
+                        print(f"Error finalizando {nombre}: {e}")
+
+        await asyncio.gather(*(descargar(programa) for programa in programas))
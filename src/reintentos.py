@@ -0,0 +1,57 @@
+"""Episodes waiting for a download retry
+
+A failed attempt (DescargaReintentable) does not sleep in its worker: the
+episode goes into a heap ordered by its not-before time and the download
+loop dispatches it when the delay expires, so other downloads keep the
+workers busy during the backoff.
+"""
+import heapq
+import itertools
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+
+class ColaReintentos:
+    """Min-heap of (no_antes_de, episode, attempt); safe to fill from worker threads"""
+
+    def __init__(self):
+        self._heap = []
+        self._orden = itertools.count()
+        self._lock = Lock()
+
+    def agregar(self, programa: Dict, reintento):
+        """Queue programa for attempt reintento.intento at reintento.no_antes_de"""
+        with self._lock:
+            heapq.heappush(self._heap, (reintento.no_antes_de, next(self._orden), programa, reintento.intento))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def espera(self) -> Optional[float]:
+        """Seconds until the next retry is due (None if there is none)"""
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def listos(self) -> List[Tuple[Dict, int]]:
+        """Take out the (episode, attempt) pairs whose time has come"""
+        ahora = time.monotonic()
+        listos = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= ahora:
+                _, _, programa, intento = heapq.heappop(self._heap)
+                listos.append((programa, intento))
+        return listos
+
+    def esperar_listos(self) -> List[Tuple[Dict, int]]:
+        """Sleep until the next retry is due and take out the ready ones
+
+        Only for when there is nothing else to run.
+        """
+        espera = self.espera()
+        if espera:
+            time.sleep(espera)
+        return self.listos()
@@ -0,0 +1,186 @@
+"""Retention of downloaded episodes
+
+Each directory is scanned once with os.scandir and every rule of the
+policy is applied in the same pass:
+
+- max_dias: delete files at least that many days old (by mtime)
+- max_archivos: keep at most that many files
+- max_bytes: keep at most that many bytes
+- conservar: the newest N files are never deleted, whatever the other rules say
+
+Count and size quotas drop the oldest files first. Raw YouTube downloads
+waiting for ffmpeg and ffmpeg's temporary files are neither counted nor
+deleted. Partial downloads (.part and its .part.json) are left alone while
+they can still be resumed; stale ones only fall under max_dias. Only
+deletions and a per-directory summary are logged.
+"""
+import os
+import time
+from typing import Dict, List, Optional
+
+from .postproceso import SUFIJO_DESCARGA
+
+PARTIAL_SUFFIX = ".part"
+
+SEGUNDOS_POR_DIA = 86400
+
+# A partial download younger than this can still be resumed by the next (daily) run
+VIGENCIA_PARCIAL = 2 * SEGUNDOS_POR_DIA
+
+
+class PoliticaRetencion:
+    """Retention rules of a program (None = rule disabled)"""
+
+    def __init__(self, max_dias: Optional[int] = None, max_archivos: Optional[int] = None,
+                 max_bytes: Optional[int] = None, conservar: int = 0):
+        self.max_dias = max_dias
+        self.max_archivos = max_archivos
+        self.max_bytes = max_bytes
+        self.conservar = conservar or 0
+
+    @classmethod
+    def desde_config(cls, config_manager, program: Dict = None) -> "PoliticaRetencion":
+        """Policy of a program: its own keys, falling back to the settings"""
+        reglas = config_manager.get_retention(program)
+        max_size_mb = reglas["max_size_mb"]
+        return cls(
+            max_dias=reglas["cleanup_days"],
+            max_archivos=reglas["max_files"],
+            max_bytes=int(max_size_mb * 1024 * 1024) if max_size_mb else None,
+            conservar=reglas["keep_newest"],
+        )
+
+    def describir(self) -> str:
+        reglas = []
+        if self.max_dias is not None:
+            reglas.append(f"≥{self.max_dias} días")
+        if self.max_archivos is not None:
+            reglas.append(f"máx. {self.max_archivos} archivos")
+        if self.max_bytes is not None:
+            reglas.append(f"máx. {self.max_bytes / 1024 / 1024:.0f} MB")
+        if self.conservar:
+            reglas.append(f"conservar los {self.conservar} más recientes")
+        return ", ".join(reglas) or "sin reglas"
+
+
+class ResultadoRetencion:
+    """What a retention pass did"""
+
+    def __init__(self):
+        self.eliminados = 0
+        self.bytes_liberados = 0
+        self.conservados = 0
+        self.errores = 0
+
+    def sumar(self, otro: "ResultadoRetencion"):
+        self.eliminados += otro.eliminados
+        self.bytes_liberados += otro.bytes_liberados
+        self.conservados += otro.conservados
+        self.errores += otro.errores
+
+
+def _en_curso(nombre: str) -> bool:
+    """Files another part of the run is still writing"""
+    base = os.path.splitext(nombre)[0]
+    return base.endswith(SUFIJO_DESCARGA) or base.endswith(".tmp")
+
+
+def _es_parcial(nombre: str) -> bool:
+    return nombre.endswith(PARTIAL_SUFFIX) or nombre.endswith(PARTIAL_SUFFIX + ".json")
+
+
+def _vencido(mtime: float, politica: PoliticaRetencion, ahora: float) -> bool:
+    return politica.max_dias is not None and (ahora - mtime) // SEGUNDOS_POR_DIA >= politica.max_dias
+
+
+def _a_eliminar(archivos: List, politica: PoliticaRetencion, ahora: float) -> List:
+    """Files (mtime, tamaño, ruta) the policy deletes; archivos sorted newest first"""
+    eliminar = []
+    conservados = 0
+    total = 0
+    for i, (mtime, tamano, ruta) in enumerate(archivos):
+        if i < politica.conservar:
+            conservados += 1
+            total += tamano
+            continue
+        vencido = _vencido(mtime, politica, ahora)
+        sobra_cantidad = politica.max_archivos is not None and conservados >= politica.max_archivos
+        sobra_espacio = politica.max_bytes is not None and total + tamano > politica.max_bytes
+        if vencido or sobra_cantidad or sobra_espacio:
+            eliminar.append((mtime, tamano, ruta))
+        else:
+            conservados += 1
+            total += tamano
+    return eliminar
+
+
+def _aplicar_directorio(directorio: str, politica: PoliticaRetencion, ahora: float,
+                        retirados: List[str], resultado: ResultadoRetencion, recursivo: bool):
+    archivos = []
+    parciales = []
+    subdirectorios = []
+    try:
+        with os.scandir(directorio) as entradas:
+            for entrada in entradas:
+                try:
+                    if entrada.is_dir(follow_symlinks=False):
+                        subdirectorios.append(entrada.path)
+                    elif entrada.is_file() and not _en_curso(entrada.name):
+                        stat = entrada.stat()
+                        if not _es_parcial(entrada.name):
+                            archivos.append((stat.st_mtime, stat.st_size, entrada.path))
+                        elif ahora - stat.st_mtime >= VIGENCIA_PARCIAL and _vencido(stat.st_mtime, politica, ahora):
+                            # Abandoned partial: not an episode, so only the age rule applies
+                            parciales.append((stat.st_mtime, stat.st_size, entrada.path))
+                except OSError as e:
+                    print(f"Error con {entrada.path}: {e}")
+                    resultado.errores += 1
+    except OSError as e:
+        print(f"Error leyendo {directorio}: {e}")
+        resultado.errores += 1
+        return
+
+    archivos.sort(reverse=True)
+    eliminar = _a_eliminar(archivos, politica, ahora)
+    parcial = ResultadoRetencion()
+    for mtime, tamano, ruta in eliminar + parciales:
+        try:
+            os.remove(ruta)
+        except OSError as e:
+            print(f"Error eliminando {ruta}: {e}")
+            parcial.errores += 1
+            continue
+        dias = int((ahora - mtime) // SEGUNDOS_POR_DIA)
+        print(f"Eliminando: {ruta} ({dias} días, {tamano / 1024 / 1024:.1f} MB)")
+        if not _es_parcial(ruta):
+            retirados.append(ruta)
+        parcial.eliminados += 1
+        parcial.bytes_liberados += tamano
+    parcial.conservados = len(archivos) - len(eliminar)
+    if parcial.eliminados:
+        print(f"🧹 {directorio}: {parcial.eliminados} eliminado(s), "
+              f"{parcial.bytes_liberados / 1024 / 1024:.1f} MB liberados, {parcial.conservados} conservado(s)")
+    resultado.sumar(parcial)
+
+    if recursivo:
+        for subdirectorio in subdirectorios:
+            _aplicar_directorio(subdirectorio, politica, ahora, retirados, resultado, recursivo)
+
+
+def aplicar_retencion(directorio, politica: PoliticaRetencion, manifest=None,
+                      recursivo: bool = True) -> ResultadoRetencion:
+    """Apply politica to directorio (and, with recursivo, to each subdirectory on its own)
+
+    Deleted episodes are marked as removed in the manifest in one transaction.
+    """
+    resultado = ResultadoRetencion()
+    directorio = str(directorio)
+    if not os.path.isdir(directorio):
+        print(f"El directorio {directorio} no existe.")
+        return resultado
+
+    retirados = []
+    _aplicar_directorio(directorio, politica, time.time(), retirados, resultado, recursivo)
+    if manifest and retirados:
+        manifest.marcar_retirados(retirados)
+    return resultado
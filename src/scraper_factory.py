@@ -90,8 +90,8 @@ class ScraperFactory:
     }
     
     @classmethod
-    def create_scraper(cls, url: str) -> BaseScraper:
-        """Create appropriate scraper based on URL"""
+    def _resolve(cls, url: str):
+        """Return (scraper_class, program_name, domain) for a URL, without instantiating it"""
         parsed_url = urlparse(url)
         domain = parsed_url.netloc.lower()
         
@@ -113,6 +113,13 @@ class ScraperFactory:
             scraper_class = cls.SCRAPER_MAPPING.get(www_domain)
             program_name = cls.PROGRAM_NAMES.get(www_domain)
         
+        return scraper_class, program_name, domain
+    
+    @classmethod
+    def create_scraper(cls, url: str) -> BaseScraper:
+        """Create appropriate scraper based on URL"""
+        scraper_class, program_name, domain = cls._resolve(url)
+        
         if scraper_class:
             return scraper_class(url, program_name)
         else:
@@ -126,8 +133,5 @@ class ScraperFactory:
     @classmethod
     def is_supported(cls, url: str) -> bool:
         """Check if URL is supported"""
-        try:
-            cls.create_scraper(url)
-            return True
-        except ValueError:
-            return False
+        scraper_class, _, _ = cls._resolve(url)
+        return scraper_class is not None
@@ -0,0 +1,61 @@
+import copy
+import json
+import os
+from threading import Lock
+from typing import Any, Dict
+
+from .http_cache import get_cache_dir
+
+
+STATE_FILE = "scraper_state.json"
+
+_scraper_state = None
+_scraper_state_lock = Lock()
+
+
+def get_scraper_state() -> "ScraperState":
+    """Process-wide state store shared by every scraper"""
+    global _scraper_state
+    with _scraper_state_lock:
+        ruta = get_cache_dir() / STATE_FILE
+        if _scraper_state is None or _scraper_state.ruta != ruta:
+            _scraper_state = ScraperState(ruta)
+        return _scraper_state
+
+
+class ScraperState:
+    """Small JSON store for what scrapers learn between runs
+
+    (which URL pattern matched last time, highest episode number seen...)
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = Lock()
+        self._data = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            if self.ruta.exists():
+                with open(self.ruta, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Error leyendo estado de scrapers ({self.ruta}): {e}")
+        return {}
+
+    def get(self, clave: str) -> Dict[str, Any]:
+        with self._lock:
+            return copy.deepcopy(self._data.get(clave, {}))
+
+    def update(self, clave: str, valores: Dict[str, Any]):
+        """Merge valores into the state of clave and save atomically"""
+        with self._lock:
+            self._data.setdefault(clave, {}).update(copy.deepcopy(valores))
+            try:
+                self.ruta.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.ruta.with_suffix('.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self._data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.ruta)
+            except OSError as e:
+                print(f"Error guardando estado de scrapers ({self.ruta}): {e}")
@@ -1,16 +1,38 @@
+import asyncio
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import List, Dict
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from ..http_cache import CachedResponse, get_http_cache
+from ..http_session import PooledSession
+from ..metricas import get_metricas
+from ..scraper_state import get_scraper_state
+from .url_prober import UrlProber
+
+try:
+    import lxml  # noqa: F401  (C parser, much faster than html.parser)
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
 
 
 class BaseScraper(ABC):
     """Base class for radio program scrapers"""
     
+    # Elements the scraper reads from its pages: tag names or a SoupStrainer.
+    # Only those (and their descendants) are built into the tree; None parses
+    # the whole document.
+    PARSE_ONLY = None
+    
     def __init__(self, base_url: str, program_name: str = None):
         self.base_url = base_url
         self.program_name = program_name or "Programa de Radio"
-        self.session = requests.Session()
+        # "Since" watermark ({"guid": ..., "fecha": ...}) set by ProgramaManager;
+        # feed scrapers stop iterating when they reach a known episode
+        self.since = None
+        self.session = PooledSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -24,26 +46,178 @@ class BaseScraper(ABC):
             'Cache-Control': 'max-age=0',
         })
     
-    def get_page_content(self, url: str) -> BeautifulSoup:
-        """Get and parse page content"""
+    def fetch(self, url: str, timeout: int = 30, **kwargs) -> CachedResponse:
+        """Conditional GET through the persistent HTTP cache"""
+        return get_http_cache().get(self.session, url, timeout=timeout, **kwargs)
+    
+    def fetch_page(self, url: str) -> CachedResponse:
+        """Fetch a page, returning None (and logging) on HTTP/network errors"""
         try:
-            response = self.session.get(url, timeout=30)
+            response = self.fetch(url, timeout=30)
             response.raise_for_status()
-            
-            content = response.content
-            # Try to detect if content is compressed (gzip magic bytes)
-            if content[:2] == b'\x1f\x8b':
-                import gzip
-                try:
-                    content = gzip.decompress(content)
-                except Exception:
-                    pass
-            
-            return BeautifulSoup(content, "html.parser", from_encoding=response.encoding or 'utf-8')
+            return response
         except requests.RequestException as e:
             print(f"Error al acceder a la página {url}: {e}")
             return None
     
+    @staticmethod
+    def _strainer(parse_only) -> SoupStrainer:
+        if not parse_only:
+            return None
+        if isinstance(parse_only, SoupStrainer):
+            return parse_only
+        if isinstance(parse_only, str):
+            parse_only = [parse_only]
+        return SoupStrainer(list(parse_only))
+    
+    def parse_html(self, response, parse_only=None) -> BeautifulSoup:
+        """Parse a fetched page with the fast backend
+        
+        parse_only (default: the class' PARSE_ONLY) restricts the tree to the
+        given tags or SoupStrainer; pass False to parse the whole document.
+        """
+        content = response.content
+        # Try to detect if content is compressed (gzip magic bytes)
+        if content[:2] == b'\x1f\x8b':
+            import gzip
+            try:
+                content = gzip.decompress(content)
+            except Exception:
+                pass
+        
+        if parse_only is None:
+            parse_only = self.PARSE_ONLY
+        
+        with get_metricas().cronometro("autoradio_parse_seconds", scraper=type(self).__name__):
+            return BeautifulSoup(
+                content,
+                HTML_PARSER,
+                parse_only=self._strainer(parse_only),
+                from_encoding=response.encoding or 'utf-8',
+            )
+    
+    def get_page_content(self, url: str, parse_only=None) -> BeautifulSoup:
+        """Get and parse page content (see parse_html for parse_only)"""
+        response = self.fetch_page(url)
+        if response is None:
+            return None
+        return self.parse_html(response, parse_only)
+    
+    @property
+    def clave(self) -> str:
+        """Identity of this scraper in the persistent caches"""
+        return f"{type(self).__name__}:{self.base_url}"
+    
+    def load_state(self) -> Dict:
+        """What this scraper remembered from previous runs"""
+        return get_scraper_state().get(self.clave)
+    
+    def save_state(self, **valores):
+        """Remember valores for the next runs"""
+        get_scraper_state().update(self.clave, valores)
+    
+    def url_prober(self, timeout: float = 5, headers: Dict[str, str] = None, **kwargs) -> UrlProber:
+        """Concurrent HEAD prober over this scraper's pooled session"""
+        return UrlProber(self.session, timeout=timeout, headers=headers, **kwargs)
+    
+    def parse_cached(self, response, parse):
+        """Return parse(response), reusing the previous run's result when the body is unchanged
+        
+        Only non-empty results are remembered, so a failed extraction is
+        retried on the next run even if the page did not change.
+        """
+        cache = get_http_cache()
+        clave = self.clave
+        
+        if getattr(response, 'unchanged', False):
+            cached = cache.load_result(response.url, clave)
+            if cached is not None:
+                print(f"   ↺ Sin cambios desde la última ejecución: {response.url}")
+                get_metricas().incrementar("autoradio_parse_cache_total", scraper=type(self).__name__, resultado="hit")
+                # A streamed body is not needed anymore: release the connection
+                response.close()
+                return self.filtrar_nuevos(cached) if isinstance(cached, list) else cached
+        
+        get_metricas().incrementar("autoradio_parse_cache_total", scraper=type(self).__name__, resultado="miss")
+        result = parse(response)
+        if result:
+            cache.save_result(response.url, clave, result)
+        return result
+    
+    async def fetch_async(self, url: str, timeout: int = 30) -> CachedResponse:
+        """Async counterpart of fetch (aiohttp, on the event loop)"""
+        return await get_http_cache().get_async(url, headers=dict(self.session.headers), timeout=timeout)
+    
+    async def fetch_page_async(self, url: str) -> CachedResponse:
+        """Async counterpart of fetch_page"""
+        try:
+            response = await self.fetch_async(url, timeout=30)
+            response.raise_for_status()
+            return response
+        except requests.RequestException as e:
+            print(f"Error al acceder a la página {url}: {e}")
+            return None
+    
+    async def get_page_content_async(self, url: str, parse_only=None) -> BeautifulSoup:
+        """Async counterpart of get_page_content"""
+        response = await self.fetch_page_async(url)
+        if response is None:
+            return None
+        return self.parse_html(response, parse_only)
+    
+    async def get_episodes_async(self) -> List[Dict]:
+        """Async counterpart of get_episodes
+        
+        This default adapts synchronous scrapers by running get_episodes in
+        the event loop's executor; migrated scrapers override it with a
+        coroutine built on fetch_async and get_page_content_async.
+        """
+        return await asyncio.to_thread(self.get_episodes)
+    
+    async def get_audio_url_async(self, episode_data: Dict) -> str:
+        """Async counterpart of get_audio_url (same adapter as get_episodes_async)"""
+        return await asyncio.to_thread(self.get_audio_url, episode_data)
+    
+    @staticmethod
+    def parse_fecha(texto: str) -> datetime:
+        """Parse an RFC 822 pubDate or ISO date, returning an aware datetime (or None)"""
+        if not texto:
+            return None
+        try:
+            fecha = parsedate_to_datetime(texto)
+        except (TypeError, ValueError):
+            try:
+                fecha = datetime.fromisoformat(texto)
+            except ValueError:
+                return None
+        if fecha.tzinfo is None:
+            fecha = fecha.replace(tzinfo=timezone.utc)
+        return fecha
+    
+    def es_conocido(self, guid: str = None, fecha: str = None) -> bool:
+        """True if an episode is at or before the "since" watermark"""
+        if not self.since:
+            return False
+        if guid and guid == self.since.get("guid"):
+            return True
+        marca = self.parse_fecha(self.since.get("fecha"))
+        fecha_episodio = self.parse_fecha(fecha)
+        if not (marca and fecha_episodio):
+            return False
+        # With a GUID watermark, another episode published at the same time is still new
+        if self.since.get("guid") and guid:
+            return fecha_episodio < marca
+        return fecha_episodio <= marca
+    
+    def filtrar_nuevos(self, episodes: List[Dict]) -> List[Dict]:
+        """Keep only the episodes newer than the watermark (feeds are newest first)"""
+        nuevos = []
+        for episode in episodes:
+            if self.es_conocido(episode.get("guid"), episode.get("fecha")):
+                break
+            nuevos.append(episode)
+        return nuevos
+    
     @abstractmethod
     def get_episodes(self) -> List[Dict]:
         """Get list of episodes from the radio program website"""
@@ -1,4 +1,3 @@
-import requests
 from bs4 import BeautifulSoup
 import re
 from .base_scraper import BaseScraper
@@ -18,7 +17,7 @@ class BibleProjectScraper(BaseScraper):
         episodes = []
         
         try:
-            response = requests.get(self.base_url, timeout=30)
+            response = self.session.get(self.base_url, timeout=30)
             soup = BeautifulSoup(response.text, 'html.parser')
             
             # Buscar todos los enlaces a episodios
@@ -84,7 +83,7 @@ class BibleProjectScraper(BaseScraper):
         print(f"\n🔍 Buscando audio en: {episode_url}")
         
         try:
-            response = requests.get(episode_url, timeout=30)
+            response = self.session.get(episode_url, timeout=30)
             soup = BeautifulSoup(response.text, 'html.parser')
             page_text = response.text
             
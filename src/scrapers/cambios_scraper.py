@@ -1,8 +1,18 @@
-import requests
-from bs4 import BeautifulSoup
 import re
-from typing import List, Dict
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Optional
 from .base_scraper import BaseScraper
+from ..ytdlp_sesion import get_ytdlp
+
+
+# Días tras los que se vuelve a leer la playlist completa (también se relee si falta un día)
+REFRESCO_TABLA_DIAS = 30
+
+# Días (hoy incluido) que se dejan resueltos en cada ejecución
+DIAS_ANTICIPADOS = 7
+
+# Videos de la playlist: uno por día de un año de 365 días
+DIAS_CICLO = 365
 
 
 class CambiosProfundosScraper(BaseScraper):
@@ -13,42 +23,43 @@ class CambiosProfundosScraper(BaseScraper):
         self.program_name = program_name or "Cambios Profundos"
         # Playlist de YouTube que mencionan en la página
         self.youtube_playlist_id = "PL0uPKz84O97MwC5LMBwdvMH67Xw60eD4R"
+        # (tabla, releída) cargada una sola vez por ejecución
+        self._cargada = None
     
     def get_episodes(self, url=None, max_episodes=5) -> List[Dict]:
         """Obtiene el episodio del día actual desde la playlist de YouTube"""
         print(f"\n🔍 Buscando episodio del día en YouTube...")
-        from datetime import datetime
         
         episodes = []
         
         try:
-            # Calcular día del año (1-365/366)
+            # Calcular día del año (1-365)
             hoy = datetime.now()
-            dia_del_anio = hoy.timetuple().tm_yday
+            dia_del_anio = self._dia(hoy.date())
             
             print(f"  📅 Día del año: {dia_del_anio}")
-            print(f"  🔗 Accediendo al índice {dia_del_anio} de la playlist...")
             
-            # Método 1: Intentar obtener el video desde la playlist
-            video_id = self._get_video_from_playlist_index(dia_del_anio)
+            # Método 1: días ya resueltos o tabla día → video guardada (sin peticiones)
+            video_id = self.video_del_dia(hoy.date())
+            
+            # Método 2: pedir la página del índice a YouTube
+            if not video_id:
+                print(f"  🔗 Accediendo al índice {dia_del_anio} de la playlist...")
+                video_id = self._get_video_from_playlist_index(dia_del_anio)
             
             if video_id:
-                video_url_final = f"https://www.youtube.com/watch?v={video_id}"
-                titulo = f"Un año de cambios: Día {dia_del_anio}"
+                episode = self._episodio(hoy.date(), video_id)
+                episodes.append(episode)
                 
-                episodes.append({
-                    "titulo": titulo,
-                    "escuchar_link": video_url_final,
-                    "video_id": video_id,
-                    "nombre_programa": self.program_name
-                })
-                
-                print(f"  ✓ Encontrado: {titulo}")
+                print(f"  ✓ Encontrado: {episode['titulo']}")
                 print(f"  ✓ Video ID: {video_id}")
-                print(f"  ✓ URL: {video_url_final}")
+                print(f"  ✓ URL: {episode['escuchar_link']}")
+                
+                proximos = self.resolver_proximos(DIAS_ANTICIPADOS)
+                print(f"  ✓ {len(proximos)}/{DIAS_ANTICIPADOS} días desde hoy resueltos en la tabla")
             else:
                 print(f"  ✗ No se pudo obtener el video del día {dia_del_anio}")
-                
+        
         except Exception as e:
             print(f"✗ Error: {e}")
             import traceback
@@ -56,6 +67,130 @@ class CambiosProfundosScraper(BaseScraper):
         
         return episodes
     
+    @staticmethod
+    def _dia(fecha: date) -> int:
+        """Índice de fecha en la playlist
+        
+        El 31 de diciembre de un año bisiesto (día 366) usa el día 365, que ya
+        está en el manifest, en vez de buscar un video que no existe.
+        """
+        return min(fecha.timetuple().tm_yday, DIAS_CICLO)
+    
+    def _episodio(self, fecha: date, video_id: str) -> Dict:
+        dia = self._dia(fecha)
+        return {
+            "titulo": f"Un año de cambios: Día {dia}",
+            "escuchar_link": f"https://www.youtube.com/watch?v={video_id}",
+            "video_id": video_id,
+            # El ciclo se repite cada año con los mismos videos: el año distingue
+            # el episodio de hoy del del año pasado en el manifest
+            "guid": f"cambios-profundos:{fecha.year}-{dia:03d}",
+            "nombre_programa": self.program_name
+        }
+    
+    def _tabla_vigente(self, estado: Dict) -> bool:
+        if estado.get("playlist") != self.youtube_playlist_id or not estado.get("videos"):
+            return False
+        try:
+            actualizado = date.fromisoformat(estado.get("actualizado"))
+        except (TypeError, ValueError):
+            return False
+        return (date.today() - actualizado).days < REFRESCO_TABLA_DIAS
+    
+    def _construir_tabla(self) -> List[Optional[str]]:
+        """Video IDs de toda la playlist en orden (posición N-1 = índice N), con yt-dlp"""
+        print(f"  🔄 Leyendo la playlist completa para la tabla día → video...")
+        playlist_url = f"https://www.youtube.com/playlist?list={self.youtube_playlist_id}"
+        try:
+            entries = get_ytdlp().listar(playlist_url, limite=None)
+        except ImportError:
+            print(f"    ✗ yt-dlp no está instalado")
+            return []
+        except Exception as e:
+            print(f"    ✗ Error leyendo la playlist: {str(e)[:200]}")
+            return []
+        
+        # Se conservan las posiciones aunque falte algún video (privado/borrado)
+        tabla = [(entry or {}).get('id') for entry in entries]
+        if any(tabla):
+            self.save_state(
+                playlist=self.youtube_playlist_id, videos=tabla, actualizado=date.today().isoformat()
+            )
+            print(f"    ✓ Tabla de {len(tabla)} videos guardada")
+        return tabla
+    
+    def _tabla(self):
+        """(tabla día → video, si ya se releyó la playlist en esta ejecución)
+        
+        Se carga una vez por ejecución; si no está vigente se relee en ese
+        momento, y no se vuelve a intentar aunque la lectura falle.
+        """
+        if self._cargada is None:
+            estado = self.load_state()
+            tabla = estado.get("videos") or []
+            if self._tabla_vigente(estado):
+                self._cargada = (tabla, False)
+            else:
+                # Si no se puede releer, mejor una tabla vieja que ninguna
+                self._cargada = (self._construir_tabla() or tabla, True)
+        return self._cargada
+    
+    def _releer(self) -> List[Optional[str]]:
+        """Tabla con la playlist releída (una sola lectura por ejecución)"""
+        tabla, releida = self._tabla()
+        if not releida:
+            self._cargada = (self._construir_tabla() or tabla, True)
+        return self._cargada[0]
+    
+    def _resueltos(self) -> Dict[str, str]:
+        """{fecha ISO: video_id} que dejó resolver_proximos en ejecuciones anteriores"""
+        estado = self.load_state()
+        if estado.get("playlist") != self.youtube_playlist_id:
+            return {}
+        return estado.get("proximos") or {}
+    
+    @staticmethod
+    def _buscar(tabla: List[Optional[str]], dia: int) -> Optional[str]:
+        return tabla[dia - 1] if 0 < dia <= len(tabla) else None
+    
+    def video_del_dia(self, fecha: date) -> Optional[str]:
+        """video_id de fecha: de los días ya resueltos o de la tabla guardada"""
+        dia = self._dia(fecha)
+        video_id = self._resueltos().get(fecha.isoformat())
+        if video_id:
+            print(f"  ✓ Video del día {dia} ya resuelto: {video_id}")
+            return video_id
+        
+        video_id = self._buscar(self._tabla()[0], dia)
+        if not video_id:
+            # La playlist pudo cambiar desde que se guardó la tabla
+            video_id = self._buscar(self._releer(), dia)
+        
+        if video_id:
+            print(f"  ✓ Video del día {dia} en la tabla: {video_id}")
+        return video_id
+    
+    def resolver_proximos(self, dias: int = DIAS_ANTICIPADOS) -> Dict[str, str]:
+        """{fecha ISO: video_id} de hoy y de los próximos dias-1 días
+        
+        Se guardan en el estado para que video_del_dia los use en las próximas
+        ejecuciones. Si falta alguno en la tabla se relee la playlist ahora
+        (si no se releyó ya en esta ejecución), no el día que toque.
+        """
+        fechas = [date.today() + timedelta(days=i) for i in range(dias)]
+        tabla = self._tabla()[0]
+        if not all(self._buscar(tabla, self._dia(fecha)) for fecha in fechas):
+            tabla = self._releer()
+        
+        proximos = {}
+        for fecha in fechas:
+            video_id = self._buscar(tabla, self._dia(fecha))
+            if video_id:
+                proximos[fecha.isoformat()] = video_id
+        if proximos and proximos != self._resueltos():
+            self.save_state(proximos=proximos)
+        return proximos
+    
     def _get_video_from_playlist_index(self, index: int) -> str:
         """Obtiene el video_id desde un índice específico de la playlist usando el truco de índice directo"""
         try:
@@ -70,7 +205,7 @@ class CambiosProfundosScraper(BaseScraper):
             }
             
             print(f"    Accediendo directamente al índice {index}...")
-            response = requests.get(direct_url, headers=headers, timeout=30, allow_redirects=True)
+            response = self.session.get(direct_url, headers=headers, timeout=30, allow_redirects=True)
             
             if response.status_code != 200:
                 print(f"    Error: HTTP {response.status_code}")
@@ -116,7 +251,7 @@ class CambiosProfundosScraper(BaseScraper):
             
             print(f"    ✗ No se pudo extraer el video_id del índice {index}")
             return None
-            
+        
         except Exception as e:
             print(f"    ✗ Error obteniendo video de playlist: {e}")
             return None
@@ -1,8 +1,20 @@
-import requests
 import re
 from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
 
+MEDIA_BASE = "https://medios.elcaminodelavida.org/audio/WEB-RPH"
+
+# Solo para la primera búsqueda (sin marca guardada); no es un tope
+EPISODIO_SEMILLA = 4600
+# Saltos del galope (+1, +2, +4... +2^(GALOPE-1)) y de la ventana en frío (-1... -2^(VENTANA_FRIO-1))
+GALOPE = 6
+VENTANA_FRIO = 10
+# Rondas de galope tras la ventana (el último salto es +2^(GALOPE*MAX_GALOPES-1));
+# si después todo sigue existiendo, el servidor responde 200 a cualquier número
+MAX_GALOPES = 3
+# Puntos probados a la vez en cada ronda de la búsqueda k-aria
+PUNTOS_POR_RONDA = 7
+
 class CaminoVidaScraper(BaseScraper):
     """
     Scraper para El Camino de la Vida - Reflexión para Hoy
@@ -19,7 +31,7 @@ class CaminoVidaScraper(BaseScraper):
         
         try:
             # Acceder a la página principal
-            response = requests.get(
+            response = self.session.get(
                 "https://www.elcaminodelavida.org/",
                 timeout=15,
                 headers={'User-Agent': 'Mozilla/5.0'}
@@ -42,7 +54,7 @@ class CaminoVidaScraper(BaseScraper):
             print(f"   ✓ Encontrado embed de Subsplash")
             
             # Acceder al contenido del iframe
-            iframe_response = requests.get(
+            iframe_response = self.session.get(
                 iframe_src,
                 timeout=15,
                 headers={'User-Agent': 'Mozilla/5.0'}
@@ -66,6 +78,7 @@ class CaminoVidaScraper(BaseScraper):
                     # Extraer número de episodio del URL
                     rph_match = re.search(r'RPH(\d+)', valid_urls[0])
                     episode_num = rph_match.group(1) if rph_match else "reciente"
+                    self._guardar_marca(valid_urls[0])
                     
                     return [{
                         "titulo": f"Reflexión para Hoy - RPH {episode_num}",
@@ -80,9 +93,88 @@ class CaminoVidaScraper(BaseScraper):
             print(f"   ✗ Error: {e}")
             return self._fallback_search(max_episodes)
     
+    def _mp3_url(self, month, episode_num):
+        return f"{MEDIA_BASE}/WEB-RPH{month}/RPH{episode_num}-WEB.mp3"
+    
+    def _guardar_marca(self, audio_url):
+        """Recordar el episodio más alto visto (número y carpeta del mes)"""
+        match = re.search(r'WEB-RPH(\d{2})/RPH(\d+)', audio_url)
+        if match:
+            episode_num = int(match.group(2))
+            if episode_num >= self.load_state().get("episodio", 0):
+                self.save_state(episodio=episode_num, mes=match.group(1))
+    
+    def _probar(self, prober, numeros, months):
+        """HEAD en paralelo de cada número en cada mes: {numero: mes} de los que existen"""
+        candidatos = [
+            (self._mp3_url(month, n), (n, month))
+            for n in sorted(set(numeros)) if n > 0
+            for month in months
+        ]
+        encontrados = {}
+        for _, (n, month) in prober.todos(candidatos):
+            encontrados.setdefault(n, month)
+        return encontrados
+    
+    def _buscar_ultimo(self, prober, months, semilla, en_frio):
+        """Número (y mes) del episodio más reciente, partiendo de semilla
+        
+        Los números son monótonos: se ancla una ventana alrededor de la
+        semilla, se galopa hacia adelante (+1, +2, +4...) hasta pasar el
+        último episodio y se acota el intervalo [existe, no existe] probando
+        varios puntos a la vez en cada ronda. Si tras MAX_GALOPES rondas
+        todavía existe todo, se devuelve la semilla.
+        """
+        saltos = [2 ** k for k in range(GALOPE)]
+        ventana = [semilla] + [semilla + d for d in saltos]
+        if en_frio:
+            ventana += [semilla - 2 ** k for k in range(VENTANA_FRIO)]
+        
+        encontrados = encontrados_semilla = self._probar(prober, ventana, months)
+        if not encontrados:
+            return None, None
+        
+        lo = max(encontrados)
+        lo_month = encontrados[lo]
+        faltan = [n for n in ventana if n > lo and n not in encontrados]
+        hi = min(faltan) if faltan else None
+        
+        # Galope: mientras todos los saltos existan, seguir avanzando
+        galopes = 0
+        while hi is None:
+            if galopes == MAX_GALOPES:
+                print(f"  ⚠ Todos los números hasta RPH {lo} responden: se usa RPH {semilla}")
+                return semilla, encontrados_semilla.get(semilla, lo_month)
+            galopes += 1
+            puntos = [lo + d for d in saltos]
+            encontrados = self._probar(prober, puntos, months)
+            if encontrados:
+                lo = max(encontrados)
+                lo_month = encontrados[lo]
+            faltan = [n for n in puntos if n > lo and n not in encontrados]
+            hi = min(faltan) if faltan else None
+            saltos = [d * 2 ** GALOPE for d in saltos]
+        
+        # Búsqueda k-aria entre lo (existe) y hi (no existe)
+        while hi - lo > 1:
+            paso = max(1, (hi - lo) // (PUNTOS_POR_RONDA + 1))
+            puntos = list(range(lo + paso, hi, paso))[:PUNTOS_POR_RONDA]
+            encontrados = self._probar(prober, puntos, months)
+            if encontrados:
+                lo = max(encontrados)
+                lo_month = encontrados[lo]
+            faltan = [n for n in puntos if n > lo and n not in encontrados]
+            hi = min(faltan + [hi])
+        
+        return lo, lo_month
+    
     def _fallback_search(self, max_episodes):
         """
         Método de respaldo: Buscar directamente por construcción de URLs
+        
+        Parte del episodio más alto visto en ejecuciones anteriores (o de
+        EPISODIO_SEMILLA la primera vez) y lo busca con pocas rondas de HEAD
+        concurrentes.
         """
         print(f"   🔄 Usando búsqueda directa como respaldo...")
         
@@ -92,6 +184,7 @@ class CaminoVidaScraper(BaseScraper):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Referer': 'https://www.elcaminodelavida.org/'
         }
+        prober = self.url_prober(timeout=10, headers=headers, max_workers=12)
         
         # Probar múltiples meses
         current_month = datetime.now().month
@@ -104,55 +197,37 @@ class CaminoVidaScraper(BaseScraper):
             str(prev_month).zfill(2),
         ]
         
+        marca = self.load_state()
+        if marca.get("mes") and marca["mes"] not in months_to_try:
+            months_to_try.append(marca["mes"])
+        
         print(f"  📅 Buscando en meses: {', '.join(months_to_try)}")
         
-        highest_episode = 0
-        best_month = None
-        start_episode = 4600
+        if marca.get("episodio"):
+            print(f"  📌 Último episodio visto: RPH {marca['episodio']} (mes {marca.get('mes')})")
+            highest_episode, best_month = self._buscar_ultimo(prober, months_to_try, marca["episodio"], en_frio=False)
+            if not highest_episode:
+                # La marca ya no está publicada: buscar alrededor de ella
+                highest_episode, best_month = self._buscar_ultimo(prober, months_to_try, marca["episodio"], en_frio=True)
+        else:
+            highest_episode, best_month = self._buscar_ultimo(prober, months_to_try, EPISODIO_SEMILLA, en_frio=True)
         
-        # Buscar el episodio más alto
-        for month in months_to_try:
-            for i in range(100):
-                episode_num = start_episode - i
-                url_mp3 = f"https://medios.elcaminodelavida.org/audio/WEB-RPH/WEB-RPH{month}/RPH{episode_num}-WEB.mp3"
-                
-                try:
-                    response = requests.head(url_mp3, headers=headers, timeout=10, allow_redirects=True)
-                    
-                    if response.status_code == 200:
-                        if episode_num > highest_episode:
-                            highest_episode = episode_num
-                            best_month = month
-                        break
-                        
-                except Exception:
-                    pass
-        
-        if highest_episode > 0:
+        if highest_episode:
             print(f"  ✓ Episodio más reciente: RPH {highest_episode} (mes {best_month})")
+            self._guardar_marca(self._mp3_url(best_month, highest_episode))
             
-            episodes = []
-            for i in range(max_episodes * 2):
-                episode_num = highest_episode - i
-                url_mp3 = f"https://medios.elcaminodelavida.org/audio/WEB-RPH/WEB-RPH{best_month}/RPH{episode_num}-WEB.mp3"
-                
-                try:
-                    response = requests.head(url_mp3, headers=headers, timeout=5, allow_redirects=True)
-                    
-                    if response.status_code == 200:
-                        episodes.append({
-                            "titulo": f"Reflexión para Hoy - RPH {episode_num}",
-                            "audio_url": url_mp3,
-                            "nombre_programa": self.program_name
-                        })
-                        
-                        if len(episodes) >= max_episodes:
-                            break
-                            
-                except Exception:
-                    pass
+            # Los episodios anteriores, también en paralelo
+            numeros = range(highest_episode, highest_episode - max_episodes * 2, -1)
+            candidatos = [(self._mp3_url(best_month, n), n) for n in numeros if n > 0]
             
-            return episodes
+            return [
+                {
+                    "titulo": f"Reflexión para Hoy - RPH {episode_num}",
+                    "audio_url": url_mp3,
+                    "nombre_programa": self.program_name
+                }
+                for url_mp3, episode_num in prober.todos(candidatos)[:max_episodes]
+            ]
         
         print(f"  ✗ No se encontraron episodios")
         return []
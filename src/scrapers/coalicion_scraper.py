@@ -1,12 +1,18 @@
 import re
 import random
-from typing import List, Dict
+from contextlib import closing
+from itertools import islice
+from typing import List, Dict, Optional
 from .base_scraper import BaseScraper
+from .feed_engine import iter_entries
 
 
 class CoalicionScraper(BaseScraper):
     """Scraper for Coalición por el Evangelio - Podcasts"""
     
+    # Las páginas solo se recorren buscando enlaces
+    PARSE_ONLY = 'a'
+    
     def get_episodes(self) -> List[Dict]:
         """Get episodes from Coalición por el Evangelio RSS feed or page source"""
         
@@ -15,6 +21,8 @@ class CoalicionScraper(BaseScraper):
         
         if is_sermon_podcast:
             print(f"   🎲 Modo aleatorio activado para sermones")
+            # El sorteo necesita el catálogo completo, no solo los episodios nuevos
+            self.since = None
         
         # Estrategia 1: Intentar obtener desde el RSS feed
         rss_url = self._get_rss_url()
@@ -23,9 +31,13 @@ class CoalicionScraper(BaseScraper):
             print(f"   Intentando RSS feed: {rss_url}")
             
             try:
-                response = self.session.get(rss_url, timeout=30)
+                response = self.fetch(rss_url, timeout=30, stream=True)
                 if response.status_code == 200:
-                    episodes = self._parse_rss(response.text)
+                    episodes = self.parse_cached(response, self._parse_rss)
+                    if episodes == []:
+                        # El feed se leyó bien: no hay nada más nuevo que la marca
+                        print(f"   ✓ RSS sin episodios nuevos")
+                        return []
                     if episodes:
                         print(f"   ✓ Obtenidos {len(episodes)} episodios desde RSS")
                         
@@ -88,35 +100,10 @@ class CoalicionScraper(BaseScraper):
         print(f"   Intentando buscar MP3s directamente en la página...")
         
         try:
-            response = self.session.get(self.base_url, timeout=30)
-            html_content = response.text
-            
-            # Buscar todos los MP3 en la página
-            mp3_patterns = [
-                r'https://media\.blubrry\.com/[^"\'<>\s]+\.mp3',
-                r'https://media\.thegospelcoalition\.org/wp-content/uploads/sites/\d+/\d+/\d+/\d+/[^"\'<>\s]+\.mp3',
-            ]
+            response = self.fetch(self.base_url, timeout=30)
+            episodes = self.parse_cached(response, self._extract_mp3s_from_page)
             
-            found_mp3s = set()
-            for pattern in mp3_patterns:
-                matches = re.findall(pattern, html_content)
-                found_mp3s.update(matches)
-            
-            if found_mp3s:
-                print(f"   ✓ Encontrados {len(found_mp3s)} archivos MP3 en la página")
-                
-                episodes = []
-                for i, mp3_url in enumerate(list(found_mp3s)[:20], 1):  # Limitar a 20
-                    # Extraer título del nombre del archivo
-                    filename = mp3_url.split('/')[-1].replace('.mp3', '')
-                    title = filename.replace('-', ' ').replace('_', ' ').title()
-                    
-                    episodes.append({
-                        "titulo": f"{title[:60]}",
-                        "audio_url": mp3_url,
-                        "nombre_programa": self.program_name
-                    })
-                
+            if episodes:
                 # Si es sermones, seleccionar uno aleatorio
                 if is_sermon_podcast and len(episodes) > 1:
                     selected = random.choice(episodes)
@@ -128,7 +115,8 @@ class CoalicionScraper(BaseScraper):
             print(f"   ✗ Error buscando MP3s: {e}")
         
         # Estrategia 4: Buscar enlaces a episodios individuales
-        soup = self.get_page_content(self.base_url)
+        # (documento completo: el título puede salir del contenedor del enlace)
+        soup = self.get_page_content(self.base_url, parse_only=False)
         if not soup:
             return []
         
@@ -189,6 +177,38 @@ class CoalicionScraper(BaseScraper):
         
         return episodes
     
+    def _extract_mp3s_from_page(self, response) -> List[Dict]:
+        """Busca enlaces MP3 directos en el HTML de la página"""
+        html_content = response.text
+        
+        # Buscar todos los MP3 en la página
+        mp3_patterns = [
+            r'https://media\.blubrry\.com/[^"\'<>\s]+\.mp3',
+            r'https://media\.thegospelcoalition\.org/wp-content/uploads/sites/\d+/\d+/\d+/\d+/[^"\'<>\s]+\.mp3',
+        ]
+        
+        found_mp3s = set()
+        for pattern in mp3_patterns:
+            matches = re.findall(pattern, html_content)
+            found_mp3s.update(matches)
+        
+        episodes = []
+        if found_mp3s:
+            print(f"   ✓ Encontrados {len(found_mp3s)} archivos MP3 en la página")
+            
+            for i, mp3_url in enumerate(list(found_mp3s)[:20], 1):  # Limitar a 20
+                # Extraer título del nombre del archivo
+                filename = mp3_url.split('/')[-1].replace('.mp3', '')
+                title = filename.replace('-', ' ').replace('_', ' ').title()
+                
+                episodes.append({
+                    "titulo": f"{title[:60]}",
+                    "audio_url": mp3_url,
+                    "nombre_programa": self.program_name
+                })
+        
+        return episodes
+    
     def _get_rss_url(self) -> str:
         """Determina la URL del RSS feed según el podcast"""
         if 'mujeres' in self.base_url.lower():
@@ -206,68 +226,35 @@ class CoalicionScraper(BaseScraper):
         return None
     
     
-    def _parse_rss(self, rss_content: str) -> List[Dict]:
-        from xml.etree import ElementTree as ET
-
-        is_articulos_podcast = 'tgc-articulos-podcast' in self.base_url.lower()
-        is_mujeres_podcast = 'mujeres' in self.base_url.lower()
-
+    def _parse_rss(self, response) -> Optional[List[Dict]]:
+        """Episodios nuevos del feed ([] si no hay ninguno, None si el feed falló)"""
         try:
-            root = ET.fromstring(rss_content)
             episodes = []
+            leidos = 0
 
-            for item in root.findall('.//item')[:50]:
-                title_elem = item.find('title')
-                link_elem = item.find('link')
-                enclosure = item.find('enclosure')
-
-                if title_elem is None:
-                    continue
-                title = title_elem.text.strip()
-
-                # PARA ARTÍCULOS PODCAST
-                if is_articulos_podcast:
-                    if enclosure is None:
-                        continue
-                    audio_url = enclosure.get('url')
-                    if not audio_url or '.mp3' not in audio_url.lower():
+            # Items leídos del stream; la conexión se cierra al dejar de iterar
+            # (artículos, mujeres y el resto de podcasts usan el enclosure MP3)
+            with closing(iter_entries(response)) as entries:
+                for entry in islice(entries, 50):
+                    leidos += 1
+                    if not entry.title:
                         continue
-                    episodes.append({
-                        "titulo": title,
-                        "audio_url": audio_url,
-                        "nombre_programa": self.program_name
-                    })
-                    continue
 
-                # PARA MUJERES PODCAST
-                if is_mujeres_podcast:
-                    if enclosure is None:
-                        continue
-                    audio_url = enclosure.get('url')
+                    # Parar en el primer episodio ya visto en ejecuciones anteriores
+                    if self.es_conocido(entry.guid, entry.pub_date):
+                        break
+
+                    audio_url = entry.enclosure_url
                     if not audio_url or '.mp3' not in audio_url.lower():
                         continue
-                    episodes.append({
-                        "titulo": title,
-                        "audio_url": audio_url,
-                        "nombre_programa": self.program_name
-                    })
-                    continue
+                    episodes.append(entry.to_episode(self.program_name))
 
-                # Para otros podcasts normales
-                if enclosure is not None:
-                    audio_url = enclosure.get('url')
-                    if audio_url and '.mp3' in audio_url.lower():
-                        episodes.append({
-                            "titulo": title,
-                            "audio_url": audio_url,
-                            "nombre_programa": self.program_name
-                        })
-
-            return episodes
+            # Sin ningún item no es un feed (p. ej. una página de error con estado 200)
+            return episodes if leidos else None
 
         except Exception as e:
             print(f"   ✗ Error parseando RSS: {e}")
-            return []
+            return None
     
     def get_audio_url(self, episode_data: Dict) -> str:
         """Extract audio URL from episode data"""
@@ -1,6 +1,8 @@
 import re
-from typing import List, Dict
+from contextlib import closing
+from typing import List, Dict, Optional
 from .base_scraper import BaseScraper
+from .feed_engine import iter_entries
 
 
 class CrianzaReverenteScraper(BaseScraper):
@@ -24,6 +26,9 @@ class CrianzaReverenteScraper(BaseScraper):
         
         # Method 1: Try RSS feeds (most reliable)
         rss_episodes = self._get_episodes_from_rss()
+        if rss_episodes == []:
+            print(f"   ✓ RSS sin episodios nuevos")
+            return []
         if rss_episodes:
             print(f"   ✓ {len(rss_episodes)} episodios encontrados en RSS")
             return rss_episodes[:5]
@@ -43,71 +48,63 @@ class CrianzaReverenteScraper(BaseScraper):
         print(f"   ✗ No se pudieron obtener episodios")
         return episodes
     
-    def _get_episodes_from_rss(self) -> List[Dict]:
-        """Get episodes from RSS feeds"""
-        episodes = []
+    def _get_episodes_from_rss(self) -> Optional[List[Dict]]:
+        """Get episodes from the first RSS feed that parses (None if none does)
         
-        try:
-            import feedparser
-            
-            for rss_url in self.rss_feeds:
-                try:
-                    print(f"   🔄 Intentando RSS: {rss_url}")
-                    feed = feedparser.parse(rss_url)
-                    
-                    if not feed.entries:
-                        continue
-                    
-                    print(f"      ✓ Encontradas {len(feed.entries)} entradas")
-                    
-                    for entry in feed.entries[:5]:
-                        title = entry.title if hasattr(entry, 'title') else "Crianza Reverente Podcast"
-                        
-                        # Look for audio enclosure
-                        audio_url = None
-                        if hasattr(entry, 'enclosures') and entry.enclosures:
-                            for enclosure in entry.enclosures:
-                                if hasattr(enclosure, 'type') and 'audio' in enclosure.type:
-                                    audio_url = enclosure.href
-                                    break
-                        
-                        # Also check for links in entry
-                        if not audio_url and hasattr(entry, 'links'):
-                            for link in entry.links:
-                                if link.get('type', '').startswith('audio/'):
-                                    audio_url = link.get('href')
-                                    break
-                        
-                        if audio_url:
-                            episodes.append({
-                                "titulo": title,
-                                "audio_url": audio_url,
-                                "nombre_programa": self.program_name
-                            })
-                            print(f"      - {title[:50]}...")
-                    
-                    if episodes:
-                        return episodes
-                        
-                except Exception as e:
-                    print(f"      ✗ Error con {rss_url}: {e}")
+        A feed that parses but has nothing newer than the watermark gives [],
+        so the mirrors are not fetched again on unchanged runs.
+        """
+        for rss_url in self.rss_feeds:
+            try:
+                print(f"   🔄 Intentando RSS: {rss_url}")
+                response = self.fetch(rss_url, timeout=30, stream=True)
+                if response.status_code != 200:
+                    response.close()
                     continue
+                
+                episodes = self.parse_cached(response, self._parse_feed)
+                if episodes is not None:
+                    return episodes
                     
-        except ImportError:
-            print("   ✗ feedparser no está instalado (pip install feedparser)")
-        except Exception as e:
-            print(f"   ✗ Error en RSS: {e}")
+            except Exception as e:
+                print(f"      ✗ Error con {rss_url}: {e}")
+                continue
         
-        return episodes
+        return None
+    
+    def _parse_feed(self, response) -> Optional[List[Dict]]:
+        """Extrae los 5 episodios con audio más recientes leyendo el feed en streaming
+        
+        None si la respuesta no tiene ningún item (no es un feed válido).
+        """
+        episodes = []
+        leidos = 0
+        
+        with closing(iter_entries(response)) as entries:
+            for entry in entries:
+                leidos += 1
+                title = entry.title or "Crianza Reverente Podcast"
+                
+                # Parar en el primer episodio ya visto en ejecuciones anteriores
+                if self.es_conocido(entry.guid, entry.pub_date):
+                    break
+                
+                # Look for audio enclosure
+                if entry.enclosure_url and 'audio' in (entry.enclosure_type or ''):
+                    episode = entry.to_episode(self.program_name)
+                    episode["titulo"] = title
+                    episodes.append(episode)
+                    print(f"      - {title[:50]}...")
+                    if len(episodes) >= 5:
+                        break
+        
+        return episodes if leidos else None
     
     def _get_episodes_from_apple_podcasts(self) -> List[Dict]:
         """Get episodes from Apple Podcasts lookup API"""
         episodes = []
         
         try:
-            import requests
-            import json
-            
             # Buscar el podcast en iTunes Search API
             search_url = "https://itunes.apple.com/search"
             params = {
@@ -117,7 +114,7 @@ class CrianzaReverenteScraper(BaseScraper):
             }
             
             print(f"   🔄 Buscando en Apple Podcasts...")
-            response = requests.get(search_url, params=params, timeout=10)
+            response = self.session.get(search_url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -130,25 +127,11 @@ class CrianzaReverenteScraper(BaseScraper):
                         print(f"      ✓ Feed encontrado: {feed_url}")
                         
                         # Parse the feed
-                        import feedparser
-                        feed = feedparser.parse(feed_url)
-                        
-                        for entry in feed.entries[:5]:
-                            title = entry.title if hasattr(entry, 'title') else "Episodio"
-                            
-                            audio_url = None
-                            if hasattr(entry, 'enclosures') and entry.enclosures:
-                                for enclosure in entry.enclosures:
-                                    if hasattr(enclosure, 'type') and 'audio' in enclosure.type:
-                                        audio_url = enclosure.href
-                                        break
-                            
-                            if audio_url:
-                                episodes.append({
-                                    "titulo": title,
-                                    "audio_url": audio_url,
-                                    "nombre_programa": self.program_name
-                                })
+                        feed_response = self.fetch(feed_url, timeout=30, stream=True)
+                        if feed_response.status_code == 200:
+                            episodes = self.parse_cached(feed_response, self._parse_feed) or []
+                        else:
+                            feed_response.close()
                         
                         return episodes
                         
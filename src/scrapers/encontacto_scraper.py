@@ -1,6 +1,6 @@
-import requests
-from bs4 import BeautifulSoup
+from contextlib import closing
 from .base_scraper import BaseScraper
+from .feed_engine import iter_entries
 
 class EnContactoScraper(BaseScraper):
     """
@@ -17,9 +17,10 @@ class EnContactoScraper(BaseScraper):
         print(f"\n🔍 Obteniendo episodios desde RSS de Omny...")
         
         try:
-            response = requests.get(
+            response = self.fetch(
                 self.rss_url,
                 timeout=15,
+                stream=True,
                 headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
             )
             
@@ -27,42 +28,37 @@ class EnContactoScraper(BaseScraper):
                 print(f"   ✗ Error HTTP {response.status_code}")
                 return []
             
-            # Parsear el RSS
-            soup = BeautifulSoup(response.content, 'xml')
-            
-            # Buscar todos los items (episodios)
-            items = soup.find_all('item')
-            
-            if not items:
-                print(f"   ✗ No se encontraron episodios en el RSS")
-                return []
-            
-            print(f"   ✓ Encontrados {len(items)} episodios en el RSS")
-            
-            episodes = []
-            for item in items[:10]:  # Limitar a 10 más recientes
-                # Extraer información del episodio
-                title = item.find('title')
-                enclosure = item.find('enclosure')
-                pub_date = item.find('pubDate')
-                
-                if title and enclosure:
-                    audio_url = enclosure.get('url')
-                    episode_title = title.text.strip()
-                    
-                    episodes.append({
-                        'titulo': episode_title,
-                        'audio_url': audio_url,
-                        'fecha': pub_date.text.strip() if pub_date else '',
-                        'nombre_programa': self.program_name
-                    })
-            
-            return episodes
+            return self.parse_cached(response, self._parse_feed)
             
         except Exception as e:
             print(f"   ✗ Error obteniendo RSS: {e}")
             return []
     
+    def _parse_feed(self, response):
+        """Extrae los episodios del feed leyendo solo los items necesarios"""
+        episodes = []
+        
+        # Los items se leen del stream; se corta la descarga al tener 10
+        with closing(iter_entries(response)) as entries:
+            for entry in entries:
+                # Parar en el primer episodio ya visto en ejecuciones anteriores
+                if self.es_conocido(entry.guid, entry.pub_date):
+                    break
+                
+                if entry.title and entry.enclosure_url:
+                    episode = entry.to_episode(self.program_name)
+                    episode['fecha'] = entry.pub_date or ''
+                    episodes.append(episode)
+                    if len(episodes) >= 10:  # Limitar a 10 más recientes
+                        break
+        
+        if not episodes:
+            print(f"   ✗ No se encontraron episodios nuevos en el RSS")
+        else:
+            print(f"   ✓ Encontrados {len(episodes)} episodios en el RSS")
+        
+        return episodes
+    
     def get_audio_url(self, episode_data):
         """Retorna la URL de audio directamente desde el RSS"""
         return episode_data.get('audio_url')
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""Shared RSS/podcast feed engine
+
+Every feed-based scraper delegates here, so parsing speed, namespace
+handling and fixes live in one place. Items are parsed incrementally from
+the response stream, each one in a single pass over its children, and
+detached once consumed. lxml (fast path, lenient with broken feeds) is used
+when installed; otherwise the standard library parser.
+"""
+from typing import Dict, Iterator, Optional
+from xml.etree import ElementTree as ET
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+
+CHUNK_SIZE = 16 * 1024
+ITUNES_NS = "http://www.itunes.com/dtds/podcast-1.0.dtd"
+
+USE_LXML = lxml_etree is not None
+
+
+class FeedEntry:
+    """One <item> of a feed, with the fields the scrapers use"""
+
+    __slots__ = ('title', 'guid', 'pub_date', 'link', 'enclosure_url',
+                 'enclosure_length', 'enclosure_type', 'duration')
+
+    def __init__(self):
+        self.title = None
+        self.guid = None
+        self.pub_date = None
+        self.link = None
+        self.enclosure_url = None
+        self.enclosure_length = None
+        self.enclosure_type = None
+        self.duration = None
+
+    def to_episode(self, program_name: str, audio_url: str = None) -> Dict:
+        """Episode dict as returned by the scrapers' get_episodes()"""
+        episode = {
+            "titulo": self.title,
+            "audio_url": audio_url or self.enclosure_url,
+            "guid": self.guid,
+            "fecha": self.pub_date,
+            "nombre_programa": program_name,
+        }
+        if self.enclosure_length:
+            episode["tamano"] = self.enclosure_length
+        if self.duration:
+            episode["duracion"] = self.duration
+        return episode
+
+
+def _split_tag(tag):
+    """(namespace, local name) of an element tag; ('', '') for comments/PIs"""
+    if not isinstance(tag, str):
+        return '', ''
+    if tag[:1] == '{':
+        namespace, _, name = tag[1:].partition('}')
+        return namespace, name
+    return '', tag
+
+
+def _text(elem) -> Optional[str]:
+    text = elem.text
+    if text:
+        text = text.strip()
+    return text or None
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        number = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+def parse_duration(value: str) -> Optional[int]:
+    """itunes:duration ("SS", "MM:SS" or "HH:MM:SS") in seconds"""
+    if not value:
+        return None
+    try:
+        seconds = 0
+        for part in value.strip().split(':'):
+            seconds = seconds * 60 + int(float(part))
+    except ValueError:
+        return None
+    return seconds or None
+
+
+_ITUNES_DURATION = f"{{{ITUNES_NS}}}duration"
+
+
+def entry_from_item(item) -> FeedEntry:
+    """Build a FeedEntry in a single pass over the children of an <item>
+
+    Tags are compared as plain strings (namespaced ones in ``{ns}name``
+    form), which keeps the per-child cost to a few comparisons.
+    """
+    entry = FeedEntry()
+    for child in item:
+        tag = child.tag
+        if tag == 'title':
+            entry.title = _text(child)
+        elif tag == 'guid':
+            entry.guid = _text(child)
+        elif tag == 'pubDate':
+            entry.pub_date = _text(child)
+        elif tag == 'link':
+            entry.link = _text(child) or child.get('href')
+        elif tag == 'enclosure':
+            enclosure_type = child.get('type') or ''
+            # Keep the first enclosure, unless a later one is the audio one
+            if entry.enclosure_url is None or (
+                'audio' in enclosure_type and 'audio' not in (entry.enclosure_type or '')
+            ):
+                entry.enclosure_url = (child.get('url') or '').strip() or None
+                entry.enclosure_length = _to_int(child.get('length'))
+                entry.enclosure_type = enclosure_type or None
+        elif tag == _ITUNES_DURATION:
+            entry.duration = parse_duration(child.text)
+    return entry
+
+
+def _iter_items_lxml(chunks) -> Iterator:
+    parser = lxml_etree.XMLPullParser(
+        events=('end',), tag='{*}item', recover=True, resolve_entities=False, no_network=True
+    )
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            yield elem
+            # Free the consumed item and everything before it
+            elem.clear(keep_tail=True)
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+
+def _iter_items_stdlib(chunks) -> Iterator:
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                stack.append(elem)
+                continue
+            stack.pop()
+            if _split_tag(elem.tag)[1] == 'item':
+                yield elem
+                # Detach the consumed item so the tree does not grow
+                if stack:
+                    stack[-1].remove(elem)
+
+
+def iter_chunks(data: bytes, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Split an in-memory feed into chunks for iter_entries_from_chunks"""
+    return (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+
+
+def iter_entries_from_chunks(chunks, use_lxml: bool = None) -> Iterator[FeedEntry]:
+    """Yield the FeedEntry of each <item> while the feed bytes arrive"""
+    use_lxml = USE_LXML if use_lxml is None else (use_lxml and lxml_etree is not None)
+    iter_items = _iter_items_lxml if use_lxml else _iter_items_stdlib
+    errors = (ET.ParseError, lxml_etree.XMLSyntaxError) if lxml_etree is not None else ET.ParseError
+    try:
+        for item in iter_items(chunk for chunk in chunks if chunk):
+            yield entry_from_item(item)
+    except errors as e:
+        print(f"   ⚠ Error parseando el feed: {e}")
+
+
+def iter_entries(response, chunk_size: int = CHUNK_SIZE) -> Iterator[FeedEntry]:
+    """Yield the entries of a feed straight from the response stream
+
+    Fetch with ``stream=True``: memory and parse time depend on how many
+    entries the caller reads, not on the feed length. Stop iterating (ideally
+    with ``contextlib.closing``) to close the connection without reading
+    the rest of the feed.
+    """
+    try:
+        yield from iter_entries_from_chunks(response.iter_content(chunk_size))
+    finally:
+        response.close()
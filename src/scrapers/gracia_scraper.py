@@ -1,4 +1,3 @@
-import requests
 from typing import List, Dict
 from datetime import datetime, timedelta
 from .base_scraper import BaseScraper
@@ -9,27 +8,34 @@ class GraciaScraper(BaseScraper):
     
     def get_episodes(self) -> List[Dict]:
         """Obtiene el episodio más reciente construyendo la URL directamente"""
-        episodes = []
-        
+        encontrado = self.url_prober(timeout=10, allow_redirects=False).primero(self._candidatos())
+        return self._episodios(encontrado)
+    
+    async def get_episodes_async(self) -> List[Dict]:
+        """Versión async de get_episodes (HEAD con aiohttp)"""
+        encontrado = await self.url_prober(timeout=10, allow_redirects=False).primero_async(self._candidatos())
+        return self._episodios(encontrado)
+    
+    def _candidatos(self):
         # El patrón de URL es: https://cdn.gty.org/gracia/podcast/YYYYMMDD.mp3
-        # Intentar los últimos 7 días
+        # Intentar los últimos 7 días (HEAD en paralelo, gana el más reciente)
+        candidatos = []
         for days_ago in range(7):
             date = datetime.now() - timedelta(days=days_ago)
             date_str = date.strftime('%Y%m%d')  # Formato: 20251114
-            audio_url = f"https://cdn.gty.org/gracia/podcast/{date_str}.mp3"
-            
-            try:
-                response = requests.head(audio_url, timeout=10)
-                if response.status_code == 200:
-                    episodes.append({
-                        "titulo": f"Gracia a Vosotros - {date.strftime('%d/%m/%Y')}",
-                        "audio_url": audio_url,
-                        "nombre_programa": self.program_name
-                    })
-                    print(f"✓ Episodio encontrado: {date.strftime('%d/%m/%Y')}")
-                    break
-            except:
-                continue
+            candidatos.append((f"https://cdn.gty.org/gracia/podcast/{date_str}.mp3", date))
+        return candidatos
+    
+    def _episodios(self, encontrado) -> List[Dict]:
+        episodes = []
+        if encontrado:
+            audio_url, date = encontrado
+            episodes.append({
+                "titulo": f"Gracia a Vosotros - {date.strftime('%d/%m/%Y')}",
+                "audio_url": audio_url,
+                "nombre_programa": self.program_name
+            })
+            print(f"✓ Episodio encontrado: {date.strftime('%d/%m/%Y')}")
         
         return episodes[:1]  # Solo el más reciente
     
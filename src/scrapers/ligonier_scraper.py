@@ -1,9 +1,11 @@
-import re
 from typing import List, Dict
+from contextlib import closing
 from .base_scraper import BaseScraper
+from .feed_engine import iter_entries
 
 # RSS feed URL para Renovando Tu Mente
 RTM_RSS_URL = "https://renovandotumente.ligonier.org/rss"
+MAX_EPISODES = 5
 
 
 class LigonierScraper(BaseScraper):
@@ -31,63 +33,50 @@ class LigonierScraper(BaseScraper):
         episodes = []
 
         try:
-            import requests
-            import xml.etree.ElementTree as ET
-
-            response = requests.get(
-                RTM_RSS_URL,
-                headers=self.session.headers,
-                timeout=30,
-                allow_redirects=True,
-            )
+            response = self.fetch(RTM_RSS_URL, timeout=30, stream=True)
 
             if response.status_code != 200:
                 print(f"Error fetching RSS: HTTP {response.status_code}")
                 return episodes
 
-            root = ET.fromstring(response.content)
-            channel = root.find('channel')
-            if channel is None:
-                print("No se encontró <channel> en el RSS")
-                return episodes
+            episodes = self.parse_cached(response, self._parse_feed)
+
+        except Exception as e:
+            print(f"Error obteniendo episodios de Ligonier via RSS: {e}")
+
+        return episodes
 
-            items = channel.findall('item')
+    def _parse_feed(self, response) -> List[Dict]:
+        """Extrae los episodios (con su enclosure MP3) leyendo el feed en streaming."""
+        episodes = []
 
-            for item in items[:5]:  # Limitar a los 5 más recientes
-                title_el = item.find('title')
-                title = title_el.text.strip() if title_el is not None else self.program_name
+        # Solo se leen los items necesarios; la conexión se cierra al terminar
+        with closing(iter_entries(response)) as entries:
+            for entry in entries:
+                title = entry.title or self.program_name
 
-                # El MP3 viene en el tag <enclosure url="..." type="audio/mpeg" />
-                enclosure = item.find('enclosure')
-                audio_url = None
-                if enclosure is not None:
-                    audio_url = enclosure.get('url')
+                # Los items vienen del más reciente al más antiguo: parar en el primero ya visto
+                if self.es_conocido(entry.guid, entry.pub_date):
+                    break
 
-                # Fallback: buscar en <link> o en la descripción
-                if not audio_url:
-                    link_el = item.find('link')
-                    episode_link = link_el.text.strip() if link_el is not None else None
-                else:
-                    link_el = item.find('link')
-                    episode_link = link_el.text.strip() if link_el is not None else None
+                # El MP3 viene en <enclosure url="..." type="audio/mpeg" />
+                audio_url = entry.enclosure_url
 
                 if audio_url:
                     # Normalizar URL (fix protocol-relative)
                     if audio_url.startswith('//'):
                         audio_url = 'https:' + audio_url
 
-                    episodes.append({
-                        "titulo": title,
-                        "audio_url": audio_url,
-                        "escuchar_link": episode_link or audio_url,
-                        "nombre_programa": self.program_name,
-                    })
+                    episode = entry.to_episode(self.program_name, audio_url)
+                    episode["titulo"] = title
+                    # Fallback: link del item
+                    episode["escuchar_link"] = entry.link or audio_url
+                    episodes.append(episode)
+                    if len(episodes) >= MAX_EPISODES:  # Limitar a los 5 más recientes
+                        break
                 else:
                     print(f"No se encontró enclosure MP3 para: {title}")
 
-        except Exception as e:
-            print(f"Error obteniendo episodios de Ligonier via RSS: {e}")
-
         return episodes
 
     def get_audio_url(self, episode_data: Dict) -> str:
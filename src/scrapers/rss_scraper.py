@@ -1,6 +1,6 @@
-import requests
-from bs4 import BeautifulSoup
+from contextlib import closing
 from .base_scraper import BaseScraper
+from .feed_engine import iter_entries
 
 class RSSFeedScraper(BaseScraper):
     """Scraper genérico para RSS feeds (Anchor, Podbean, etc.)"""
@@ -17,51 +17,68 @@ class RSSFeedScraper(BaseScraper):
         episodes = []
         
         try:
-            response = requests.get(self.base_url, timeout=30)
+            response = self.fetch(self.base_url, timeout=30, stream=True)
             response.raise_for_status()
             
-            # Parsear como XML
-            soup = BeautifulSoup(response.content, 'xml')
-            
-            # Buscar todos los items
-            items = soup.find_all('item')
-            
-            print(f"✓ Encontrados {len(items)} episodios en el feed")
+            episodes = self.parse_cached(response, lambda r: self._parse_feed(r, max_episodes))
+        
+        except Exception as e:
+            print(f"✗ Error: {e}")
+        
+        return episodes
+    
+    async def get_episodes_async(self, max_episodes=5):
+        """Versión async de get_episodes: el feed se descarga con aiohttp"""
+        
+        print(f"\n🔍 Obteniendo episodios desde RSS feed...")
+        
+        episodes = []
+        
+        try:
+            response = await self.fetch_async(self.base_url, timeout=30)
+            response.raise_for_status()
             
-            for item in items[:max_episodes]:
-                # Obtener título
-                title_tag = item.find('title')
-                title = title_tag.get_text(strip=True) if title_tag else "Episodio"
+            episodes = self.parse_cached(response, lambda r: self._parse_feed(r, max_episodes))
+        
+        except Exception as e:
+            print(f"✗ Error: {e}")
+        
+        return episodes
+    
+    def _parse_feed(self, response, max_episodes):
+        """Extrae los episodios del feed leyendo solo los items necesarios"""
+        episodes = []
+        
+        # Los items se leen del stream; se corta la descarga al tener suficientes
+        with closing(iter_entries(response)) as entries:
+            for entry in entries:
+                title = entry.title or "Episodio"
                 
-                # Buscar URL del audio en enclosure
-                enclosure = item.find('enclosure')
+                # Detenerse en el primer episodio ya visto en ejecuciones anteriores
+                if self.es_conocido(entry.guid, entry.pub_date):
+                    print(f"  ↺ Sin episodios nuevos a partir de: {title}")
+                    break
                 
-                audio_url = None
-                if enclosure:
-                    audio_url = enclosure.get('url')
+                # Buscar URL del audio en enclosure
+                audio_url = entry.enclosure_url
                 
-                # Si no hay enclosure, buscar en otros tags
-                if not audio_url:
-                    # Buscar en link
-                    link_tag = item.find('link')
-                    if link_tag:
-                        link_text = link_tag.get_text(strip=True)
-                        if '.mp3' in link_text or '.m4a' in link_text:
-                            audio_url = link_text
+                # Si no hay enclosure, buscar en link
+                if not audio_url and entry.link:
+                    if '.mp3' in entry.link or '.m4a' in entry.link:
+                        audio_url = entry.link
                 
                 if audio_url:
-                    episodes.append({
-                        "titulo": title,
-                        "audio_url": audio_url,
-                        "nombre_programa": self.program_name
-                    })
+                    episode = entry.to_episode(self.program_name, audio_url)
+                    episode["titulo"] = title
+                    episodes.append(episode)
                     
                     print(f"  📝 {title}")
+                    if len(episodes) >= max_episodes:
+                        break
                 else:
                     print(f"  ⚠ Sin audio: {title}")
         
-        except Exception as e:
-            print(f"✗ Error: {e}")
+        print(f"✓ Leídos {len(episodes)} episodios del feed")
         
         return episodes
     
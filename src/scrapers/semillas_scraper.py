@@ -1,9 +1,30 @@
 import re
-import requests
 from datetime import datetime, timedelta
 from typing import List, Dict
+from bs4 import SoupStrainer
 from .base_scraper import BaseScraper
 
+# Elementos que usa cada método de extracción (el resto del HTML no se construye)
+AUDIOPATH_ONLY = SoupStrainer(attrs={'data-audiopath': True})
+
+# Formatos de fecha comunes en los nombres de archivo
+DATE_FORMATS = [
+    '%Y-%m-%d',  # 2024-11-26
+    '%Y%m%d',    # 20241126
+    '%d-%m-%Y',  # 26-11-2024
+    '%d%m%Y',    # 26112024
+    '%Y_%m_%d',  # 2024_11_26
+    '%d_%m_%Y',  # 26_11_2024
+]
+
+# Patrones de URL comunes
+URL_PATTERNS = [
+    'https://www.semillasalaire.com.ar/wp-content/uploads/programas/{date}.mp3',
+    'https://www.semillasalaire.com.ar/wp-content/uploads/programas/programa-{date}.mp3',
+    'https://www.semillasalaire.com.ar/wp-content/uploads/programas/semillas-{date}.mp3',
+    'https://www.semillasalaire.com.ar/wp-content/uploads/{date}.mp3',
+]
+
 class SemillasScraper(BaseScraper):
     """Scraper for Semillas al Aire radio program"""
     
@@ -12,10 +33,10 @@ class SemillasScraper(BaseScraper):
         
         # Estrategia 1: Scrapear la página principal
         print(f"   🔍 Buscando en la página principal...")
-        soup = self.get_page_content(self.base_url)
+        response = self.fetch_page(self.base_url)
         
-        if soup:
-            episodes = self._extract_from_page(soup)
+        if response:
+            episodes = self.parse_cached(response, self._extract_from_page)
             if episodes:
                 # Verificar que el URL sea válido (no sea 'today.mp3')
                 valid_episodes = [ep for ep in episodes if 'today.mp3' not in ep['audio_url']]
@@ -28,10 +49,10 @@ class SemillasScraper(BaseScraper):
         # Estrategia 2: Buscar en programas anteriores
         print(f"   🔍 Buscando en programas anteriores...")
         anterior_url = "https://www.semillasalaire.com.ar/programas-anteriores/"
-        soup_anterior = self.get_page_content(anterior_url)
+        response_anterior = self.fetch_page(anterior_url)
         
-        if soup_anterior:
-            episodes = self._extract_from_page(soup_anterior)
+        if response_anterior:
+            episodes = self.parse_cached(response_anterior, self._extract_from_page)
             if episodes:
                 # Filtrar 'today.mp3' también aquí
                 valid_episodes = [ep for ep in episodes if 'today.mp3' not in ep['audio_url']]
@@ -43,10 +64,16 @@ class SemillasScraper(BaseScraper):
         print(f"   🔄 Construyendo URLs por fecha...")
         return self._build_urls_by_date()
     
-    def _extract_from_page(self, soup) -> List[Dict]:
-        """Intenta extraer episodios de la página"""
+    def _extract_from_page(self, response) -> List[Dict]:
+        """Intenta extraer episodios de la página
+        
+        Cada método parsea solo los elementos que necesita, empezando por
+        el más barato; el documento completo solo se construye al final.
+        """
         episodes = []
         
+        soup = self.parse_html(response, AUDIOPATH_ONLY)
+        
         # Método 1: audio con data-audiopath
         audio_elements = soup.find_all('audio', attrs={'data-audiopath': True})
         for audio in audio_elements:
@@ -83,7 +110,7 @@ class SemillasScraper(BaseScraper):
         
         # Método 3: tags de audio normales
         if not episodes:
-            audio_tags = soup.find_all('audio')
+            audio_tags = self.parse_html(response, 'audio').find_all('audio')
             for audio in audio_tags:
                 src = audio.get('src')
                 if src and '.mp3' in src:
@@ -101,7 +128,7 @@ class SemillasScraper(BaseScraper):
         # Método 4: buscar URLs de MP3 en el HTML completo
         if not episodes:
             mp3_pattern = r'https?://[^\s"\'<>]+\.mp3'
-            mp3_urls = re.findall(mp3_pattern, str(soup))
+            mp3_urls = re.findall(mp3_pattern, response.text)
             
             # Filtrar URLs válidas (que contengan semillasalaire)
             valid_urls = [url for url in mp3_urls if 'semillasalaire' in url.lower()]
@@ -127,6 +154,8 @@ class SemillasScraper(BaseScraper):
         
         # Método 5: buscar links a archivos MP3
         if not episodes:
+            # Documento completo: el título puede salir del contenedor del link
+            soup = self.parse_html(response, parse_only=False)
             links = soup.find_all('a', href=re.compile(r'\.mp3'))
             for link in links:
                 href = link.get('href')
@@ -154,7 +183,11 @@ class SemillasScraper(BaseScraper):
         return episodes
     
     def _build_urls_by_date(self) -> List[Dict]:
-        """Construye URLs basándose en fechas recientes"""
+        """Construye URLs basándose en fechas recientes
+        
+        Las combinaciones se prueban en paralelo (HEAD sobre conexiones del
+        pool), primero con el formato/patrón que funcionó la última vez.
+        """
         
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -162,51 +195,42 @@ class SemillasScraper(BaseScraper):
         
         episodes = []
         today = datetime.now()
-        
-        # Probar diferentes formatos de fecha comunes
-        date_formats = [
-            lambda d: d.strftime('%Y-%m-%d'),           # 2024-11-26
-            lambda d: d.strftime('%Y%m%d'),             # 20241126
-            lambda d: d.strftime('%d-%m-%Y'),           # 26-11-2024
-            lambda d: d.strftime('%d%m%Y'),             # 26112024
-            lambda d: d.strftime('%Y_%m_%d'),           # 2024_11_26
-            lambda d: d.strftime('%d_%m_%Y'),           # 26_11_2024
-        ]
-        
-        # Patrones de URL comunes
-        url_patterns = [
-            'https://www.semillasalaire.com.ar/wp-content/uploads/programas/{date}.mp3',
-            'https://www.semillasalaire.com.ar/wp-content/uploads/programas/programa-{date}.mp3',
-            'https://www.semillasalaire.com.ar/wp-content/uploads/programas/semillas-{date}.mp3',
-            'https://www.semillasalaire.com.ar/wp-content/uploads/{date}.mp3',
-        ]
-        
-        # Probar últimos 7 días
-        for days_back in range(7):
-            date = today - timedelta(days=days_back)
-            
-            # Probar cada formato de fecha
-            for date_format in date_formats:
-                date_str = date_format(date)
-                
-                # Probar cada patrón de URL
-                for pattern in url_patterns:
-                    url = pattern.format(date=date_str)
-                    
-                    try:
-                        response = requests.head(url, headers=headers, timeout=5, allow_redirects=True)
-                        
-                        if response.status_code == 200:
-                            print(f"   ✓ Encontrado: {date.strftime('%d/%m/%Y')}")
-                            episodes.append({
-                                "titulo": f"Programa {date.strftime('%d/%m/%Y')}",
-                                "audio_url": url,
-                                "nombre_programa": self.program_name
-                            })
-                            return episodes  # Retornar el primero encontrado
-                            
-                    except Exception:
-                        pass
+        # Probar últimos 7 días, del más reciente al más antiguo
+        dates = [today - timedelta(days=days_back) for days_back in range(7)]
+        
+        estado = self.load_state()
+        combinaciones = [(date_format, pattern) for date_format in DATE_FORMATS for pattern in URL_PATTERNS]
+        anterior = (estado.get("formato_fecha"), estado.get("patron_url"))
+        if anterior in combinaciones:
+            combinaciones.remove(anterior)
+            combinaciones.insert(0, anterior)
+        
+        def candidatos(combos):
+            for date in dates:
+                for date_format, pattern in combos:
+                    url = pattern.format(date=date.strftime(date_format))
+                    yield url, (date, date_format, pattern)
+        
+        prober = self.url_prober(timeout=5, headers=headers)
+        
+        # Primero la combinación que funcionó la última vez; si no, el resto
+        encontrado = None
+        if anterior == combinaciones[0]:
+            encontrado = prober.primero(candidatos(combinaciones[:1]))
+            combinaciones = combinaciones[1:]
+        if not encontrado:
+            encontrado = prober.primero(candidatos(combinaciones))
+        
+        if encontrado:
+            url, (date, date_format, pattern) = encontrado
+            print(f"   ✓ Encontrado: {date.strftime('%d/%m/%Y')}")
+            self.save_state(formato_fecha=date_format, patron_url=pattern)
+            episodes.append({
+                "titulo": f"Programa {date.strftime('%d/%m/%Y')}",
+                "audio_url": url,
+                "nombre_programa": self.program_name
+            })
+            return episodes  # Retornar el más reciente encontrado
         
         print(f"   ✗ No se encontraron episodios recientes")
         return episodes
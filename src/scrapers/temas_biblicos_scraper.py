@@ -6,12 +6,21 @@ from .base_scraper import BaseScraper
 class TemasBiblicosScraper(BaseScraper):
     """Scraper para Temas Bíblicos desde Acast"""
     
+    # Listado: links de episodios (con su <h2>); episodio: <audio>
+    PARSE_ONLY = ('a', 'audio')
+    
     def get_episodes(self) -> List[Dict]:
         """Obtiene el episodio más reciente"""
-        soup = self.get_page_content("https://shows.acast.com/temas-biblicos/episodes")
-        if not soup:
+        response = self.fetch_page("https://shows.acast.com/temas-biblicos/episodes")
+        if not response:
             return []
         
+        return self.parse_cached(response, self._extract_latest)
+    
+    def _extract_latest(self, response) -> List[Dict]:
+        """Extrae el primer episodio del listado"""
+        soup = self.parse_html(response)
+        
         # Buscar primer link de episodio
         link = soup.find('a', href=re.compile(r'/temas-biblicos/episodes/'))
         if link:
@@ -25,15 +34,15 @@ class TemasBiblicosScraper(BaseScraper):
     
     def get_audio_url(self, episode_data: Dict) -> str:
         """Extrae URL de audio desde la página del episodio"""
-        soup = self.get_page_content(episode_data.get("escuchar_link"))
-        if not soup:
+        response = self.fetch_page(episode_data.get("escuchar_link"))
+        if not response:
             return None
         
         # Buscar elemento audio
-        audio = soup.find('audio')
+        audio = self.parse_html(response).find('audio')
         if audio and audio.get('src'):
             return audio.get('src')
         
         # Buscar en el HTML
-        match = re.search(r'https://[^"\s]*\.acast\.com/[^"\s]*\.mp3[^"\s]*', str(soup))
+        match = re.search(r'https://[^"\s]*\.acast\.com/[^"\s]*\.mp3[^"\s]*', response.text)
         return match.group(0) if match else None
\ No newline at end of file
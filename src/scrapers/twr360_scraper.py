@@ -6,12 +6,20 @@ from .base_scraper import BaseScraper
 class TWR360Scraper(BaseScraper):
     """Scraper for TWR360 radio programs"""
     
+    # Listing: <h1><a>; episode page: "Escuchar" <a>; audio page: <audio>/<script>
+    PARSE_ONLY = ('h1', 'a', 'audio', 'script')
+    
     def get_episodes(self) -> List[Dict]:
         """Get episodes from TWR360 website"""
-        soup = self.get_page_content(self.base_url)
-        if not soup:
+        response = self.fetch_page(self.base_url)
+        if not response:
             return []
         
+        return self.parse_cached(response, self._extract_episodes)
+    
+    def _extract_episodes(self, response) -> List[Dict]:
+        """Extract episode links from the program page"""
+        soup = self.parse_html(response)
         episodes = []
         
         # Look for h1 tags with links to episodes
@@ -31,9 +39,17 @@ class TWR360Scraper(BaseScraper):
         
         if not episodes:
             print(f"   ⚠ No se encontraron episodios en el HTML recibido")
-            print(f"   Tamaño: {len(str(soup))} caracteres")
+            print(f"   Tamaño: {len(response.content)} bytes")
         return episodes
     
+    async def get_episodes_async(self) -> List[Dict]:
+        """Async counterpart of get_episodes (aiohttp)"""
+        response = await self.fetch_page_async(self.base_url)
+        if not response:
+            return []
+        
+        return self.parse_cached(response, self._extract_episodes)
+    
     def get_audio_url(self, episode_data: Dict) -> str:
         """Extract audio URL from TWR360 episode page"""
         episode_url = episode_data["escuchar_link"]
@@ -43,63 +59,105 @@ class TWR360Scraper(BaseScraper):
         if not soup:
             return None
         
-        # Look for "Escuchar" link that leads to the audio page
+        # If we found the audio page URL, go there to get the audio element
+        audio_page_url = self._audio_page_url(soup)
+        if audio_page_url:
+            audio_soup = self.get_page_content(audio_page_url)
+            if audio_soup:
+                src = self._audio_from_page(audio_soup)
+                if src:
+                    return src
+        
+        # Fallback: Try to construct the audio URL directly from episode ID
+        direct_audio_url = self._direct_audio_url(episode_url)
+        if direct_audio_url:
+            audio_soup = self.get_page_content(direct_audio_url)
+            if audio_soup:
+                return self._audio_element_src(audio_soup)
+        
+        return None
+    
+    async def get_audio_url_async(self, episode_data: Dict) -> str:
+        """Async counterpart of get_audio_url (same pages, fetched with aiohttp)"""
+        episode_url = episode_data["escuchar_link"]
+        
+        soup = await self.get_page_content_async(episode_url)
+        if not soup:
+            return None
+        
+        audio_page_url = self._audio_page_url(soup)
+        if audio_page_url:
+            audio_soup = await self.get_page_content_async(audio_page_url)
+            if audio_soup:
+                src = self._audio_from_page(audio_soup)
+                if src:
+                    return src
+        
+        direct_audio_url = self._direct_audio_url(episode_url)
+        if direct_audio_url:
+            audio_soup = await self.get_page_content_async(direct_audio_url)
+            if audio_soup:
+                return self._audio_element_src(audio_soup)
+        
+        return None
+    
+    def _audio_page_url(self, soup) -> str:
+        """URL of the audio page behind the episode's "Escuchar" link"""
         escuchar_links = soup.find_all('a', string=re.compile(r'Escuchar', re.I))
-        audio_page_url = None
         
         for link in escuchar_links:
             href = link.get('href')
             if href and 'action,audio' in href:
                 # For TWR360, we need to use the base domain, not the full ministry URL
                 if href.startswith('/'):
-                    audio_page_url = f"https://www.twr360.org{href}"
-                else:
-                    audio_page_url = self.normalize_url(href)
-                break
+                    return f"https://www.twr360.org{href}"
+                return self.normalize_url(href)
+        return None
+    
+    def _audio_from_page(self, audio_soup) -> str:
+        """MP3 URL of an audio page, from its <audio> element or its scripts"""
+        # Look for audio element with src attribute
+        audio_element = audio_soup.find('audio')
+        if audio_element:
+            src = audio_element.get('src')
+            if src and '.mp3' in src:
+                return src
+            
+            # Check for source elements within audio
+            source = audio_element.find('source')
+            if source and source.get('src'):
+                src = source.get('src')
+                if '.mp3' in src:
+                    return src
         
-        # If we found the audio page URL, go there to get the audio element
-        if audio_page_url:
-            audio_soup = self.get_page_content(audio_page_url)
-            if audio_soup:
-                # Look for audio element with src attribute
-                audio_element = audio_soup.find('audio')
-                if audio_element:
-                    src = audio_element.get('src')
-                    if src and '.mp3' in src:
-                        return src
-                    
-                    # Check for source elements within audio
-                    source = audio_element.find('source')
-                    if source and source.get('src'):
-                        src = source.get('src')
-                        if '.mp3' in src:
-                            return src
+        # Look in script tags for audio URLs on the audio page
+        for script in audio_soup.find_all("script"):
+            if script.string and '.mp3' in script.string:
+                # Look for the specific TWR360 pattern: src: 'URL'
+                src_match = re.search(r"src:\s*['\"]([^'\"]*\.mp3[^'\"]*)['\"]", script.string)
+                if src_match:
+                    return src_match.group(1)
                 
-                # Look in script tags for audio URLs on the audio page
-                for script in audio_soup.find_all("script"):
-                    if script.string and '.mp3' in script.string:
-                        # Look for the specific TWR360 pattern: src: 'URL'
-                        src_match = re.search(r"src:\s*['\"]([^'\"]*\.mp3[^'\"]*)['\"]", script.string)
-                        if src_match:
-                            return src_match.group(1)
-                        
-                        # Fallback: Look for any MP3 URLs in scripts
-                        mp3_match = re.search(r"['\"]https?://[^'\"]*\.mp3[^'\"]*['\"]", script.string)
-                        if mp3_match:
-                            return mp3_match.group(0).strip('\'"')
-        
-        # Fallback: Try to construct the audio URL directly from episode ID
+                # Fallback: Look for any MP3 URLs in scripts
+                mp3_match = re.search(r"['\"]https?://[^'\"]*\.mp3[^'\"]*['\"]", script.string)
+                if mp3_match:
+                    return mp3_match.group(0).strip('\'"')
+        return None
+    
+    @staticmethod
+    def _direct_audio_url(episode_url: str) -> str:
+        """The action,audio URL of an episode, built from its ID"""
         episode_id_match = re.search(r'/id,(\d+)/', episode_url)
-        if episode_id_match:
-            episode_id = episode_id_match.group(1)
-            # Try the action,audio URL directly
-            direct_audio_url = f"{episode_url.split('/programs/view')[0]}/programs/view/id,{episode_id}/action,audio/lang,2"
-            audio_soup = self.get_page_content(direct_audio_url)
-            if audio_soup:
-                audio_element = audio_soup.find('audio')
-                if audio_element and audio_element.get('src'):
-                    src = audio_element.get('src')
-                    if '.mp3' in src:
-                        return src
-        
+        if not episode_id_match:
+            return None
+        episode_id = episode_id_match.group(1)
+        return f"{episode_url.split('/programs/view')[0]}/programs/view/id,{episode_id}/action,audio/lang,2"
+    
+    @staticmethod
+    def _audio_element_src(audio_soup) -> str:
+        audio_element = audio_soup.find('audio')
+        if audio_element and audio_element.get('src'):
+            src = audio_element.get('src')
+            if '.mp3' in src:
+                return src
         return None
@@ -0,0 +1,161 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from ..http_session_async import solicitar
+
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class UrlProber:
+    """Concurrent HEAD probes for scrapers that guess URLs (dates, numbers...)
+
+    Candidates are given in priority order (best first: most recent date,
+    pattern that matched last time...). They are probed concurrently over
+    the scraper's pooled session; as soon as a hit is found, every lower
+    priority probe that has not started yet is cancelled, and only the
+    better candidates still in flight are awaited.
+
+    The ``*_async`` methods do the same with aiohttp on the event loop, at
+    most max_workers probes at a time.
+    """
+
+    def __init__(self, session, max_workers: int = DEFAULT_MAX_WORKERS, timeout: float = 5,
+                 headers: Dict[str, str] = None, allow_redirects: bool = True):
+        self.session = session
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.headers = headers
+        self.allow_redirects = allow_redirects
+
+    def existe(self, url: str) -> bool:
+        """True if url answers 200 to a HEAD"""
+        try:
+            response = self.session.head(
+                url, headers=self.headers, timeout=self.timeout, allow_redirects=self.allow_redirects
+            )
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    def primero(self, candidatos: Iterable[Tuple[str, object]]) -> Optional[Tuple[str, object]]:
+        """Best (earliest) candidate whose URL exists, or None
+
+        candidatos: (url, dato) pairs in priority order; the matching pair is
+        returned so the caller gets back whatever it attached to the URL.
+        """
+        candidatos: Sequence[Tuple[str, object]] = list(candidatos)
+        if not candidatos:
+            return None
+
+        resultados = [None] * len(candidatos)
+        mejor = None
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(candidatos)),
+            thread_name_prefix="sonda",
+        )
+        try:
+            futures = {
+                # Probes run in the caller's context (metrics keep their labels)
+                executor.submit(contextvars.copy_context().run, self.existe, url): i
+                for i, (url, _) in enumerate(candidatos)
+            }
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                i = futures[future]
+                resultados[i] = future.result()
+
+                if resultados[i] and (mejor is None or i < mejor):
+                    mejor = i
+                    # Anything ranked below the hit is no longer needed
+                    for pendiente, j in futures.items():
+                        if j > mejor:
+                            pendiente.cancel()
+
+                # Done once every better-ranked candidate has been resolved
+                if mejor is not None and all(r is not None for r in resultados[:mejor]):
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return candidatos[mejor] if mejor is not None else None
+
+    def todos(self, candidatos: Iterable[Tuple[str, object]]) -> List[Tuple[str, object]]:
+        """Every candidate whose URL exists, probed concurrently, in the given order"""
+        candidatos = list(candidatos)
+        if not candidatos:
+            return []
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(candidatos)),
+            thread_name_prefix="sonda",
+        ) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.existe, url)
+                for url, _ in candidatos
+            ]
+            existe = [future.result() for future in futures]
+
+        return [candidato for candidato, ok in zip(candidatos, existe) if ok]
+
+    async def existe_async(self, url: str) -> bool:
+        """Async counterpart of existe"""
+        headers = dict(self.session.headers)
+        headers.update(self.headers or {})
+        try:
+            response = await solicitar(
+                "HEAD", url, headers=headers, timeout=self.timeout, allow_redirects=self.allow_redirects
+            )
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    async def _sondear(self, candidatos: Sequence[Tuple[str, object]]) -> List[asyncio.Task]:
+        limite = asyncio.Semaphore(self.max_workers)
+
+        async def sondear(url):
+            async with limite:
+                return await self.existe_async(url)
+
+        return [asyncio.create_task(sondear(url)) for url, _ in candidatos]
+
+    async def primero_async(self, candidatos: Iterable[Tuple[str, object]]) -> Optional[Tuple[str, object]]:
+        """Async counterpart of primero"""
+        candidatos = list(candidatos)
+        if not candidatos:
+            return None
+
+        tareas = await self._sondear(candidatos)
+        indices = {tarea: i for i, tarea in enumerate(tareas)}
+        resultados = [None] * len(candidatos)
+        mejor = None
+        pendientes = set(tareas)
+        try:
+            while pendientes:
+                terminadas, pendientes = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+                for tarea in terminadas:
+                    i = indices[tarea]
+                    resultados[i] = tarea.result()
+                    if resultados[i] and (mejor is None or i < mejor):
+                        mejor = i
+                if mejor is not None:
+                    # Anything ranked below the hit is no longer needed
+                    for tarea in [t for t in pendientes if indices[t] > mejor]:
+                        tarea.cancel()
+                        pendientes.discard(tarea)
+                # Done once every better-ranked candidate has been resolved
+                if mejor is not None and all(r is not None for r in resultados[:mejor]):
+                    break
+        finally:
+            for tarea in pendientes:
+                tarea.cancel()
+
+        return candidatos[mejor] if mejor is not None else None
+
+    async def todos_async(self, candidatos: Iterable[Tuple[str, object]]) -> List[Tuple[str, object]]:
+        """Async counterpart of todos"""
+        candidatos = list(candidatos)
+        existe = await asyncio.gather(*await self._sondear(candidatos))
+        return [candidato for candidato, ok in zip(candidatos, existe) if ok]
@@ -1,4 +1,3 @@
-import requests
 from typing import List, Dict
 from datetime import datetime, timedelta
 from .base_scraper import BaseScraper
@@ -8,20 +7,31 @@ class VisionParaVivirScraper(BaseScraper):
     """Scraper para Visión para Vivir - busca episodio más reciente"""
     
     def get_episodes(self) -> List[Dict]:
-        """Busca el episodio más reciente de los últimos 10 días"""
+        """Busca el episodio más reciente de los últimos 10 días (HEAD en paralelo)"""
+        encontrado = self.url_prober(timeout=10, allow_redirects=False).primero(self._candidatos())
+        return self._episodios(encontrado)
+    
+    async def get_episodes_async(self) -> List[Dict]:
+        """Versión async de get_episodes (HEAD con aiohttp)"""
+        encontrado = await self.url_prober(timeout=10, allow_redirects=False).primero_async(self._candidatos())
+        return self._episodios(encontrado)
+    
+    def _candidatos(self):
+        candidatos = []
         for days_ago in range(10):
             date = datetime.now() - timedelta(days=days_ago)
             url = f'https://insightforliving.swncdn.com/International/VPV/NA/Media/MP3/VPV{date.strftime("%Y-%m-%d")}-Podcast.mp3'
-            
-            try:
-                if requests.head(url, timeout=10).status_code == 200:
-                    return [{
-                        "titulo": f"Visión para Vivir - {date.strftime('%d/%m/%Y')}",
-                        "audio_url": url,
-                        "nombre_programa": self.program_name
-                    }]
-            except:
-                continue
+            candidatos.append((url, date))
+        return candidatos
+    
+    def _episodios(self, encontrado) -> List[Dict]:
+        if encontrado:
+            url, date = encontrado
+            return [{
+                "titulo": f"Visión para Vivir - {date.strftime('%d/%m/%Y')}",
+                "audio_url": url,
+                "nombre_programa": self.program_name
+            }]
         return []
     
     def get_audio_url(self, episode_data: Dict) -> str:
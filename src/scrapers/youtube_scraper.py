@@ -1,8 +1,6 @@
-import re
-import subprocess
-import json
-from typing import List, Dict, Optional
+from typing import List, Dict
 from .base_scraper import BaseScraper
+from ..ytdlp_sesion import MAX_VIDEOS, get_ytdlp
 
 
 class YouTubeScraper(BaseScraper):
@@ -32,67 +30,39 @@ class YouTubeScraper(BaseScraper):
         return videos
     
     def _get_videos_with_ytdlp(self) -> List[Dict]:
-        """Use yt-dlp to get video list with metadata"""
+        """Use the shared in-process yt-dlp session to get the video list with metadata"""
         try:
-            # Usar yt-dlp para obtener la lista de videos con metadatos
-            cmd = [
-                'yt-dlp',
-                '--dump-json',
-                '--flat-playlist',  # No descarga, solo lista
-                '--playlist-end', '20',  # Limitar a los 20 más recientes
-                '--no-warnings',
-                self.base_url
-            ]
+            print(f"   🔄 Listando videos con yt-dlp...")
+            # Solo la lista (sin resolver cada video), limitada a los 20 más recientes
+            entries = get_ytdlp().listar(self.base_url, limite=MAX_VIDEOS)
             
-            print(f"   🔄 Ejecutando yt-dlp...")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            if result.returncode != 0:
-                print(f"   ✗ Error con yt-dlp: {result.stderr[:200]}")
-                return []
-            
-            # Parsear cada línea como JSON (yt-dlp devuelve un JSON por línea)
             videos = []
-            for line in result.stdout.strip().split('\n'):
-                if not line:
+            for video_data in entries:
+                if not video_data:
                     continue
                 
-                try:
-                    video_data = json.loads(line)
-                    
-                    # Extraer información relevante
-                    video_id = video_data.get('id')
-                    title = video_data.get('title', 'Sin título')
-                    duration = int(video_data.get('duration', 0) or 0)  # Convertir a int
-                    
-                    if video_id:
-                        video_url = f"https://www.youtube.com/watch?v={video_id}"
-                        
-                        videos.append({
-                            "titulo": title,
-                            "audio_url": video_url,  # yt-dlp lo manejará
-                            "nombre_programa": self.program_name,
-                            "duration_seconds": duration
-                        })
+                # Extraer información relevante
+                video_id = video_data.get('id')
+                title = video_data.get('title') or 'Sin título'
+                duration = int(video_data.get('duration', 0) or 0)  # Convertir a int
                 
-                except json.JSONDecodeError:
-                    continue
+                if video_id:
+                    video_url = f"https://www.youtube.com/watch?v={video_id}"
+                    
+                    videos.append({
+                        "titulo": title,
+                        "audio_url": video_url,  # yt-dlp lo manejará
+                        "nombre_programa": self.program_name,
+                        "duration_seconds": duration
+                    })
             
             return videos
             
-        except subprocess.TimeoutExpired:
-            print(f"   ✗ Timeout al ejecutar yt-dlp")
-            return []
-        except FileNotFoundError:
+        except ImportError:
             print(f"   ✗ yt-dlp no está instalado")
             return []
         except Exception as e:
-            print(f"   ✗ Error: {e}")
+            print(f"   ✗ Error con yt-dlp: {str(e)[:200]}")
             return []
     
     def get_audio_url(self, episode_data: Dict) -> str:
@@ -0,0 +1,183 @@
+"""Shared in-process yt-dlp session
+
+Discovery (YouTubeScraper) and downloads (_descargar_youtube) reuse
+YoutubeDL instances for the whole run: extractors are created once and keep
+their caches (player JS, client config...) instead of paying the start-up of
+a ``yt-dlp`` process or a fresh YoutubeDL per channel and per video. It also
+works in the PyInstaller build without a yt-dlp binary on PATH.
+
+YoutubeDL is not thread-safe, so each thread gets its own instances and
+YouTube downloads on different workers run in parallel.
+"""
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, List, Optional
+
+MAX_VIDEOS = 20
+
+# Seconds a channel/playlist listing may take (what the yt-dlp subprocess had)
+TIMEOUT_LISTADO = 60
+
+YOUTUBE_HEADERS = {
+    'User-Agent': 'com.google.android.youtube/19.09.37 (Linux; U; Android 11) gzip',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-us,en;q=0.5',
+    'Sec-Fetch-Mode': 'navigate',
+}
+
+EXTRACTOR_ARGS = {
+    'youtube': {
+        'player_client': ['android', 'web'],
+        'skip': ['hls', 'dash', 'translated_subs'],
+    }
+}
+
+_SIN_VALOR = object()
+
+_sesion = None
+_sesion_lock = Lock()
+
+
+def get_ytdlp() -> "SesionYtdlp":
+    """Process-wide yt-dlp session"""
+    global _sesion
+    with _sesion_lock:
+        if _sesion is None:
+            _sesion = SesionYtdlp()
+        return _sesion
+
+
+def cerrar_ytdlp():
+    """Close the shared YoutubeDL (end of the run)"""
+    global _sesion
+    with _sesion_lock:
+        if _sesion is not None:
+            _sesion.cerrar()
+            _sesion = None
+
+
+def buscar_cookies():
+    """cookies.txt in the current directory, the PyInstaller bundle or next to the .exe"""
+    rutas = [
+        'cookies.txt',
+        os.path.join(getattr(sys, '_MEIPASS', os.path.abspath(".")), 'cookies.txt'),
+        os.path.join(os.path.dirname(sys.executable), 'cookies.txt'),
+    ]
+    for ruta in rutas:
+        if os.path.exists(ruta):
+            return ruta
+    return None
+
+
+class SesionYtdlp:
+    """Lazily created YoutubeDL instances, one per thread and set of options, shared by discovery and downloads"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = Lock()
+        self._instancias = []
+        self._listador = None
+
+    def _instancia(self, **opciones):
+        """This thread's YoutubeDL built with opciones
+
+        yt-dlp reads some options only when the instance is built or on its
+        first request (format, socket_timeout...), so each set of options
+        gets its own instance and none is reconfigured afterwards.
+        """
+        instancias = getattr(self._local, 'instancias', None)
+        if instancias is None:
+            instancias = self._local.instancias = {}
+        clave = repr(sorted(opciones.items()))
+        ydl = instancias.get(clave)
+        if ydl is None:
+            import yt_dlp
+
+            parametros = {
+                'extractor_args': EXTRACTOR_ARGS,
+                'http_headers': YOUTUBE_HEADERS,
+                **opciones,
+            }
+            cookiefile = buscar_cookies()
+            if cookiefile:
+                parametros['cookiefile'] = cookiefile
+            ydl = instancias[clave] = yt_dlp.YoutubeDL(parametros)
+            with self._lock:
+                primera = not self._instancias
+                self._instancias.append(ydl)
+            if primera:
+                if cookiefile:
+                    print(f"   ✓ Usando cookies: {cookiefile}")
+                else:
+                    print("   ⚠️  cookies.txt no encontrado, intentando sin cookies...")
+        return ydl
+
+    @contextmanager
+    def usar(self, por_llamada: Dict = None, **opciones):
+        """This thread's YoutubeDL for opciones, with por_llamada in its params for the block
+
+        por_llamada only holds options yt-dlp reads on every call (outtmpl,
+        playlistend); they are restored when the block ends.
+        """
+        ydl = self._instancia(**opciones)
+        por_llamada = por_llamada or {}
+        anteriores = {clave: ydl.params.get(clave, _SIN_VALOR) for clave in por_llamada}
+        ydl.params.update(por_llamada)
+        try:
+            yield ydl
+        finally:
+            for clave, valor in anteriores.items():
+                if valor is _SIN_VALOR:
+                    ydl.params.pop(clave, None)
+                else:
+                    ydl.params[clave] = valor
+
+    def _listar(self, url: str, limite: Optional[int]) -> List[Dict]:
+        with self.usar({'playlistend': limite}, extract_flat='in_playlist', socket_timeout=TIMEOUT_LISTADO,
+                       quiet=True, no_warnings=True) as ydl:
+            info = ydl.extract_info(url, download=False)
+            return list(info.get('entries') or []) if info else []
+
+    def listar(self, url: str, limite: Optional[int] = MAX_VIDEOS, timeout: float = TIMEOUT_LISTADO) -> List[Dict]:
+        """Latest videos of a channel or playlist without resolving each one (--flat-playlist)
+
+        limite=None lists the whole playlist. Raises TimeoutError if the
+        listing takes longer than timeout seconds.
+        """
+        with self._lock:
+            if self._listador is None:
+                # Its own threads (and instances): a listing past its deadline cannot block the caller
+                self._listador = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ytdlp-listado")
+            listador = self._listador
+        try:
+            return listador.submit(self._listar, url, limite).result(timeout=timeout)
+        except FuturesTimeoutError:
+            raise TimeoutError(f"yt-dlp no terminó de listar {url} en {timeout}s") from None
+
+    def descargar(self, url: str, plantilla: str, formato: str) -> Optional[str]:
+        """Download url to plantilla (yt-dlp output template); path of the final file
+
+        yt-dlp's own ffmpeg fixups stay off (format 140 is DASH m4a, which
+        would trigger FFmpegFixupM4a): any conversion belongs to the
+        postprocess pool.
+        """
+        opciones = dict(format=formato, fixup='never', quiet=False, no_warnings=False)
+        plantillas = dict(self._instancia(**opciones).params.get('outtmpl') or {}, default=plantilla)
+        with self.usar({'outtmpl': plantillas}, **opciones) as ydl:
+            info = ydl.extract_info(url, download=True)
+        descargas = (info or {}).get('requested_downloads') or []
+        return descargas[-1].get('filepath') if descargas else None
+
+    def cerrar(self):
+        with self._lock:
+            instancias, self._instancias = self._instancias, []
+            listador, self._listador = self._listador, None
+        if listador is not None:
+            listador.shutdown(wait=False, cancel_futures=True)
+        for ydl in instancias:
+            ydl.close()
+        self._local = threading.local()